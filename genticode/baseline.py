@@ -1,26 +1,267 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
 import json
+import os
 import shutil
+import time
+from dataclasses import dataclass
 from pathlib import Path
-import json
+from typing import Iterator
 
+from .findings import FINDINGS_FILE
+from .gitdiff import GitDiffError, head, merge_base
+from .log import get_logger
 
-def baseline_capture(gc_dir: Path) -> int:
-    report_path = gc_dir / "report.json"
+
+# History layout under .genticode/baseline/: gzip objects named by the sha256
+# of their content, plus an index of snapshots by commit and latest per branch
+INDEX_FILE = "index.json"
+OBJECTS_DIR = "objects"
+# Snapshot key when capturing outside a git checkout
+WORKTREE = "worktree"
+# Refs tried, in order, for the merge-base lookup (GENTICODE_BASE_REF overrides)
+BASE_REFS = ("origin/main", "main", "origin/master", "master")
+# Branch name of a detached HEAD (CI checkouts), first one set wins
+BRANCH_ENV = ("GENTICODE_BRANCH", "GITHUB_HEAD_REF", "GITHUB_REF_NAME")
+
+DEFAULT_MAX_SNAPSHOTS = 50
+DEFAULT_MAX_AGE_DAYS = 180
+
+
+@dataclass
+class Baseline:
+    report: dict
+    # Findings store for the fingerprint delta (plain or gzip JSONL), if captured
+    findings: Path | None
+    # How it was found: commit, branch, merge-base, base-branch, legacy or latest
+    source: str
+    commit: str | None = None
+
+
+def _empty_report() -> dict:
+    return {
+        "schema_version": "0.1.0",
+        "genticode_version": "0.1a",
+        "summary": {"counts": {"total": 0}},
+        "packs": [],
+        "findings": [],
+    }
+
+
+def load_index(base_dir: Path) -> dict:
+    try:
+        data = json.loads((base_dir / INDEX_FILE).read_text())
+        if isinstance(data, dict):
+            data.setdefault("snapshots", {})
+            data.setdefault("branches", {})
+            return data
+    except Exception:
+        pass
+    return {"version": 1, "snapshots": {}, "branches": {}}
+
+
+def _save_index(base_dir: Path, index: dict) -> None:
+    tmp = base_dir / (INDEX_FILE + ".tmp")
+    tmp.write_text(json.dumps(index, indent=2, sort_keys=True) + "\n")
+    os.replace(tmp, base_dir / INDEX_FILE)
+
+
+def _put_object(base_dir: Path, data: bytes) -> str:
+    """Store `data` gzip-compressed under its content hash; identical content is stored once."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = base_dir / OBJECTS_DIR / f"{digest}.gz"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        # mtime=0 keeps the compressed bytes deterministic
+        with open(tmp, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz:
+            gz.write(data)
+        os.replace(tmp, path)
+    return digest
+
+
+def object_path(base_dir: Path, digest: str) -> Path:
+    return base_dir / OBJECTS_DIR / f"{digest}.gz"
+
+
+def _git_key(root: Path) -> tuple[str, str | None]:
+    """(HEAD commit, branch); a detached HEAD takes its branch from BRANCH_ENV."""
+    try:
+        commit, branch = head(root)
+    except (GitDiffError, IndexError):
+        return WORKTREE, None
+    if branch is None:
+        branch = next((os.environ[k] for k in BRANCH_ENV if os.getenv(k)), None)
+    return commit, branch
+
+
+def snapshot(
+    gc_dir: Path,
+    commit: str,
+    branch: str | None,
+    max_count: int = DEFAULT_MAX_SNAPSHOTS,
+    max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+    now: float | None = None,
+) -> dict:
+    """Record the current report (and findings store) as the baseline for `commit`.
+
+    Returns the index entry. The branch's latest snapshot moves to `commit`,
+    and old snapshots are pruned.
+    """
     base_dir = gc_dir / "baseline"
     base_dir.mkdir(parents=True, exist_ok=True)
+    report_path = gc_dir / "report.json"
+    data = json.loads(report_path.read_text()) if report_path.exists() else _empty_report()
+    entry = {
+        "branch": branch,
+        "created": time.time() if now is None else now,
+        "report": _put_object(base_dir, (json.dumps(data, indent=2, sort_keys=True) + "\n").encode("utf-8")),
+        "findings": None,
+    }
+    store = gc_dir / FINDINGS_FILE
+    if store.exists():
+        entry["findings"] = _put_object(base_dir, store.read_bytes())
+    index = load_index(base_dir)
+    index["snapshots"][commit] = entry
+    if branch:
+        index["branches"][branch] = commit
+    prune_index(base_dir, index, max_count=max_count, max_age_days=max_age_days, now=entry["created"])
+    _save_index(base_dir, index)
+    return entry
+
+
+def prune_index(
+    base_dir: Path,
+    index: dict,
+    max_count: int = DEFAULT_MAX_SNAPSHOTS,
+    max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+    now: float | None = None,
+) -> list[str]:
+    """Drop snapshots older than `max_age_days` or beyond the newest `max_count`.
+
+    Each branch's latest snapshot is exempt from the count limit (not the age
+    limit). Objects no longer referenced are deleted. Returns dropped commits.
+    """
+    now = time.time() if now is None else now
+    heads = set(index["branches"].values())
+    ordered = sorted(index["snapshots"].items(), key=lambda kv: float(kv[1].get("created", 0)), reverse=True)
+    dropped = []
+    for rank, (commit, ent) in enumerate(ordered):
+        too_old = now - float(ent.get("created", 0)) > max_age_days * 86400
+        if too_old or (rank >= max_count and commit not in heads):
+            dropped.append(commit)
+            del index["snapshots"][commit]
+    index["branches"] = {b: c for b, c in index["branches"].items() if c in index["snapshots"]}
+    live = {ent.get(k) for ent in index["snapshots"].values() for k in ("report", "findings")}
+    obj_dir = base_dir / OBJECTS_DIR
+    if obj_dir.exists():
+        for p in obj_dir.glob("*.gz"):
+            if p.name[: -len(".gz")] not in live:
+                p.unlink()
+    return dropped
+
+
+def _candidates(root: Path, index: dict, base_ref: str | None) -> Iterator[tuple[str, str]]:
+    """(commit, source) keys to try, cheapest first; git is only asked when needed."""
+    commit, branch = _git_key(root)
+    yield commit, "commit"
+    if branch and branch in index["branches"]:
+        yield index["branches"][branch], "branch"
+    if commit == WORKTREE:
+        return
+    ref = base_ref or os.getenv("GENTICODE_BASE_REF")
+    for r in [ref] if ref else BASE_REFS:
+        mb = merge_base(root, r)
+        if mb:
+            yield mb, "merge-base"
+            # No snapshot at the fork point: fall back to the base branch's latest
+            base_branch = r.split("/", 1)[1] if r.startswith("origin/") else r
+            if base_branch in index["branches"]:
+                yield index["branches"][base_branch], "base-branch"
+            return
+
+
+def _load_snapshot(base_dir: Path, ent: dict, source: str, commit: str) -> Baseline | None:
+    try:
+        with gzip.open(object_path(base_dir, ent["report"]), "rt", encoding="utf-8") as fh:
+            report = json.load(fh)
+    except Exception:
+        return None
+    findings = object_path(base_dir, ent["findings"]) if ent.get("findings") else None
+    return Baseline(report, findings, source, commit)
+
+
+def _load_legacy(base_dir: Path) -> Baseline | None:
+    legacy = base_dir / "report.json"
+    if not legacy.exists():
+        return None
+    try:
+        report = json.loads(legacy.read_text())
+    except Exception:
+        return None
+    store = base_dir / FINDINGS_FILE
+    return Baseline(report, store if store.exists() else None, "legacy")
+
+
+def _find(base_dir: Path, root: Path, base_ref: str | None) -> Baseline | None:
+    index = load_index(base_dir)
+    snaps = index["snapshots"]
+    if snaps:
+        for key, source in _candidates(root, index, base_ref):
+            ent = snaps.get(key)
+            found = _load_snapshot(base_dir, ent, source, key) if ent else None
+            if found is not None:
+                return found
+    # No snapshot matches (e.g. a detached CI checkout without a base ref):
+    # the last capture still beats gating without a baseline
+    found = _load_legacy(base_dir)
+    if found is None and snaps:
+        key, ent = max(snaps.items(), key=lambda kv: float(kv[1].get("created", 0)))
+        found = _load_snapshot(base_dir, ent, "latest", key)
+    return found
+
+
+def resolve(gc_dir: Path, root: Path, base_ref: str | None = None) -> Baseline | None:
+    """The baseline for the checked-out commit, with O(1) index lookups.
+
+    Tried in order: a snapshot of HEAD itself; the latest snapshot of the
+    current branch (see BRANCH_ENV for a detached HEAD); the snapshot at
+    the merge-base with `base_ref` (default: GENTICODE_BASE_REF, else the
+    first of BASE_REFS that exists), then that base branch's latest. When
+    none matches, the legacy single `baseline/report.json` (the last
+    capture), else the newest snapshot. The choice is logged.
+    """
+    found = _find(gc_dir / "baseline", root, base_ref)
+    log = get_logger()
+    if found is None:
+        log.info("baseline: none found")
+    else:
+        log.info(f"baseline: {found.source} {(found.commit or '')[:12]}".rstrip())
+    return found
+
+
+def baseline_capture(gc_dir: Path, root: Path | None = None, force: bool = False) -> int:
+    report_path = gc_dir / "report.json"
+    base_dir = gc_dir / "baseline"
     if report_path.exists():
         data = json.loads(report_path.read_text())
     else:
-        data = {
-            "schema_version": "0.1.0",
-            "genticode_version": "0.1a",
-            "summary": {"counts": {"total": 0}},
-            "packs": [],
-            "findings": [],
-        }
+        data = _empty_report()
+    # A changed-files report covers the change set only, not the whole tree
+    if data.get("scope") and not force:
+        print("baseline: report.json is from a changed-files check; run a full check first (or --force)")
+        return 2
+    base_dir.mkdir(parents=True, exist_ok=True)
+    # Latest capture, kept for tools that read the single-file layout
     (base_dir / "report.json").write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+    # Finding-level store for fingerprint deltas (see findings.delta)
+    store = gc_dir / FINDINGS_FILE
+    if store.exists():
+        shutil.copyfile(store, base_dir / FINDINGS_FILE)
+    commit, branch = _git_key(root if root is not None else gc_dir.parent)
+    snapshot(gc_dir, commit, branch)
     print(str(base_dir / "report.json"))
     return 0
 
@@ -34,6 +275,26 @@ def baseline_clear(gc_dir: Path) -> int:
     return 0
 
 
+def baseline_list(gc_dir: Path) -> int:
+    index = load_index(gc_dir / "baseline")
+    heads = {c: b for b, c in index["branches"].items()}
+    for commit, ent in sorted(index["snapshots"].items(), key=lambda kv: -float(kv[1].get("created", 0))):
+        when = time.strftime("%Y-%m-%d %H:%M", time.gmtime(float(ent.get("created", 0))))
+        mark = f" ({heads[commit]})" if commit in heads else ""
+        print(f"{commit[:12]}  {when}  {ent.get('branch') or '-'}{mark}")
+    return 0
+
+
+def baseline_prune(gc_dir: Path, max_count: int = DEFAULT_MAX_SNAPSHOTS, max_age_days: float = DEFAULT_MAX_AGE_DAYS) -> int:
+    base_dir = gc_dir / "baseline"
+    index = load_index(base_dir)
+    dropped = prune_index(base_dir, index, max_count=max_count, max_age_days=max_age_days)
+    if base_dir.exists():
+        _save_index(base_dir, index)
+    print(f"pruned {len(dropped)} snapshot(s), {len(index['snapshots'])} kept")
+    return 0
+
+
 def load_suppressions(gc_dir: Path) -> list[dict]:
     sup = gc_dir / "baseline" / "suppressions.json"
     if not sup.exists():
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+
+DEFAULT_MAX_ENTRIES = 200_000
+# Serialized size a cache file may grow to
+DEFAULT_MAX_BYTES = 64 << 20
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"))
+
+
+class ContentCache:
+    """Content-addressed JSON store with LRU-by-run eviction.
+
+    Subclasses set `version` (bumped whenever cached values would change
+    meaning), `field` (the per-entry value key on disk), `max_env` (env var
+    overriding `max_entries`) and `max_bytes_env` (env var overriding
+    `max_bytes`). The store is a single JSON document written atomically,
+    and only when an entry was added; on save it keeps the most recently
+    used entries within both `max_entries` and `max_bytes` (serialized).
+    """
+
+    version = "1"
+    field = "value"
+    max_env = "GENTICODE_CACHE_MAX"
+    max_bytes_env = "GENTICODE_CACHE_MAX_BYTES"
+
+    def __init__(self, path: Path | None = None, max_entries: int | None = None, max_bytes: int | None = None):
+        self.path = path
+        if max_entries is None:
+            max_entries = int(os.getenv(self.max_env, str(DEFAULT_MAX_ENTRIES)))
+        if max_bytes is None:
+            max_bytes = int(os.getenv(self.max_bytes_env, str(DEFAULT_MAX_BYTES)))
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self.entries: dict[str, dict] = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        # Set by `put`: a run of cache hits only leaves the file as it was
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path, max_entries: int | None = None, max_bytes: int | None = None):
+        cache = cls(path, max_entries=max_entries, max_bytes=max_bytes)
+        try:
+            data = json.loads(path.read_text())
+        except Exception:
+            return cache
+        if isinstance(data, dict) and data.get("version") == cls.version:
+            cache.entries = dict(data.get("entries") or {})
+            cache.generation = int(data.get("generation", 0))
+        return cache
+
+    def get(self, key: str) -> Any:
+        ent = self.entries.get(key)
+        if ent is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        ent["used"] = self.generation + 1
+        return ent.get(self.field) or []
+
+    def put(self, key: str, value: Any) -> None:
+        self.entries[key] = {self.field: value, "used": self.generation + 1}
+        self.dirty = True
+
+    def evict(self) -> int:
+        # Oldest generation first; key as tiebreak keeps eviction deterministic
+        order = sorted(self.entries, key=lambda k: (int(self.entries[k].get("used", 0)), k))
+        victims = order[: max(0, len(order) - self.max_entries)]
+        # `"key":entry,` per entry, within the budget left by the document's envelope
+        size = {k: len(_dumps(k)) + len(_dumps(self.entries[k])) + 2 for k in order[len(victims) :]}
+        over = sum(size.values()) + 100 - self.max_bytes
+        for k in order[len(victims) :]:
+            if over <= 0:
+                break
+            victims.append(k)
+            over -= size[k]
+        for k in victims:
+            del self.entries[k]
+        return len(victims)
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        self.evict()
+        self.generation += 1
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(_dumps({"version": self.version, "generation": self.generation, "entries": self.entries}))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
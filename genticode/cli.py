@@ -6,26 +6,43 @@ from pathlib import Path
 
 from .report import build_empty_report, write_json, add_pack_summary
 from .html import render_html
-from .sarif import to_sarif
-from .baseline import baseline_capture, baseline_clear, load_suppressions
+from .sarif import CHUNK_DIR, MAX_BYTES, MAX_RESULTS, write_sarif
+from .baseline import (
+    DEFAULT_MAX_AGE_DAYS,
+    DEFAULT_MAX_SNAPSHOTS,
+    baseline_capture,
+    baseline_clear,
+    baseline_list,
+    baseline_prune,
+    load_suppressions,
+    resolve as resolve_baseline,
+)
 from .prompt import scan_repo as prompt_scan
 from .prompt.manifest import build_manifest, write_manifest
 from .static import maybe_run_semgrep, normalize_semgrep
 from .gate import evaluate as gate_evaluate
 from .policy import load as load_policy
 from .supply import maybe_cyclonedx_py, maybe_cyclonedx_npm, evaluate_licenses
+from .supply.osv import OsvImportError, default_db as default_osv_db, import_dump as import_osv_dump
 from .quality import maybe_run_quality
 from .traceability import load_priority
 from .log import get_logger
 from . import VERSION
 from .orchestrator import run_all as run_packs
 from .docsutil import docs_build, gov_check
+from .gitdiff import GitDiffError, changed_files, head as git_head
+from .findings import FINDINGS_FILE, SCOPED_FINDINGS_FILE, delta as findings_delta, merge_stores
+from . import perfhistory
+from . import trace
 from . import VERSION
 import json as _json
 
 
 ROOT = Path(os.getcwd())
 GC_DIR = ROOT / ".genticode"
+# A changed-files `check` writes its report here: report.json stays the last
+# full run's, which `baseline capture` and pack scheduling read
+SCOPED_REPORT = "report-changed.json"
 
 
 def ensure_layout() -> None:
@@ -58,27 +75,50 @@ def cmd_init(_: argparse.Namespace) -> int:
     return 0
 
 
-def cmd_check(_: argparse.Namespace) -> int:
+def cmd_check(args: argparse.Namespace) -> int:
     log = get_logger()
     ensure_layout()
+    # Changed-files mode: scope file-level packs to a git change set
+    since = getattr(args, "changed_since", None)
+    staged = bool(getattr(args, "staged", False))
+    changed = None
+    if since or staged:
+        try:
+            changed = changed_files(ROOT, since=since, staged=staged)
+        except GitDiffError as e:
+            raise SystemExit(f"changed-files mode: {e}")
     # Load policy
     try:
         policy = load_policy(GC_DIR / "policy.yaml")
     except Exception as e:
         print(f"Policy error: {e}")
         policy = None
-    baseline_present = (GC_DIR / "baseline" / "report.json").exists()
+    resolved = resolve_baseline(GC_DIR, ROOT, base_ref=getattr(args, "base_ref", None))
+    baseline_present = resolved is not None
     report = build_empty_report(version=VERSION, baseline_present=baseline_present)
+    if changed is not None:
+        report["scope"] = {"changed_since": "staged" if staged else since, "files": len(changed)}
     # Delegate pack execution to orchestrator (policy-aware)
-    run_packs(policy, ROOT, GC_DIR, report)
-    # Load baseline for delta/gating
-    base_path = GC_DIR / "baseline" / "report.json"
-    baseline = None
-    if base_path.exists():
+    if getattr(args, "trace", False):
+        trace.start()
         try:
-            baseline = json.loads(base_path.read_text())
-        except Exception:
-            baseline = None
+            with trace.span("run_all", "orchestrator"):
+                run_packs(policy, ROOT, GC_DIR, report, changed=changed)
+        finally:
+            tracer = trace.stop()
+        tracer.write(GC_DIR / "raw" / "trace.json")
+    else:
+        run_packs(policy, ROOT, GC_DIR, report, changed=changed)
+    # Fingerprinted findings of the packs that completed, one store per check; a
+    # failed or timed-out pack's store is absent or may still be written
+    ran = [p.get("name") for p in report.get("packs", []) or [] if p.get("name") and "error" not in (p.get("counts") or {})]
+    report_path = GC_DIR / ("report.json" if changed is None else SCOPED_REPORT)
+    store_name = FINDINGS_FILE if changed is None else SCOPED_FINDINGS_FILE
+    report["findings_store"] = {"path": store_name, "count": merge_stores(GC_DIR / "raw", ran, GC_DIR / store_name)}
+    # Baseline for delta/gating: this commit's, the branch's or the merge-base's snapshot
+    baseline = resolved.report if resolved else None
+    if resolved is not None:
+        report["baseline"].update({"source": resolved.source, "commit": resolved.commit})
     # Compute delta summary against baseline for select packs
     def _pack(name: str, data: dict | None) -> dict:
         if not data:
@@ -89,10 +129,12 @@ def cmd_check(_: argparse.Namespace) -> int:
         return {}
     delta: dict = {}
     base_counts = baseline or {}
+    # Packs that only saw the change set; their counts don't compare with the baseline's
+    scoped = set((report.get("scope") or {}).get("packs") or ())
     # Prompt lints delta
     cur_prompt = _pack("prompt", report)
     base_prompt = _pack("prompt", base_counts)
-    if cur_prompt:
+    if cur_prompt and "prompt" not in scoped:
         cur_l = cur_prompt.get("lints") or {}
         base_l = base_prompt.get("lints") or {}
         keys = set(cur_l) | set(base_l)
@@ -110,28 +152,60 @@ def cmd_check(_: argparse.Namespace) -> int:
             "vulns": {k: int(cur_by.get(k, 0)) - int(base_by.get(k, 0)) for k in sorted(sev_keys)},
             "new_high": new_high,
         }
+    # Finding-level delta: hash join on fingerprints against the baseline store
+    base_store = resolved.findings if resolved else None
+    if base_store is not None and base_store.exists():
+        scope = set(changed) if changed is not None else None
+        completed = set(ran)
+
+        def in_scope(r: dict) -> bool:
+            # Packs that did not complete fix nothing; scoped packs only rescanned the change set
+            return r.get("pack") in completed and (scope is None or r.get("pack") not in scoped or r.get("file") in scope)
+
+        delta["findings"] = findings_delta(
+            GC_DIR / store_name,
+            base_store,
+            new_out=GC_DIR / "raw" / "findings-new.jsonl",
+            fixed_out=GC_DIR / "raw" / "findings-fixed.jsonl",
+            in_scope=in_scope,
+        )
     if delta:
         report["delta"] = delta
-    write_json(GC_DIR / "report.json", report)
+    write_json(report_path, report)
     # Gating vs baseline
     # Use policy budgets if available
     suppressions = load_suppressions(GC_DIR)
-    rc, _summary = gate_evaluate(
+    # Changed-files runs scan a fraction of the tree: their durations are neither gated nor kept
+    history = perfhistory.load(GC_DIR) if changed is None else None
+    rc, gate_summary = gate_evaluate(
         report,
         baseline,
         budgets=(policy.budgets if policy else None),
         phase=(policy.get_phase() if policy else "new_code_only"),
         suppressions=suppressions,
+        history=history,
     )
-    print(str(GC_DIR / "report.json"))
+    # Per-rule verdicts, kept out of report.json (one entry per rule and pack)
+    write_json(GC_DIR / "raw" / "gate.json", gate_summary)
+    if changed is None:
+        try:
+            commit = git_head(ROOT)[0]
+        except (GitDiffError, IndexError):
+            commit = None
+        regressed = [t["pack"] for t in gate_summary.get("performance_history") or [] if t.get("verdict") == "regress"]
+        hist_spec = (((policy.budgets if policy else None) or {}).get("performance") or {}).get("history") or {}
+        accept_after = int(hist_spec.get("accept_after", perfhistory.DEFAULT_ACCEPT_AFTER))
+        perfhistory.record(GC_DIR, report, commit=commit, exclude=regressed, accept_after=accept_after)
+    print(str(report_path))
     return rc
 
 
 def cmd_report(args: argparse.Namespace) -> int:
     ensure_layout()
-    report_path = GC_DIR / "report.json"
+    name = SCOPED_REPORT if getattr(args, "changed", False) else "report.json"
+    report_path = GC_DIR / name
     if not report_path.exists():
-        raise SystemExit(".genticode/report.json not found. Run 'genticode check' first.")
+        raise SystemExit(f".genticode/{name} not found. Run 'genticode check' first.")
     data = json.loads(report_path.read_text())
     rc = 0
     if args.html:
@@ -140,27 +214,57 @@ def cmd_report(args: argparse.Namespace) -> int:
         out.write_text(html)
         print(str(out))
     if args.sarif:
-        sarif = to_sarif(data, GC_DIR)
-        out = GC_DIR / "sarif.json"
-        write_json(out, sarif)
-        print(str(out))
+        for out in _write_sarif(args, data):
+            print(str(out))
     if not args.html and not args.sarif:
         # Default: do both for convenience.
         html = render_html(data)
         (GC_DIR / "report.html").write_text(html)
-        sarif = to_sarif(data, GC_DIR)
-        write_json(GC_DIR / "sarif.json", sarif)
         print(str(GC_DIR / "report.html"))
-        print(str(GC_DIR / "sarif.json"))
+        for out in _write_sarif(args, data):
+            print(str(out))
     return rc
 
 
+def _write_sarif(args: argparse.Namespace, data: dict) -> list[Path]:
+    max_results = getattr(args, "sarif_max_results", None)
+    max_bytes = getattr(args, "sarif_max_bytes", None)
+    if getattr(args, "sarif_split", False) or getattr(args, "sarif_buckets", None):
+        max_results = max_results or MAX_RESULTS
+        max_bytes = max_bytes or MAX_BYTES
+    split = max_results is not None or max_bytes is not None
+    try:
+        written = write_sarif(
+            data,
+            GC_DIR,
+            GC_DIR / (CHUNK_DIR if split else "sarif.json"),
+            compress=bool(getattr(args, "sarif_gzip", False)),
+            max_results=max_results,
+            max_bytes=max_bytes,
+            buckets=getattr(args, "sarif_buckets", None),
+        )
+    except ValueError as e:
+        raise SystemExit(f"sarif: {e}")
+    # Drop the other mode's output so a stale log is never uploaded
+    if split:
+        for stale in (GC_DIR / "sarif.json", GC_DIR / "sarif.json.gz"):
+            stale.unlink(missing_ok=True)
+    elif (GC_DIR / CHUNK_DIR).is_dir():
+        for stale in (GC_DIR / CHUNK_DIR).glob("genticode-*.sarif*"):
+            stale.unlink()
+    return written
+
+
 def cmd_baseline(args: argparse.Namespace) -> int:
     ensure_layout()
     if args.action == "capture":
-        return baseline_capture(GC_DIR)
+        return baseline_capture(GC_DIR, ROOT, force=args.force)
     elif args.action == "clear":
         return baseline_clear(GC_DIR)
+    elif args.action == "list":
+        return baseline_list(GC_DIR)
+    elif args.action == "prune":
+        return baseline_prune(GC_DIR, max_count=args.max_count, max_age_days=args.max_age_days)
     else:
         raise SystemExit(f"Unknown baseline action: {args.action}")
 
@@ -180,15 +284,29 @@ def main(argv: list[str] | None = None) -> int:
     p_init.set_defaults(func=cmd_init)
 
     p_check = sub.add_parser("check", help="Run checks and produce report.json")
+    p_scope = p_check.add_mutually_exclusive_group()
+    p_scope.add_argument("--changed-since", metavar="REF", help="Limit prompt/static/quality packs to files changed vs a git ref")
+    p_scope.add_argument("--staged", action="store_true", help="Limit prompt/static/quality packs to staged files (pre-commit)")
+    p_check.add_argument("--base-ref", metavar="REF", help="Ref whose merge-base selects the baseline snapshot (default: GENTICODE_BASE_REF or main)")
+    p_check.add_argument("--trace", action="store_true", help="Write a Chrome trace-event timeline to .genticode/raw/trace.json")
     p_check.set_defaults(func=cmd_check)
 
     p_report = sub.add_parser("report", help="Render HTML/SARIF from report.json")
+    p_report.add_argument("--changed", action="store_true", help=f"Render the last changed-files check ({SCOPED_REPORT})")
     p_report.add_argument("--html", action="store_true", help="Write report.html")
     p_report.add_argument("--sarif", action="store_true", help="Write sarif.json")
+    p_report.add_argument("--sarif-gzip", action="store_true", help="Gzip SARIF output (.gz)")
+    p_report.add_argument("--sarif-split", action="store_true", help="Split SARIF into .genticode/sarif/ chunks within code scanning upload limits")
+    p_report.add_argument("--sarif-max-results", type=int, metavar="N", help="Split SARIF into chunks of at most N results")
+    p_report.add_argument("--sarif-max-bytes", type=int, metavar="N", help="Split SARIF into chunks of at most N bytes (uncompressed)")
+    p_report.add_argument("--sarif-buckets", type=int, metavar="N", help="Split SARIF into N files (categories), doubled only if one overflows")
     p_report.set_defaults(func=cmd_report)
 
     p_bl = sub.add_parser("baseline", help="Manage baseline store")
-    p_bl.add_argument("action", choices=["capture", "clear"], help="Capture or clear baseline")
+    p_bl.add_argument("action", choices=["capture", "clear", "list", "prune"], help="Capture, clear, list or prune baseline snapshots")
+    p_bl.add_argument("--max-count", type=int, default=DEFAULT_MAX_SNAPSHOTS, help="prune: snapshots to keep (branch heads exempt)")
+    p_bl.add_argument("--max-age-days", type=float, default=DEFAULT_MAX_AGE_DAYS, help="prune: drop snapshots older than this")
+    p_bl.add_argument("--force", action="store_true", help="capture: accept a changed-files report")
     p_bl.set_defaults(func=cmd_baseline)
 
     p_iast = sub.add_parser("iast", help="Run IAST checks (null provider)")
@@ -225,6 +343,32 @@ def main(argv: list[str] | None = None) -> int:
     p_docs_build = p_docs_sub.add_parser("build", help="Render docs snapshot deterministically")
     p_docs_build.set_defaults(func=_cmd_docs)
 
+    # supply db import
+    def _cmd_supply_db_import(args: argparse.Namespace) -> int:
+        src = Path(args.dump)
+        if not src.exists():
+            print(f"supply db import: {src} not found")
+            return 2
+        db = Path(args.db) if args.db else default_osv_db(GC_DIR)
+        try:
+            stats = import_osv_dump(src, db)
+        except OsvImportError as e:
+            print(f"supply db import: {e}; index not replaced")
+            return 2
+        print(f"osv: {stats['records']} advisories, {stats['affected']} package entries -> {db}")
+        if stats["skipped"]:
+            print(f"osv: skipped {stats['skipped']} unreadable file(s)")
+        return 0
+
+    p_supply = sub.add_parser("supply", help="Supply-chain tools")
+    p_supply_sub = p_supply.add_subparsers(dest="supply_cmd", required=True)
+    p_supply_db = p_supply_sub.add_parser("db", help="Local OSV vulnerability index")
+    p_supply_db_sub = p_supply_db.add_subparsers(dest="supply_db_cmd", required=True)
+    p_supply_db_import = p_supply_db_sub.add_parser("import", help="Build the index from an OSV dump (JSON files or all.zip)")
+    p_supply_db_import.add_argument("dump", help="OSV dump directory or archive")
+    p_supply_db_import.add_argument("--db", help="Index path (default .genticode/osv/index.sqlite)")
+    p_supply_db_import.set_defaults(func=_cmd_supply_db_import)
+
     # gov check
     def _cmd_gov(args: argparse.Namespace) -> int:
         ok, msg = gov_check(ROOT)
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import posixpath
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .trace import span
+
+
+# Directories never worth indexing for any pack (VCS, tool state, vendored deps)
+SKIP_DIR_NAMES = frozenset({".git", ".genticode", ".venv", "node_modules"})
+# Content shared between packs within one check (GENTICODE_CONTENT_CACHE_BYTES)
+DEFAULT_CONTENT_CACHE_BYTES = 64 << 20
+
+
+class ContentLRU:
+    """File content by path, least recently used evicted past `max_bytes`.
+
+    Files larger than a quarter of the budget are not kept, so one big file
+    can't flush everything else.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, int(max_bytes))
+        self.bytes = 0
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._data.get(key)
+            if data is not None:
+                self._data.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) * 4 > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            self.bytes += len(data) - (len(old) if old is not None else 0)
+            self._data[key] = data
+            while self.bytes > self.max_bytes:
+                _, dropped = self._data.popitem(last=False)
+                self.bytes -= len(dropped)
+
+    def __getstate__(self) -> dict:
+        # An isolated pack process starts with an empty cache of the same size
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["max_bytes"])
+
+
+# Under .genticode/cache/: content hashes by path, reused while (size, mtime_ns) match
+HASHES_FILE = "file-hashes.json"
+# Files modified this close to the walk aren't recorded: a same-tick rewrite
+# would keep its (size, mtime_ns) on coarse-timestamp filesystems
+RACY_NS = 2_000_000_000
+
+
+class HashStore:
+    """sha256 by root-relative path, trusted while the file's (size, mtime_ns) match.
+
+    Lets warm runs skip reading and hashing unchanged files. Saved only
+    when a hash was added, changed or dropped.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.entries: dict[str, list] = {}
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Path) -> "HashStore":
+        store = cls(path)
+        try:
+            data = json.loads(path.read_text())
+            store.entries = {str(k): list(v) for k, v in (data.get("files") or {}).items()}
+        except Exception:
+            pass
+        return store
+
+    def get(self, rel: str, size: int, mtime_ns: int) -> str | None:
+        ent = self.entries.get(rel)
+        return ent[2] if ent and len(ent) == 3 and ent[0] == size and ent[1] == mtime_ns else None
+
+    def put(self, rel: str, size: int, mtime_ns: int, sha256: str) -> None:
+        if self.entries.get(rel) != [size, mtime_ns, sha256]:
+            self.entries[rel] = [size, mtime_ns, sha256]
+            self.dirty = True
+
+    def retain(self, rels: Iterable[str]) -> None:
+        """Drop paths no longer in the tree."""
+        keep = set(rels)
+        gone = [k for k in self.entries if k not in keep]
+        for k in gone:
+            del self.entries[k]
+        self.dirty = self.dirty or bool(gone)
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"version": 1, "files": self.entries}, separators=(",", ":")))
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def content_cache_bytes() -> int:
+    return int(os.getenv("GENTICODE_CONTENT_CACHE_BYTES", str(DEFAULT_CONTENT_CACHE_BYTES)))
+
+
+@dataclass
+class FileEntry:
+    """One indexed file.
+
+    Content comes from the index's shared, byte-bounded LRU when it is
+    there, so packs that read the same file share one disk read; the
+    sha256 is computed only when asked for, unless a HashStore supplied it.
+    """
+
+    path: Path
+    rel: str
+    size: int
+    mtime: float
+    mtime_ns: int = 0
+    _sha256: str | None = field(default=None, repr=False, compare=False)
+    _read: bool = field(default=False, repr=False, compare=False)
+    _cache: ContentLRU | None = field(default=None, repr=False, compare=False)
+
+    @property
+    def dir(self) -> str:
+        return posixpath.dirname(self.rel)
+
+    @property
+    def suffix(self) -> str:
+        return self.path.suffix
+
+    def read_bytes(self) -> bytes:
+        key = str(self.path)
+        data = self._cache.get(key) if self._cache is not None else None
+        if data is None:
+            data = self.path.read_bytes()
+            if self._cache is not None:
+                self._cache.put(key, data)
+        self._read = True
+        return data
+
+    def text(self) -> str:
+        return self.read_bytes().decode("utf-8", errors="ignore")
+
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.read_bytes()).hexdigest()
+        return self._sha256
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the content has been read at least once."""
+        return self._read
+
+    def __getstate__(self) -> dict:
+        # Ship metadata only to isolated pack processes; content is re-read there
+        return {"path": self.path, "rel": self.rel, "size": self.size, "mtime": self.mtime, "mtime_ns": self.mtime_ns, "_sha256": self._sha256}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state, _read=False, _cache=None)
+
+
+class FileIndex:
+    """Single-pass view of the repository tree.
+
+    Built once per check (see `orchestrator.run_all`) and handed to every pack,
+    so the tree is walked once and each file is hashed at most once. Files
+    are read from disk once per check while the content read so far fits
+    the shared LRU (`content_cache_bytes`); past that, the least recently
+    used content is re-read.
+    Pack-specific exclusions are applied on top via `select`.
+    """
+
+    def __init__(
+        self, root: Path, entries: Iterable[FileEntry] = (), scoped: bool = False, content: ContentLRU | None = None
+    ):
+        self.root = root
+        self.entries: list[FileEntry] = sorted(entries, key=lambda e: e.rel)
+        self.content = content if content is not None else ContentLRU(content_cache_bytes())
+        for e in self.entries:
+            e._cache = self.content
+        # time.time_ns() when the walk started (see `record_hashes`)
+        self.walked_ns = 0
+        self._by_path: dict[str, FileEntry] = {str(e.path): e for e in self.entries}
+        # True when narrowed to a change set (see `restrict`)
+        self.scoped = scoped
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        for e in self.entries:
+            e._cache = self.content
+
+    @classmethod
+    def build(cls, root: Path) -> "FileIndex":
+        entries: list[FileEntry] = []
+        walked_ns = time.time_ns()
+        with span("walk", "io", root=str(root)):
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIR_NAMES)
+                base = Path(dirpath)
+                for fn in filenames:
+                    p = base / fn
+                    try:
+                        st = p.stat()
+                    except Exception:
+                        continue
+                    entries.append(FileEntry(p, p.relative_to(root).as_posix(), int(st.st_size), float(st.st_mtime), int(st.st_mtime_ns)))
+        index = cls(root, entries)
+        index.walked_ns = walked_ns
+        return index
+
+    def use_hashes(self, store: HashStore) -> int:
+        """Take known hashes of unchanged files from `store`; returns how many."""
+        n = 0
+        for e in self.entries:
+            if e._sha256 is None and e.mtime_ns:
+                e._sha256 = store.get(e.rel, e.size, e.mtime_ns)
+                n += e._sha256 is not None
+        return n
+
+    def record_hashes(self, store: HashStore) -> None:
+        """Put the hashes computed this run into `store` and drop vanished paths.
+
+        Files modified within RACY_NS of the walk are left out.
+        """
+        cutoff = self.walked_ns - RACY_NS
+        for e in self.entries:
+            if e._sha256 is not None and e.mtime_ns and e.mtime_ns < cutoff:
+                store.put(e.rel, e.size, e.mtime_ns, e._sha256)
+        store.retain(e.rel for e in self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[FileEntry]:
+        return iter(self.entries)
+
+    def get(self, path: Path) -> FileEntry | None:
+        return self._by_path.get(str(path))
+
+    def restrict(self, rels: Iterable[str]) -> "FileIndex":
+        """Return a scoped view over the given root-relative paths.
+
+        Entries (and any hashes and content already read) are shared with this
+        index; paths that were pruned or no longer exist are dropped.
+        """
+        wanted = set(rels)
+        return FileIndex(self.root, (e for e in self.entries if e.rel in wanted), scoped=True, content=self.content)
+
+    def select(
+        self,
+        suffixes: Iterable[str] | None = None,
+        under: str | None = None,
+        exclude_dirs: Iterable[str] = (),
+        max_bytes: int | None = None,
+    ) -> list[FileEntry]:
+        """Filter entries by suffix, subtree, excluded dir prefixes and size.
+
+        `exclude_dirs` are matched as prefixes of the file's directory (relative
+        to root), mirroring the historical per-pack walk filters.
+        """
+        sfx = set(suffixes) if suffixes is not None else None
+        excl = tuple(exclude_dirs)
+        prefix = under.rstrip("/") + "/" if under else None
+        out: list[FileEntry] = []
+        for e in self.entries:
+            if sfx is not None and e.suffix not in sfx:
+                continue
+            if prefix is not None and not e.rel.startswith(prefix):
+                continue
+            if excl and e.dir.startswith(excl):
+                continue
+            if max_bytes is not None and e.size > max_bytes:
+                continue
+            out.append(e)
+        return out
+
+    @property
+    def bytes_read(self) -> int:
+        return sum(e.size for e in self.entries if e.loaded)
+
+    @property
+    def files_read(self) -> int:
+        return sum(1 for e in self.entries if e.loaded)
+
+
+def max_file_bytes() -> int:
+    return int(os.getenv("GENTICODE_MAX_FILE_BYTES", "1048576"))
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+
+# Normalized store written by `check` next to report.json (one finding per line)
+FINDINGS_FILE = "findings.jsonl"
+# A changed-files `check` writes its store here, leaving the full run's intact
+SCOPED_FINDINGS_FILE = "findings-changed.jsonl"
+# Per-pack stores under raw/, merged into FINDINGS_FILE for the packs that ran
+PACK_FILE = "findings-{pack}.jsonl"
+
+FIELDS = ("fingerprint", "pack", "rule", "severity", "file", "start", "end", "message", "snippet_hash")
+
+_WS = re.compile(r"\s+")
+
+
+def snippet_hash(text: str) -> str:
+    """Hash of the flagged code with whitespace runs collapsed, so reindenting keeps it."""
+    norm = _WS.sub(" ", text).strip()
+    return hashlib.sha256(norm.encode("utf-8", errors="replace")).hexdigest()[:16]
+
+
+def rel_path(root: Path, path: str | os.PathLike) -> str:
+    p = Path(path)
+    if p.is_absolute():
+        try:
+            p = p.relative_to(root)
+        except ValueError:
+            pass
+    return p.as_posix()
+
+
+class SnippetReader:
+    """Source lines for findings, reading each file at most once."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._lines: dict[str, list[str]] = {}
+
+    def get(self, rel: str, start: int, end: int | None = None) -> str:
+        lines = self._lines.get(rel)
+        if lines is None:
+            try:
+                lines = (self.root / rel).read_text(encoding="utf-8", errors="replace").splitlines()
+            except OSError:
+                lines = []
+            self._lines[rel] = lines
+        lo = max(1, int(start))
+        return "\n".join(lines[lo - 1 : max(lo, int(end or lo))])
+
+
+def fingerprint_all(records: list[dict]) -> list[dict]:
+    """Assign stable fingerprints in place and return `records` in store order.
+
+    A fingerprint covers (pack, rule, file, snippet hash, occurrence): the
+    occurrence is the finding's rank among identical snippets for that rule
+    in the file, so it survives edits that only shift line numbers.
+    """
+    records.sort(key=lambda r: (r["pack"], r["file"], int(r.get("start") or 0), r["rule"]))
+    seen: dict[tuple, int] = {}
+    for r in records:
+        key = (r["pack"], r["rule"], r["file"], r["snippet_hash"])
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        raw = "\0".join((*key, str(n)))
+        r["fingerprint"] = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+    return records
+
+
+def record(pack: str, rule: str, severity: str, file: str, start: int, end: int | None, message: str, snippet: str) -> dict:
+    """One normalized finding (fingerprint assigned by `fingerprint_all`); the snippet itself is not stored."""
+    return {
+        "pack": pack,
+        "rule": str(rule),
+        "severity": str(severity).lower(),
+        "file": file,
+        "start": int(start),
+        "end": int(end or start),
+        "message": message,
+        "snippet_hash": snippet_hash(snippet),
+    }
+
+
+def write_store(path: Path, records: Iterable[dict]) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    n = 0
+    with open(tmp, "w", encoding="utf-8") as fh:
+        for r in records:
+            fh.write(json.dumps({k: r.get(k) for k in FIELDS}, separators=(",", ":")) + "\n")
+            n += 1
+    os.replace(tmp, path)
+    return n
+
+
+def iter_store(path: Path) -> Iterator[dict]:
+    """Records of a JSONL store; `.gz` stores (baseline history objects) are read transparently."""
+    if not path.exists():
+        return
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def merge_stores(raw_dir: Path, packs: Iterable[str], out: Path) -> int:
+    """Concatenate the per-pack stores of `packs` into `out`; returns the finding count."""
+
+    def records() -> Iterator[dict]:
+        for pack in packs:
+            yield from iter_store(raw_dir / PACK_FILE.format(pack=pack))
+
+    return write_store(out, records())
+
+
+def _bump(summary: dict, side: str, r: dict) -> None:
+    summary[side] += 1
+    by = summary[f"{side}_by_pack"].setdefault(r.get("pack") or "unknown", {})
+    sev = r.get("severity") or "info"
+    by[sev] = by.get(sev, 0) + 1
+
+
+def delta(
+    current: Path,
+    baseline: Path,
+    new_out: Path | None = None,
+    fixed_out: Path | None = None,
+    in_scope: Callable[[dict], bool] | None = None,
+) -> dict:
+    """Hash-join two stores on fingerprint in O(current + baseline).
+
+    Only baseline fingerprints are held in memory; both stores are streamed
+    once. New and fixed findings are optionally written to `new_out` and
+    `fixed_out`. Baseline findings for which `in_scope` is false (e.g. files
+    outside a changed-files run) are neither fixed nor unchanged.
+    """
+    base_fps = {r["fingerprint"] for r in iter_store(baseline)}
+    summary: dict = {"new": 0, "fixed": 0, "unchanged": 0, "new_by_pack": {}, "fixed_by_pack": {}}
+    matched: set[str] = set()
+
+    def new() -> Iterator[dict]:
+        for r in iter_store(current):
+            fp = r["fingerprint"]
+            if fp in base_fps:
+                matched.add(fp)
+                summary["unchanged"] += 1
+            else:
+                _bump(summary, "new", r)
+                yield r
+
+    def fixed() -> Iterator[dict]:
+        for r in iter_store(baseline):
+            if r["fingerprint"] not in matched and (in_scope is None or in_scope(r)):
+                _bump(summary, "fixed", r)
+                yield r
+
+    # Sequential: `fixed` needs every match from `new`
+    for side, out in ((new, new_out), (fixed, fixed_out)):
+        if out is not None:
+            write_store(out, side())
+        else:
+            for _ in side():
+                pass
+    return summary
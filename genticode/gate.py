@@ -1,20 +1,10 @@
 from __future__ import annotations
 
-from typing import Tuple
+import json
+from dataclasses import dataclass
+from functools import lru_cache
 
-
-def _get_sev_counts(report: dict, pack: str) -> dict:
-    for p in (report.get("packs", []) or []):
-        if p.get("name") == pack:
-            return (p.get("counts", {}).get("by_severity") or {})
-    return {}
-
-
-def _get_counts_map(report: dict, pack: str, key: str) -> dict:
-    for p in (report.get("packs", []) or []):
-        if p.get("name") == pack:
-            return (p.get("counts", {}).get(key)) or {}
-    return {}
+from . import perfhistory
 
 
 PACK_COUNT_KEYS = {
@@ -25,131 +15,258 @@ PACK_COUNT_KEYS = {
     "traceability": "ac_ids",
 }
 
+# Packs whose findings are fingerprinted: when `check` computed a findings
+# delta, delta rules on their by_severity counters count genuinely new findings
+FINGERPRINT_PACKS = ("static", "supply")
+
+# Comparisons: absolute value, increase over the baseline, factor of the baseline
+KINDS = ("max", "delta_max", "ratio_max")
+# Rule phases: "hard", "soft" (any other phase) or None for every phase
+RULE_PHASES = ("hard", "soft")
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    # Selector `<pack>.<counter path>`; pack "*" matches every pack in the report
+    pack: str
+    path: str
+    kind: str
+    limit: float
+    phase: str | None = None
+    # Restricts a "*" selector to these packs
+    packs: frozenset = frozenset()
+    # A baseline suppression for the pack waives a breach
+    suppressible: bool = False
+
+    @property
+    def select(self) -> str:
+        return f"{self.pack}.{self.path}"
+
+
+def _flatten(counts: dict, prefix: str, out: dict) -> None:
+    for k, v in counts.items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            _flatten(v, key + ".", out)
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[key] = v
+
+
+def index_report(report: dict | None) -> dict[str, dict[str, float]]:
+    """pack -> {counter path: value} for every numeric counter, nested maps dotted.
+
+    Telemetry metrics are also addressable by bare name unless the pack has a
+    counter of that name (`prompt.cpu_user_ms` == `prompt.telemetry.cpu_user_ms`).
+    """
+    out: dict[str, dict[str, float]] = {}
+    for p in ((report or {}).get("packs", []) or []):
+        name = p.get("name")
+        if not name:
+            continue
+        counts = p.get("counts", {}) or {}
+        flat: dict[str, float] = {}
+        _flatten(counts, "", flat)
+        for k, v in (counts.get("telemetry") or {}).items():
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                flat.setdefault(k, v)
+        out[str(name)] = flat
+    return out
+
+
+def index_new(report: dict) -> dict[str, dict[str, float]] | None:
+    """pack -> {"by_severity.<sev>": new findings}, if a fingerprint delta was computed."""
+    fd = (report.get("delta") or {}).get("findings")
+    if not isinstance(fd, dict):
+        return None
+    return {
+        pack: {f"by_severity.{sev}": n for sev, n in (by or {}).items()}
+        for pack, by in (fd.get("new_by_pack") or {}).items()
+    }
+
+
+def _split(select: str) -> tuple[str, str]:
+    pack, _, path = str(select).partition(".")
+    if not pack or not path:
+        raise ValueError(f"budget selector {select!r} must be <pack>.<counter path>")
+    return pack, path
+
+
+def _generic_rules(specs: list) -> list[Rule]:
+    rules = []
+    for i, spec in enumerate(specs):
+        if not isinstance(spec, dict) or "select" not in spec:
+            raise ValueError(f"budgets.rules[{i}] must be a mapping with 'select'")
+        pack, path = _split(spec["select"])
+        phase = spec.get("phase")
+        if phase is not None and phase not in RULE_PHASES:
+            raise ValueError(f"budgets.rules[{i}].phase must be one of: {','.join(RULE_PHASES)}")
+        kinds = [k for k in KINDS if spec.get(k) is not None]
+        if not kinds:
+            raise ValueError(f"budgets.rules[{i}] needs one of: {','.join(KINDS)}")
+        for kind in kinds:
+            rules.append(
+                Rule(
+                    id=str(spec.get("id") or f"{spec['select']}:{kind}"),
+                    pack=pack,
+                    path=path,
+                    kind=kind,
+                    limit=float(spec[kind]),
+                    phase=phase,
+                    packs=frozenset(spec.get("packs") or ()),
+                    suppressible=kind == "delta_max",
+                )
+            )
+    return rules
+
 
-def _get_pack_count(report: dict, pack: str) -> int:
-    key = PACK_COUNT_KEYS.get(pack)
-    if not key:
-        return 0
-    for p in (report.get("packs", []) or []):
-        if p.get("name") == pack:
-            return int((p.get("counts", {}) or {}).get(key, 0))
-    return 0
+def _legacy_rules(budgets: dict) -> list[Rule]:
+    """The per-pack budget shapes, as rules."""
+    rules = [Rule("static.high", "static", "by_severity.high", "delta_max", int((budgets.get("static") or {}).get("high", 0)), suppressible=True)]
+    sup = budgets.get("supply") or {}
+    if sup:
+        limit = int(sup.get("high", sup.get("vuln_high", 0)) or 0)
+        rules.append(Rule("supply.high", "supply", "by_severity.high", "delta_max", limit, suppressible=True))
+    pb = budgets.get("prompt") or {}
+    if isinstance(pb, dict) and pb.get("lints"):
+        for code, limit in pb["lints"].items():
+            rules.append(Rule(f"prompt.lints.{code}", "prompt", f"lints.{code}", "delta_max", int(limit), suppressible=True))
+    tb = budgets.get("traceability") or {}
+    if tb.get("uncovered_max") is not None:
+        rules.append(Rule("traceability.uncovered_max", "traceability", "uncovered", "max", int(tb["uncovered_max"]), phase="hard"))
+    if tb.get("uncovered_delta_max") is not None:
+        rules.append(Rule("traceability.uncovered_delta_max", "traceability", "uncovered", "delta_max", int(tb["uncovered_delta_max"]), phase="soft"))
+    perf = budgets.get("performance") or {}
+    factor_max = float(perf.get("factor_max", 0) or 0)
+    if factor_max > 0:
+        rules.append(Rule("performance.factor_max", "*", "duration_ms", "ratio_max", factor_max))
+    if not isinstance(perf.get("history") or {}, dict):
+        raise ValueError("performance.history must be a mapping")
+    # performance.metrics.<metric> = {max, factor_max, packs}
+    for metric, spec in (perf.get("metrics") or {}).items():
+        spec = spec or {}
+        only = frozenset(spec.get("packs") or ())
+        if spec.get("max") is not None:
+            rules.append(Rule(f"performance.metrics.{metric}.max", "*", metric, "max", float(spec["max"]), packs=only))
+        m_factor = float(spec.get("factor_max", 0) or 0)
+        if m_factor > 0:
+            rules.append(Rule(f"performance.metrics.{metric}.factor_max", "*", metric, "ratio_max", m_factor, packs=only))
+    # <pack>.count: change in the pack's headline count
+    for pack, key in PACK_COUNT_KEYS.items():
+        b = budgets.get(pack)
+        if pack in ("static", "traceability") or not isinstance(b, dict) or not b:
+            continue
+        rules.append(Rule(f"{pack}.count", pack, key, "delta_max", int(b.get("count", 0)), suppressible=True))
+    return rules
+
+
+@lru_cache(maxsize=32)
+def _compile(key: str) -> tuple[Rule, ...]:
+    budgets = json.loads(key)
+    return tuple(_legacy_rules(budgets) + _generic_rules(budgets.get("rules") or []))
+
+
+def compile_budgets(budgets: dict | None) -> tuple[Rule, ...]:
+    """Compile policy budgets into rules, once per distinct budgets mapping.
+
+    Besides the per-pack shapes, `budgets.rules` lists generic rules:
+    `{select: <pack>.<counter path>, max | delta_max | ratio_max: N, phase?, packs?, id?}`.
+    Raises ValueError on a malformed rule.
+    """
+    budgets = budgets or {"static": {"high": 0}}
+    return _compile(json.dumps(budgets, sort_keys=True, default=str))
 
 
-def evaluate(report: dict, baseline: dict | None, budgets: dict | None = None, phase: str | None = None, suppressions: list[dict] | None = None) -> tuple[int, dict]:
+def evaluate(
+    report: dict,
+    baseline: dict | None,
+    budgets: dict | None = None,
+    phase: str | None = None,
+    suppressions: list[dict] | None = None,
+    history: dict[str, list[dict]] | None = None,
+) -> tuple[int, dict]:
     """Evaluate delta vs baseline under budgets.
 
     Returns (exit_code, summary)
     exit_code: 0 pass, 1 warn, 2 fail
+    summary["rules"] traces each rule and pack: value, limit and verdict
+    (pass, warn, fail, suppressed or skip). In a changed-files run the
+    counters of the packs listed in `report["scope"]["packs"]` cover only
+    the change set, so their baseline comparisons are skipped; fingerprinted
+    packs are still gated on their new findings. With `budgets.performance.history`
+    and a run `history` (see perfhistory), durations are also gated on their
+    recent distribution, traced in summary["performance_history"].
     """
-    budgets = budgets or {"static": {"high": 0}}
+    program = compile_budgets(budgets)
     phase = (phase or "new_code_only").lower()
     sup_packs = {s.get("pack") for s in (suppressions or [])}
+    breach_rc = 1 if phase == "warn" else 2
+
+    # Duration history needs no baseline
+    hist_spec = ((budgets or {}).get("performance") or {}).get("history")
+    hist_trace = perfhistory.check(report, history, hist_spec) if hist_spec and history is not None else None
+    hist_rc = breach_rc if any(t["verdict"] == "regress" for t in hist_trace or []) else 0
 
     # No baseline → pass for non-hard phases to bootstrap
     if baseline is None and phase != "hard":
-        return 0, {"reason": "no baseline"}
-
-    # Evaluate static via severity first
-    cur = _get_sev_counts(report, "static")
-    base = _get_sev_counts(baseline or {}, "static")
-    cur_h = int(cur.get("high", 0))
-    base_h = int(base.get("high", 0))
-    budget_h = int(budgets.get("static", {}).get("high", 0))
-
-    def decide(delta: int, budget: int, pack: str) -> int:
-        if pack in sup_packs and delta > 0:
-            return 0
-        if delta > budget:
-            return 1 if phase == "warn" else 2
-        return 0
-
-    # hard: absolute
-    if phase == "hard":
-        rc = decide(cur_h, budget_h, "static")
-    else:
-        rc = decide(max(0, cur_h - base_h), budget_h, "static")
-
-    # Evaluate Supply high vulns if budgeted
-    sup = (budgets.get("supply") if budgets else None) or {}
-    if sup:
-        cur_sup = _get_sev_counts(report, "supply")
-        base_sup = _get_sev_counts(baseline or {}, "supply")
-        cur_hs = int(cur_sup.get("high", 0))
-        base_hs = int(base_sup.get("high", 0))
-        budget_hs = int(sup.get("high", sup.get("vuln_high", 0)) or 0)
-        if phase == "hard":
-            rc = max(rc, decide(cur_hs, budget_hs, "supply"))
-        else:
-            rc = max(rc, decide(max(0, cur_hs - base_hs), budget_hs, "supply"))
+        summary = {"reason": "no baseline"}
+        if hist_trace is not None:
+            summary["performance_history"] = hist_trace
+        return hist_rc, summary
 
-    # Evaluate Prompt lints if budgeted
-    pb = (budgets.get("prompt") if budgets else None) or {}
-    if isinstance(pb, dict) and pb.get("lints"):
-        cur_lints = _get_counts_map(report, "prompt", "lints")
-        base_lints = _get_counts_map(baseline or {}, "prompt", "lints")
-        for code, limit in (pb.get("lints") or {}).items():
-            cur_c = int(cur_lints.get(code, 0))
-            base_c = int(base_lints.get(code, 0))
-            delta = cur_c if phase == "hard" else max(0, cur_c - base_c)
-            rc = max(rc, decide(delta, int(limit), "prompt"))
-
-    # Evaluate Traceability uncovered if budgeted
-    tb = (budgets.get("traceability") if budgets else None) or {}
-    if tb:
-        # current and baseline uncovered
-        def _uncovered(d: dict | None) -> int:
-            if not d:
-                return 0
-            for p in (d.get("packs", []) or []):
-                if p.get("name") == "traceability":
-                    return int((p.get("counts", {}) or {}).get("uncovered", 0))
-            return 0
-
-        cur_u = _uncovered(report)
-        base_u = _uncovered(baseline or {})
-        abs_budget = tb.get("uncovered_max")
-        delta_budget = tb.get("uncovered_delta_max")
-        if phase == "hard" and abs_budget is not None and cur_u > int(abs_budget):
-            rc = max(rc, 2)
-        if phase != "hard" and delta_budget is not None and max(0, cur_u - base_u) > int(delta_budget):
-            rc = max(rc, 1 if phase == "warn" else 2)
-
-    # Performance regression gate (factor over baseline)
-    perf = (budgets.get("performance") if budgets else None) or {}
-    factor_max = float(perf.get("factor_max", 0)) if perf else 0.0
-    if baseline is not None and factor_max and factor_max > 0:
-        # Build duration maps
-        def _durations(d: dict | None) -> dict[str, int]:
-            out: dict[str, int] = {}
-            if not d:
-                return out
-            for p in (d.get("packs", []) or []):
-                name = p.get("name")
-                dur = int((p.get("counts", {}) or {}).get("duration_ms", 0))
-                if name:
-                    out[str(name)] = dur
-            return out
-        cur_d = _durations(report)
-        base_d = _durations(baseline)
-        for name, cur_ms in cur_d.items():
-            base_ms = int(base_d.get(name, 0))
-            if base_ms > 0 and cur_ms > base_ms * factor_max:
-                rc = max(rc, 1 if phase == "warn" else 2)
-
-    # Evaluate other packs by count if budgets provided
-    for pack, key in PACK_COUNT_KEYS.items():
-        if pack == "static":
-            continue
-        if pack == "traceability":
-            continue
-        b = budgets.get(pack) if budgets else None
-        if not b:
+    hard = phase == "hard"
+    cur_idx = index_report(report)
+    base_idx = index_report(baseline)
+    new_idx = index_new(report)
+    scoped = set((report.get("scope") or {}).get("packs") or ())
+    empty: dict[str, float] = {}
+    rc = 0
+    trace: list[dict] = []
+
+    for rule in program:
+        if rule.phase is not None and (rule.phase == "hard") != hard:
+            trace.append({"rule": rule.id, "select": rule.select, "kind": rule.kind, "limit": rule.limit, "verdict": "skip"})
             continue
-        budget_count = int(b.get("count", 0))
-        cur_c = _get_pack_count(report, pack)
-        base_c = _get_pack_count(baseline or {}, pack)
-        delta = cur_c if phase == "hard" else max(0, cur_c - base_c)
-        rc = max(rc, decide(delta, budget_count, pack))
+        if rule.pack == "*":
+            targets = [(p, vals[rule.path]) for p, vals in cur_idx.items() if rule.path in vals and (not rule.packs or p in rule.packs)]
+        else:
+            targets = [(rule.pack, cur_idx.get(rule.pack, empty).get(rule.path, 0))]
+        for pack, cur in targets:
+            base = base_idx.get(pack, empty).get(rule.path, 0)
+            fingerprinted = new_idx is not None and pack in FINGERPRINT_PACKS and rule.path.startswith("by_severity.")
+            if pack in scoped and (rule.kind == "ratio_max" or (rule.kind == "delta_max" and not hard and not fingerprinted)):
+                # A change-set count against a whole-tree baseline says nothing
+                trace.append({"rule": rule.id, "select": f"{pack}.{rule.path}", "kind": rule.kind, "limit": rule.limit, "verdict": "skip", "reason": "scoped"})
+                continue
+            if rule.kind == "max":
+                value, breach = cur, cur > rule.limit
+            elif rule.kind == "ratio_max":
+                if base <= 0:
+                    continue
+                value, breach = round(cur / base, 4), cur > base * rule.limit
+            elif hard:
+                # No baseline allowance in the hard phase
+                value = cur
+                breach = value > rule.limit
+            else:
+                if fingerprinted:
+                    # Fingerprints catch a fixed finding swapped for a new one; totals don't
+                    value = new_idx.get(pack, empty).get(rule.path, 0)
+                else:
+                    value = max(0, cur - base)
+                breach = value > rule.limit
+            if not breach:
+                verdict = "pass"
+            elif rule.suppressible and pack in sup_packs and value > 0:
+                verdict = "suppressed"
+            else:
+                verdict = "warn" if breach_rc == 1 else "fail"
+                rc = max(rc, breach_rc)
+            trace.append(
+                {"rule": rule.id, "select": f"{pack}.{rule.path}", "kind": rule.kind, "limit": rule.limit, "value": value, "verdict": verdict}
+            )
 
-    return rc, {"phase": phase}
+    summary = {"phase": phase, "rules": trace}
+    if hist_trace is not None:
+        summary["performance_history"] = hist_trace
+    return max(rc, hist_rc), summary
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+
+class GitDiffError(Exception):
+    pass
+
+
+def _git_lines(root: Path, args: list[str]) -> list[str]:
+    try:
+        cp = subprocess.run(["git", *args], cwd=str(root), capture_output=True, text=True, check=False)
+    except FileNotFoundError as e:
+        raise GitDiffError("git not found on PATH") from e
+    if cp.returncode != 0:
+        raise GitDiffError((cp.stderr or cp.stdout or "git failed").strip())
+    return [ln.strip() for ln in cp.stdout.splitlines() if ln.strip()]
+
+
+def changed_files(root: Path, since: str | None = None, staged: bool = False) -> list[str]:
+    """Return root-relative POSIX paths added/copied/modified/renamed.
+
+    - `staged=True`: only the index (pre-commit), i.e. `git diff --cached`.
+    - `since=<ref>`: working tree vs `<ref>`, plus untracked files.
+    Deleted files are omitted since there is nothing left to scan.
+    """
+    if staged:
+        names = _git_lines(root, ["diff", "--cached", "--name-only", "--diff-filter=ACMRT", "--relative"])
+    elif since:
+        names = _git_lines(root, ["diff", "--name-only", "--diff-filter=ACMRT", "--relative", since])
+        names += _git_lines(root, ["ls-files", "--others", "--exclude-standard"])
+    else:
+        raise GitDiffError("either a ref or staged=True is required")
+    return sorted(set(names))
+
+
+def head(root: Path) -> tuple[str, str | None]:
+    """(HEAD commit SHA, current branch or None when detached)."""
+    sha = _git_lines(root, ["rev-parse", "HEAD"])[0]
+    branch = _git_lines(root, ["rev-parse", "--abbrev-ref", "HEAD"])[0]
+    return sha, (None if branch == "HEAD" else branch)
+
+
+def merge_base(root: Path, ref: str, other: str = "HEAD") -> str | None:
+    """Best common ancestor of `other` and `ref`, or None if `ref` doesn't resolve."""
+    try:
+        lines = _git_lines(root, ["merge-base", other, ref])
+    except GitDiffError:
+        return None
+    return lines[0] if lines else None
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import signal
+from typing import Any, Callable
+
+
+# Time a spawned child gets to start (interpreter start-up, imports, argument
+# unpickling) before the pack's own deadline begins
+SPAWN_ALLOWANCE_S = 20.0
+
+
+class IsolationTimeout(TimeoutError):
+    pass
+
+
+class IsolationError(RuntimeError):
+    pass
+
+
+def _limit_memory(memory_mb: int | None) -> None:
+    if not memory_mb:
+        return
+    try:
+        import resource  # POSIX only
+
+        limit = int(memory_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except Exception:  # pragma: no cover - platform without RLIMIT_AS
+        pass
+
+
+def _child(conn, func: Callable[..., Any], args: tuple, kwargs: dict, memory_mb: int | None) -> None:
+    # Own process group: a kill on timeout also reaches tools the pack spawned
+    try:
+        os.setsid()
+    except Exception:  # pragma: no cover - non-POSIX
+        pass
+    _limit_memory(memory_mb)
+    try:
+        conn.send(("started", None))
+        conn.send(("ok", func(*args, **kwargs)))
+    except MemoryError:
+        conn.send(("error", f"memory limit exceeded ({memory_mb} MiB)"))
+    except BaseException as e:  # noqa: BLE001 — report anything back to the parent
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _kill_tree(proc) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except Exception:
+        proc.kill()
+    proc.join(5)
+
+
+def _recv(conn, proc) -> tuple[str, Any]:
+    try:
+        return conn.recv()
+    except EOFError:
+        proc.join(5)
+        raise IsolationError(f"pack process exited with code {proc.exitcode}")
+
+
+def run_isolated(
+    func: Callable[..., Any],
+    args: tuple = (),
+    kwargs: dict | None = None,
+    timeout_s: float | None = None,
+    memory_mb: int | None = None,
+) -> Any:
+    """Call `func(*args, **kwargs)` in a killable child process.
+
+    The wall-clock deadline starts once the child reports it is running;
+    start-up gets its own SPAWN_ALLOWANCE_S, past which IsolationError is
+    raised. On expiry of the deadline the child's whole process group
+    (including external tools it launched) is SIGKILLed and
+    IsolationTimeout is raised. `memory_mb` caps the child's address space
+    where the platform supports it. `func`, its arguments and its result
+    must be picklable.
+    """
+    ctx = mp.get_context("spawn")
+    recv, send = ctx.Pipe(duplex=False)
+    # Not daemonic: packs may start their own worker pools
+    proc = ctx.Process(target=_child, args=(send, func, args, kwargs or {}, memory_mb))
+    proc.start()
+    send.close()
+    try:
+        if not recv.poll(SPAWN_ALLOWANCE_S):
+            _kill_tree(proc)
+            raise IsolationError(f"pack process did not start within {SPAWN_ALLOWANCE_S}s")
+        status, payload = _recv(recv, proc)
+        if status == "started":
+            if not recv.poll(timeout_s):
+                _kill_tree(proc)
+                raise IsolationTimeout(f"killed after {timeout_s}s")
+            status, payload = _recv(recv, proc)
+    finally:
+        recv.close()
+    proc.join(5)
+    if status != "ok":
+        raise IsolationError(str(payload))
+    return payload
+
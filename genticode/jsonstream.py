@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TextIO
+
+
+CHUNK_CHARS = 1 << 20
+
+_DECODER = json.JSONDecoder()
+_WS = " \t\n\r"
+
+
+class _Stream:
+    """Buffered reader decoding one JSON value at a time from a text file."""
+
+    def __init__(self, fh: TextIO, chunk: int | None = None):
+        self.fh = fh
+        self.chunk = chunk or CHUNK_CHARS
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _more(self) -> bool:
+        # Read at least as much as is buffered so re-decoding a large value
+        # stays amortized linear
+        data = self.fh.read(max(self.chunk, len(self.buf) - self.pos))
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos :] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return ""
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"expected {ch!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                val, end = _DECODER.raw_decode(self.buf, self.pos)
+                # A value ending exactly at the buffer end (e.g. a number) may continue
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return val
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ValueError(f"invalid JSON: {e}") from None
+            self._more()
+
+
+def iter_members(path: Path, keys: Iterable[str]) -> Iterator[tuple[str, str | None, Any]]:
+    """Stream the values under top-level `keys` of a JSON object document.
+
+    Yields `(key, None, item)` for each element of an array, `(key, name,
+    value)` for each member of an object and `(key, None, value)` for a
+    scalar, decoding one element at a time so peak memory is bounded by the
+    largest element rather than the whole document. Other top-level values
+    are decoded and dropped. An empty file yields nothing; malformed JSON
+    raises ValueError.
+    """
+    wanted = set(keys)
+    with open(path, "r", encoding="utf-8", errors="replace") as fh:
+        s = _Stream(fh)
+        if s.peek() == "":
+            return
+        s.expect("{")
+        if s.peek() == "}":
+            return
+        while True:
+            key = s.value()
+            if not isinstance(key, str):
+                raise ValueError("object keys must be strings")
+            s.expect(":")
+            if key not in wanted:
+                s.value()
+            elif s.peek() == "[":
+                s.pos += 1
+                if s.peek() == "]":
+                    s.pos += 1
+                else:
+                    while True:
+                        yield key, None, s.value()
+                        if s.peek() == "]":
+                            s.pos += 1
+                            break
+                        s.expect(",")
+            elif s.peek() == "{":
+                s.pos += 1
+                if s.peek() == "}":
+                    s.pos += 1
+                else:
+                    while True:
+                        name = s.value()
+                        s.expect(":")
+                        yield key, str(name), s.value()
+                        if s.peek() == "}":
+                            s.pos += 1
+                            break
+                        s.expect(",")
+            else:
+                yield key, None, s.value()
+            if s.peek() == "}":
+                return
+            s.expect(",")
+
+
+def iter_items(path: Path, key: str) -> Iterator[Any]:
+    """Elements of the top-level array `key` (see `iter_members`)."""
+    for _, _, item in iter_members(path, (key,)):
+        yield item
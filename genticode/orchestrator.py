@@ -1,31 +1,68 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
 import concurrent.futures as cf
-import os
-import time
+from dataclasses import dataclass
+import json
 from pathlib import Path
+import shutil
+import subprocess
+import threading
+import time
 from typing import Callable, Dict
 
-from .report import add_pack_summary
+from .fileindex import HASHES_FILE, FileIndex, HashStore
+from .findings import PACK_FILE, SnippetReader, fingerprint_all, record, rel_path, write_store
+from .report import add_pack_summary, write_json
+from .isolate import run_isolated
+from .scheduler import CPU, EXTERNAL, IO, Job, run_jobs, spawn
+from . import telemetry, trace
+from .telemetry import count_cache, metered_call
 from .prompt import scan_repo as prompt_scan
+from .prompt.cache import PromptCache
 from .prompt.manifest import build_manifest, write_manifest
 from .static import maybe_run_semgrep, normalize_semgrep
+from .static.cache import SemgrepCache
 from .supply import maybe_cyclonedx_py, maybe_cyclonedx_npm, evaluate_licenses
-from .supply.vuln import maybe_pip_audit, maybe_npm_audit, normalize_pip_audit, normalize_npm_audit
+from .supply.cache import DEFAULT_VULN_TTL_S, SupplyCache, fingerprint
+from .supply.lockfiles import native_sbom, unlicensed
+from .supply.sbom import load_sbom
+from .supply.osv import default_db, match_components
+from .supply.vuln import load_npm_audit, load_pip_audit, maybe_pip_audit, maybe_npm_audit, normalize_pip_audit, normalize_npm_audit
 from .quality import maybe_run_quality
 from .traceability import load_priority
-from .traceability.parser import scan_test_coverage
+from .traceability.parser import find_id_hits, scan_test_coverage
 
 
 @dataclass
 class PackRunner:
     name: str
-    func: Callable[[Path, Path, object | None], dict]
+    func: Callable[..., dict]
+    # When True, run_all passes the shared FileIndex as `index=`
+    uses_index: bool = False
+    # When True, a full (unscoped, in-process) run starts the pack before the
+    # tree walk finishes, passing `index=` as a callable that waits for it
+    lazy_index: bool = False
+    # When True, the pack only sees the change set in changed-files mode
+    scoped: bool = False
+    # Scheduling: resource class, packs that must finish first, and a
+    # duration hint used until a previous report provides a real one
+    resource: str = CPU
+    deps: tuple[str, ...] = ()
+    expected_ms: int = 0
+
 
+def _scoped_targets(index: FileIndex | Callable[[], FileIndex] | None) -> list[str] | None:
+    """Root-relative paths to limit external tools to, or None for the full repo."""
+    if index is None or callable(index) or not index.scoped:
+        return None
+    return [e.rel for e in index]
 
-def run_prompt_pack(root: Path, gc_dir: Path, policy=None) -> dict:
-    spans = prompt_scan(root)
+
+def run_prompt_pack(root: Path, gc_dir: Path, policy=None, index: FileIndex | None = None) -> dict:
+    cache = PromptCache.load(gc_dir / "cache" / "prompt-spans.json")
+    spans = prompt_scan(root, index=index, cache=cache)
+    cache.save()
+    count_cache(cache.hits, cache.misses)
     manifest = build_manifest(spans)
     write_manifest(gc_dir / "prompts.manifest.json", manifest)
     # Emit spans for IDE surfacing
@@ -45,82 +82,222 @@ def run_prompt_pack(root: Path, gc_dir: Path, policy=None) -> dict:
     for it in manifest.get("items", []) or []:
         for code in it.get("lints", []) or []:
             lint_counts[code] = int(lint_counts.get(code, 0)) + 1
-    return {"prompts": len(manifest["items"]), "lints": lint_counts}
+    return {"prompts": len(manifest["items"]), "lints": lint_counts, "cache": cache.stats()}
+
 
+def run_static_pack(root: Path, gc_dir: Path, policy=None, index: FileIndex | Callable[[], FileIndex] | None = None) -> dict:
+    """Semgrep plus the secrets scanner.
 
-def run_static_pack(root: Path, gc_dir: Path, policy=None) -> dict:
+    Semgrep runs on its own thread next to the secrets scan; given `index` as
+    a callable (the tree walk still running), a cold semgrep cache lets it
+    start scanning before the walk completes.
+    """
     # derive ruleset configs from policy.pack["static"].ruleset (str or list)
     configs = None
     if getattr(policy, "packs", None) and "static" in policy.packs and policy.packs["static"].ruleset:
         rs = policy.packs["static"].ruleset
         configs = [rs] if isinstance(rs, str) else list(rs)
-    sg_raw = maybe_run_semgrep(root, gc_dir / "raw/semgrep.json", configs=configs)
+    sg_kwargs = {}
+    if index is not None:
+        sg_kwargs = {"index": index, "cache": SemgrepCache.load(gc_dir / "cache" / "semgrep-results.json")}
+        if getattr(policy, "packs", None) and "static" in policy.packs and getattr(policy.packs["static"], "cores", None):
+            sg_kwargs["cores"] = policy.packs["static"].cores
+        if _tool_timeout(policy, "static") is not None:
+            sg_kwargs["tool_timeout_s"] = _tool_timeout(policy, "static")
+    meter = telemetry.current()
+
+    def run_semgrep() -> dict | None:
+        with telemetry.attach(meter):
+            return maybe_run_semgrep(root, gc_dir / "raw/semgrep.json", configs=configs, targets=_scoped_targets(index), **sg_kwargs)
+
+    semgrep = spawn(run_semgrep, name="static-semgrep")
+    # secrets/PII detector
+    from .static.secrets import hits_by_rule, scan_repo_for_secrets
+    max_bytes = None
+    if getattr(policy, "packs", None) and "static" in policy.packs:
+        max_bytes = getattr(policy.packs["static"], "max_file_bytes", None)
+    secrets = scan_repo_for_secrets(root, index=index() if callable(index) else index, max_bytes=max_bytes)
+    sg_raw = semgrep.result()
+    reader = SnippetReader(root)
+    recs: list[dict] = []
     if sg_raw is None:
         counts = {"findings": 0, "by_severity": {}}
     else:
         findings = normalize_semgrep(sg_raw)
+        for f in findings:
+            rel = rel_path(root, f["file"]) if f.get("file") else ""
+            start, end = int(f.get("start") or 1), int(f.get("end") or f.get("start") or 1)
+            snippet = reader.get(rel, start, end) if rel else ""
+            recs.append(record("static", f.get("rule", ""), f.get("severity", "info"), rel, start, end, f.get("message", ""), snippet))
         sev_counts: dict[str, int] = {}
         for f in findings:
             sev = str(f.get("severity", "info")).lower()
             sev_counts[sev] = sev_counts.get(sev, 0) + 1
         counts = {"findings": len(findings), "by_severity": sev_counts}
-    # secrets/PII detector
-    from .static.secrets import scan_repo_for_secrets
-    secrets = scan_repo_for_secrets(root)
     counts["secrets"] = len(secrets)
+    counts["secrets_by_rule"] = hits_by_rule(secrets)
     # Count secrets as high severity for budgets
     counts.setdefault("by_severity", {})
     counts["by_severity"]["high"] = counts["by_severity"].get("high", 0) + len(secrets)
+    for sec in secrets:
+        # Only the hash of the matched line is stored, never the line itself
+        recs.append(record("static", f"secrets.{sec.rule}", "high", rel_path(root, sec.file), sec.line, sec.line, "possible secret", sec.text))
+    write_store(gc_dir / "raw" / PACK_FILE.format(pack="static"), fingerprint_all(recs))
     return counts
 
 
+def _tool_timeout(policy, pack: str) -> float | None:
+    pcfg = (getattr(policy, "packs", None) or {}).get(pack)
+    if pcfg is None:
+        return None
+    return getattr(pcfg, "tool_timeout_s", None) or getattr(pcfg, "timeout_s", None)
+
+
 def run_supply_pack(root: Path, gc_dir: Path, policy=None) -> dict:
-    # Invoke adapters unconditionally; adapters or tools decide provenance.
-    sbom_py = maybe_cyclonedx_py(root, gc_dir / "raw/sbom-python.json")
-    sbom_node = maybe_cyclonedx_npm(root, gc_dir / "raw/sbom-node.json")
     # Optional: enforce lockfile-only provenance via policy.licenses.lockfile_only
     try:
         lockfile_only = bool((getattr(policy, "licenses", None) or {}).get("lockfile_only", False))
     except Exception:
         lockfile_only = False
-    if lockfile_only:
-        has_py_lock = any((root / n).exists() for n in ["requirements.lock", "poetry.lock", "uv.lock", "pip-tools.lock"])
-        has_node_lock = any((root / n).exists() for n in ["package-lock.json", "pnpm-lock.yaml", "yarn.lock"])
-        if not has_py_lock:
-            sbom_py = None
-        if not has_node_lock:
-            sbom_node = None
+    has_py_lock = any((root / n).exists() for n in ["requirements.lock", "poetry.lock", "uv.lock", "pip-tools.lock"])
+    has_node_lock = any((root / n).exists() for n in ["package-lock.json", "pnpm-lock.yaml", "yarn.lock"])
     # License policy (allow/deny/unknown)
     allow = deny = None
     fail_unknown = True
-    if getattr(policy, "licenses", None):
+    license_policy = bool(getattr(policy, "licenses", None))
+    if license_policy:
         lp = policy.licenses or {}
         allow = set(lp.get("allow", []) or [])
         deny = set(lp.get("deny", []) or [])
         if "fail_on_unknown" in lp:
             fail_unknown = bool(lp.get("fail_on_unknown"))
+    # Invoke adapters unconditionally and concurrently; adapters or tools decide provenance.
+    # name: (adapter, raw artifact, loader for a cached artifact, cache TTL)
+    pcfg = (getattr(policy, "packs", None) or {}).get("supply")
+    vuln_ttl = getattr(pcfg, "cache_ttl_s", None)
+    vuln_ttl = DEFAULT_VULN_TTL_S if vuln_ttl is None else vuln_ttl
+    tools = {
+        "cyclonedx-py": (maybe_cyclonedx_py, gc_dir / "raw/sbom-python.json", load_sbom, None),
+        "cyclonedx-npm": (maybe_cyclonedx_npm, gc_dir / "raw/sbom-node.json", load_sbom, None),
+        "pip-audit": (maybe_pip_audit, gc_dir / "raw/pip-audit.json", load_pip_audit, vuln_ttl),
+        "npm-audit": (maybe_npm_audit, gc_dir / "raw/npm-audit.json", load_npm_audit, vuln_ttl),
+    }
+    # A local OSV index (`genticode supply db import`) replaces the networked audits
+    osv_db = default_db(gc_dir)
+    if osv_db.is_file():
+        del tools["pip-audit"], tools["npm-audit"]
+    provider = getattr(pcfg, "provider", None) or "auto"
+    native = {"cyclonedx-py": "python", "cyclonedx-npm": "node"}
+    timeout_s = _tool_timeout(policy, "supply")
+    cache = SupplyCache.load(gc_dir / "cache" / "supply")
+    meter = telemetry.current()
+    runs: dict[str, dict] = {}
+
+    def run_tool(name: str):
+        func, out, loader, ttl = tools[name]
+        t0 = time.perf_counter()
+        status, value = "ok", None
+        fallback = None
+        with telemetry.attach(meter):
+            if name in native and provider != "deep":
+                # Lockfile parsers: milliseconds, no subprocess; the tools remain the "deep" provider
+                with trace.span(f"lockfiles:{native[name]}", "parse"):
+                    value = native_sbom(root, native[name])
+                if value is not None and provider == "auto" and license_policy and unlicensed(value):
+                    # A license policy needs license data: try the deep tool, keep the lockfile SBOM as fallback
+                    fallback, value = value, None
+                elif value is not None or provider == "native":
+                    if value is not None:
+                        write_json(out, value)
+                    runs[name] = {
+                        "status": "native" if value is not None else "unavailable",
+                        "duration_ms": int((time.perf_counter() - t0) * 1000),
+                    }
+                    return name, value
+            fp = fingerprint(root, name)
+            hit = cache.lookup(name, fp, ttl_s=ttl)
+            if hit is not None:
+                try:
+                    out.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(hit, out)
+                    value, status = loader(out), "cached"
+                except Exception:
+                    hit = None
+            if hit is None:
+                try:
+                    # Never cache a stale artifact left by an earlier run
+                    out.unlink(missing_ok=True)
+                    value = func(root, out, timeout_s=timeout_s)
+                    # Adapters return None unless the tool exited normally with a parseable
+                    # artifact, so offline or failed runs are never cached as clean
+                    if value is None:
+                        status = "unavailable"
+                    elif out.exists():
+                        cache.store(name, fp, out)
+                except subprocess.TimeoutExpired:
+                    status = "timeout"
+                except Exception:
+                    status = "error"
+            if fallback is not None and not value:
+                write_json(out, fallback)
+                value, status = fallback, "native"
+            telemetry.count_cache(int(status == "cached"), int(status != "cached"))
+        runs[name] = {"status": status, "duration_ms": int((time.perf_counter() - t0) * 1000)}
+        return name, value
+
+    sbom_py = sbom_node = None
     lic_viol = 0
-    if sbom_py:
-        v, _ = evaluate_licenses(sbom_py, allow=allow, deny=deny, fail_on_unknown=fail_unknown)
-        lic_viol += v
-    if sbom_node:
-        v, _ = evaluate_licenses(sbom_node, allow=allow, deny=deny, fail_on_unknown=fail_unknown)
-        lic_viol += v
-    # Vulnerabilities
     vulns_total = 0
     by_sev: dict[str, int] = {}
-    pa = maybe_pip_audit(root, gc_dir / "raw/pip-audit.json")
-    if pa:
-        for v in normalize_pip_audit(pa):
-            vulns_total += 1
-            s = v.get("severity", "info")
-            by_sev[s] = by_sev.get(s, 0) + 1
-    na = maybe_npm_audit(root, gc_dir / "raw/npm-audit.json")
-    if na:
-        for v in normalize_npm_audit(na):
-            vulns_total += 1
-            s = v.get("severity", "info")
-            by_sev[s] = by_sev.get(s, 0) + 1
+    vuln_recs: list[dict] = []
+
+    def add_vuln(vuln: dict) -> None:
+        nonlocal vulns_total
+        vulns_total += 1
+        s = vuln.get("severity", "info")
+        by_sev[s] = by_sev.get(s, 0) + 1
+        pkg = str(vuln.get("package") or "")
+        rule = vuln.get("id") or vuln.get("tool") or "vuln"
+        vuln_recs.append(record("supply", rule, s, pkg, 0, 0, f"{pkg} {vuln.get('version') or ''}".strip(), str(vuln.get("version") or "")))
+
+    with cf.ThreadPoolExecutor(max_workers=len(tools), thread_name_prefix="supply-tool") as ex:
+        # Evaluate each result as it lands
+        for fut in cf.as_completed([ex.submit(run_tool, name) for name in tools]):
+            name, value = fut.result()
+            if not value:
+                continue
+            if name in ("cyclonedx-py", "cyclonedx-npm"):
+                if lockfile_only and not (has_py_lock if name == "cyclonedx-py" else has_node_lock):
+                    continue
+                if name == "cyclonedx-py":
+                    sbom_py = value
+                else:
+                    sbom_node = value
+                # Under a license policy, components without license data are unknown, not skipped
+                v, _ = evaluate_licenses(value, allow=allow, deny=deny, fail_on_unknown=fail_unknown, missing_unknown=license_policy)
+                lic_viol += v
+            else:
+                for vuln in (normalize_pip_audit if name == "pip-audit" else normalize_npm_audit)(value):
+                    add_vuln(vuln)
+    if osv_db.is_file():
+        t0 = time.perf_counter()
+        status = "ok"
+        try:
+            comps = [c for b in (sbom_py, sbom_node) if b for c in b.get("components", []) or []]
+            if not comps:
+                # Nothing to match is not a clean result
+                status = "unavailable"
+            else:
+                with trace.span("osv.match", "scan", components=len(comps)):
+                    matched = match_components(osv_db, comps)
+                write_json(gc_dir / "raw/osv.json", {"vulnerabilities": matched})
+                for vuln in matched:
+                    add_vuln(vuln)
+        except Exception:
+            status = "error"
+        runs["osv"] = {"status": status, "duration_ms": int((time.perf_counter() - t0) * 1000)}
+    cache.save()
+    write_store(gc_dir / "raw" / PACK_FILE.format(pack="supply"), fingerprint_all(vuln_recs))
     comp_py = len((sbom_py or {}).get("components", []) or [])
     comp_node = len((sbom_node or {}).get("components", []) or [])
     return {
@@ -129,58 +306,177 @@ def run_supply_pack(root: Path, gc_dir: Path, policy=None) -> dict:
         "by_severity": by_sev,
         "components": {"python": comp_py, "node": comp_node},
         "sbom_present": bool(sbom_py or sbom_node),
+        "tools": {name: runs[name] for name in (*tools, "osv") if name in runs},
     }
 
 
-def run_quality_pack(root: Path, gc_dir: Path, policy=None) -> dict:
-    return maybe_run_quality(root)
+def run_quality_pack(root: Path, gc_dir: Path, policy=None, index: FileIndex | None = None) -> dict:
+    return maybe_run_quality(root, paths=_scoped_targets(index), timeout_s=_tool_timeout(policy, "quality"))
 
 
-def run_traceability_pack(root: Path, gc_dir: Path, policy=None) -> dict:
+def run_traceability_pack(root: Path, gc_dir: Path, policy=None, index: FileIndex | None = None) -> dict:
     pr = load_priority(root / "PRIORITY.yaml")
     ids = pr.get("ids", []) or []
-    cov_map = scan_test_coverage(root, ids)
+    hits = find_id_hits(root, ids, index=index)
+    cov_map = scan_test_coverage(root, ids, hits=hits)
+    (gc_dir / "raw").mkdir(parents=True, exist_ok=True)
+    (gc_dir / "raw" / "traceability.json").write_text(
+        json.dumps(
+            {i: {"hits": len(locs), "locations": [{"file": f, "line": n} for f, n in locs]} for i, locs in hits.items()},
+            indent=2,
+            sort_keys=True,
+        )
+        + "\n"
+    )
     covered = sum(1 for k, v in cov_map.items() if v > 0)
     uncovered = max(0, len(ids) - covered)
     return {"ac_ids": len(ids), "covered": covered, "uncovered": uncovered}
 
 
 DEFAULT_PACKS: Dict[str, PackRunner] = {
-    "prompt": PackRunner("prompt", run_prompt_pack),
-    "static": PackRunner("static", run_static_pack),
-    "supply": PackRunner("supply", run_supply_pack),
-    "quality": PackRunner("quality", run_quality_pack),
-    "traceability": PackRunner("traceability", run_traceability_pack),
+    "prompt": PackRunner("prompt", run_prompt_pack, uses_index=True, scoped=True, resource=CPU, expected_ms=5_000),
+    "static": PackRunner("static", run_static_pack, uses_index=True, lazy_index=True, scoped=True, resource=EXTERNAL, expected_ms=120_000),
+    "supply": PackRunner("supply", run_supply_pack, resource=EXTERNAL, expected_ms=60_000),
+    "quality": PackRunner("quality", run_quality_pack, uses_index=True, scoped=True, resource=EXTERNAL, expected_ms=30_000),
+    "traceability": PackRunner("traceability", run_traceability_pack, uses_index=True, resource=CPU, expected_ms=1_000),
 }
 
+# Internal scheduler job that walks the tree for index-using packs
+INDEX_JOB = "_index"
+
+
+def _last_durations(gc_dir: Path) -> dict[str, int]:
+    """Per-pack duration_ms from the previous report.json (before it is overwritten)."""
+    try:
+        data = json.loads((gc_dir / "report.json").read_text())
+    except Exception:
+        return {}
+    out: dict[str, int] = {}
+    for p in (data.get("packs", []) or []):
+        dur = (p.get("counts", {}) or {}).get("duration_ms")
+        if p.get("name") and isinstance(dur, int) and dur > 0:
+            out[str(p["name"])] = dur
+    return out
+
 
-def run_all(policy, root: Path, gc_dir: Path, report: dict, packs: Dict[str, PackRunner] | None = None) -> dict:
+def run_all(
+    policy,
+    root: Path,
+    gc_dir: Path,
+    report: dict,
+    packs: Dict[str, PackRunner] | None = None,
+    index: FileIndex | None = None,
+    changed: list[str] | None = None,
+) -> dict:
+    """Run enabled packs through the scheduler and append their summaries to `report`.
+
+    Packs declare dependencies and a resource class on `PackRunner`; ready
+    packs start longest-expected-first (durations from the previous report,
+    falling back to `expected_ms`) within per-resource caps. The tree walk
+    for index-using packs is itself a job, so packs that don't need it (e.g.
+    supply) start without waiting for it, and `lazy_index` packs (static)
+    start alongside it in full runs. `changed` (root-relative paths)
+    enables changed-files mode: packs marked `scoped` only see those files
+    and are listed in `report["scope"]["packs"]`.
+    Packs with `isolate: true` in policy run in a child process that is
+    killed at the pack's `timeout_s`.
+    """
     packs = packs or DEFAULT_PACKS
-    tasks = []
-    with cf.ThreadPoolExecutor(max_workers=max(1, min(8, (os.cpu_count() or 2)))) as ex:
-        for name, runner in packs.items():
-            # Respect policy pack enable flag when present
-            enabled = True
-            timeout_s = 600
-            if getattr(policy, "packs", None) and name in policy.packs:
-                pcfg = policy.packs[name]
-                enabled = bool(pcfg.enabled)
-                timeout_s = int(getattr(pcfg, "timeout_s", timeout_s))
-            if not enabled:
+    selected = []
+    for name, runner in packs.items():
+        # Respect policy pack enable flag when present
+        pcfg = None
+        if getattr(policy, "packs", None) and name in policy.packs:
+            pcfg = policy.packs[name]
+            if not bool(pcfg.enabled):
                 continue
-            fut = ex.submit(runner.func, root, gc_dir, policy)
-            tasks.append((name, fut, timeout_s, time.perf_counter()))
-
-        for name, fut, timeout_s, t0 in tasks:
-            try:
-                counts = fut.result(timeout=timeout_s)
-                elapsed_ms = int((time.perf_counter() - t0) * 1000)
-                if isinstance(counts, dict):
-                    counts = {**counts, "duration_ms": elapsed_ms}
-                add_pack_summary(report, pack=name, counts=counts or {"duration_ms": elapsed_ms})
-            except cf.TimeoutError:
-                add_pack_summary(report, pack=name, counts={"error": "timeout", "timeout_s": timeout_s, "duration_ms": int(timeout_s * 1000)})
-            except Exception as e:  # noqa: BLE001 — continue on pack failure
-                elapsed_ms = int((time.perf_counter() - t0) * 1000)
-                add_pack_summary(report, pack=name, counts={"error": str(e), "duration_ms": elapsed_ms})
+        selected.append((name, runner, pcfg))
+
+    if changed is not None:
+        # Packs whose counts cover only the change set (see gate.evaluate)
+        report.setdefault("scope", {})["packs"] = [name for name, runner, _ in selected if runner.scoped]
+    history = _last_durations(gc_dir)
+    shared: dict[str, FileIndex | None] = {"full": index, "scoped": None}
+    index_built = threading.Event()
+    hashes: HashStore | None = None
+
+    def build_index() -> int:
+        nonlocal hashes
+        try:
+            full = shared["full"] if shared["full"] is not None else FileIndex.build(root)
+            # Unchanged files keep last run's hash: caches look them up unread
+            hashes = HashStore.load(gc_dir / "cache" / HASHES_FILE)
+            full.use_hashes(hashes)
+            shared["full"] = full
+            shared["scoped"] = full.restrict(changed) if changed is not None else full
+        finally:
+            index_built.set()
+        return len(full)
+
+    def wait_index() -> FileIndex:
+        index_built.wait()
+        if shared["scoped"] is None:
+            raise RuntimeError("file index unavailable")
+        return shared["scoped"]
+
+    def lazy(runner: PackRunner, pcfg) -> bool:
+        # Isolated packs can't share the callable; scoped runs need the change set resolved
+        return runner.lazy_index and changed is None and not (pcfg is not None and getattr(pcfg, "isolate", False))
+
+    def pack_call(runner: PackRunner, pcfg, timeout_s: int) -> Callable[[], dict]:
+        def call() -> dict:
+            if lazy(runner, pcfg):
+                kwargs = {"index": wait_index}
+            else:
+                kwargs = {"index": shared["scoped" if runner.scoped else "full"]} if runner.uses_index else {}
+            if pcfg is not None and getattr(pcfg, "isolate", False):
+                return run_isolated(
+                    metered_call, (runner.func, root, gc_dir, policy), kwargs, timeout_s=timeout_s, memory_mb=pcfg.memory_mb
+                )
+            return metered_call(runner.func, root, gc_dir, policy, **kwargs)
+
+        return call
+
+    jobs: list[Job] = []
+    if any(r.uses_index for _, r, _ in selected):
+        jobs.append(Job(INDEX_JOB, build_index, resource=IO, expected_ms=float("inf")))
+    timeouts: dict[str, int] = {}
+    for name, runner, pcfg in selected:
+        timeout_s = timeouts[name] = int(getattr(pcfg, "timeout_s", 600)) if pcfg is not None else 600
+        isolated = pcfg is not None and getattr(pcfg, "isolate", False)
+        deps = tuple(runner.deps) + ((INDEX_JOB,) if runner.uses_index and not lazy(runner, pcfg) else ())
+        expected = history.get(name, runner.expected_ms)
+        jobs.append(
+            Job(
+                name,
+                pack_call(runner, pcfg, timeout_s),
+                resource=runner.resource,
+                deps=deps,
+                expected_ms=expected,
+                # Isolated packs enforce (and kill at) their own deadline
+                timeout_s=None if isolated else timeout_s,
+            )
+        )
+
+    # A pack that fails or times out must not leave the previous run's findings behind
+    for name, _runner, _pcfg in selected:
+        (gc_dir / "raw" / PACK_FILE.format(pack=name)).unlink(missing_ok=True)
+    results = run_jobs(jobs)
+    if hashes is not None and shared["full"] is not None:
+        shared["full"].record_hashes(hashes)
+        hashes.save()
+    # Peak RSS is a process-wide high-water mark, not attributable to one pack
+    report["telemetry"] = telemetry.process_peaks()
+    for name, _runner, _pcfg in selected:
+        timeout_s = timeouts[name]
+        res = results[name]
+        if res.status == "ok":
+            counts = res.value
+            if isinstance(counts, dict):
+                counts = {**counts, "duration_ms": res.duration_ms, "queued_ms": res.queued_ms}
+            add_pack_summary(report, pack=name, counts=counts or {"duration_ms": res.duration_ms})
+        elif res.status == "timeout":
+            add_pack_summary(report, pack=name, counts={"error": "timeout", "timeout_s": timeout_s, "duration_ms": res.duration_ms})
+        else:
+            add_pack_summary(report, pack=name, counts={"error": str(res.error), "duration_ms": res.duration_ms})
     return report
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Iterable
+
+
+# Rolling per-pack run history under .genticode/, appended by every `check`
+HISTORY_FILE = "perf/history.json"
+# Runs kept per pack; the gate looks at the newest `window` of them
+MAX_RUNS = 100
+
+DEFAULT_WINDOW = 20
+DEFAULT_K = 3.0
+DEFAULT_MIN_RUNS = 5
+# A regression must also be this much slower than expected: sub-second
+# jitter on short packs is not worth failing a build over
+DEFAULT_FLOOR_MS = 250.0
+# After this many consecutive regressed runs the slowdown is the new normal:
+# the pack's history restarts from them
+DEFAULT_ACCEPT_AFTER = 5
+# Scales MAD to a standard-deviation estimate for normally distributed noise
+MAD_SCALE = 1.4826
+
+
+def history_path(gc_dir: Path) -> Path:
+    return gc_dir / HISTORY_FILE
+
+
+def load(gc_dir: Path) -> dict[str, list[dict]]:
+    try:
+        data = json.loads(history_path(gc_dir).read_text())
+        return {str(k): list(v) for k, v in (data.get("packs") or {}).items()}
+    except Exception:
+        return {}
+
+
+def samples(report: dict) -> dict[str, dict]:
+    """One sample per pack that completed: `duration_ms` and telemetry `files_scanned`."""
+    out: dict[str, dict] = {}
+    for p in (report.get("packs", []) or []):
+        counts = p.get("counts", {}) or {}
+        if not p.get("name") or "error" in counts or not isinstance(counts.get("duration_ms"), (int, float)):
+            continue
+        files = (counts.get("telemetry") or {}).get("files_scanned")
+        out[str(p["name"])] = {"duration_ms": counts["duration_ms"], "files": files if isinstance(files, int) else None}
+    return out
+
+
+def record(
+    gc_dir: Path,
+    report: dict,
+    commit: str | None = None,
+    now: float | None = None,
+    exclude: Iterable[str] = (),
+    accept_after: int = DEFAULT_ACCEPT_AFTER,
+) -> dict[str, list[dict]]:
+    """Append this report's samples to the history, keeping the newest MAX_RUNS per pack.
+
+    Samples of packs in `exclude` (those `check` found regressed) are kept
+    out of the statistics, so one slow run can't drag the median up. After
+    `accept_after` consecutive regressed runs (0 = never) the slowdown is
+    accepted: the pack's history restarts from those runs.
+    """
+    history = load(gc_dir)
+    ts = time.time() if now is None else now
+    skip = set(exclude)
+    for pack, s in samples(report).items():
+        runs = history.setdefault(pack, [])
+        runs.append({**s, "ts": ts, "commit": commit, **({"regressed": True} if pack in skip else {})})
+        streak = next((i for i, r in enumerate(reversed(runs)) if not r.get("regressed")), len(runs))
+        if pack in skip and accept_after > 0 and streak >= accept_after:
+            runs[:] = [{k: v for k, v in r.items() if k != "regressed"} for r in runs[-streak:]]
+        del runs[:-MAX_RUNS]
+    path = history_path(gc_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({"version": 1, "packs": history}, separators=(",", ":")) + "\n")
+    os.replace(tmp, path)
+    return history
+
+
+def _value(sample: dict, per_file: bool) -> float | None:
+    if not per_file:
+        return float(sample["duration_ms"])
+    files = sample.get("files")
+    return float(sample["duration_ms"]) / files if files else None
+
+
+def robust_threshold(values: list[float], k: float) -> tuple[float, float]:
+    """(median, median + k * scaled MAD) of `values`."""
+    med = statistics.median(values)
+    mad = statistics.median(abs(v - med) for v in values) * MAD_SCALE
+    return med, med + k * mad
+
+
+def check(report: dict, history: dict[str, list[dict]], spec: dict) -> list[dict]:
+    """Compare each pack's duration with its recent history.
+
+    `spec` is `budgets.performance.history`: `k`, `window`, `min_runs`,
+    `per_file` (normalize by files scanned), `floor_ms` (a regression must
+    also exceed the expected duration by this many ms, default
+    DEFAULT_FLOOR_MS), `accept_after` (see `record`) and `packs`. A pack
+    regresses when its value is above median + k * MAD of the last `window`
+    runs; packs with fewer than `min_runs` comparable runs are skipped.
+    Returns one trace entry per pack with a verdict of pass, regress or skip.
+    """
+    k = float(spec.get("k", DEFAULT_K))
+    window = int(spec.get("window", DEFAULT_WINDOW))
+    min_runs = max(1, int(spec.get("min_runs", DEFAULT_MIN_RUNS)))
+    per_file = bool(spec.get("per_file", False))
+    floor_ms = float(spec.get("floor_ms", DEFAULT_FLOOR_MS))
+    only = set(spec.get("packs") or [])
+    out: list[dict] = []
+    for pack, cur in samples(report).items():
+        if only and pack not in only:
+            continue
+        entry: dict = {"pack": pack, "duration_ms": cur["duration_ms"]}
+        out.append(entry)
+        value = _value(cur, per_file)
+        runs = [s for s in history.get(pack, []) if not s.get("regressed")][-window:]
+        past = [v for v in (_value(s, per_file) for s in runs) if v is not None]
+        if value is None or len(past) < min_runs:
+            entry.update({"runs": len(past), "verdict": "skip"})
+            continue
+        med, threshold = robust_threshold(past, k)
+        expected_ms = med * cur["files"] if per_file else med
+        regress = value > threshold and cur["duration_ms"] - expected_ms > floor_ms
+        entry.update(
+            {
+                "runs": len(past),
+                "value": round(value, 4),
+                "median": round(med, 4),
+                "threshold": round(threshold, 4),
+                "verdict": "regress" if regress else "pass",
+            }
+        )
+    return out
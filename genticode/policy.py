@@ -3,17 +3,35 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any, Dict, Optional
 
+from .gate import compile_budgets
+
 try:
     import yaml  # type: ignore
 except Exception as e:  # pragma: no cover
     yaml = None  # type: ignore
 
 
+SBOM_PROVIDERS = ("auto", "native", "deep")
+
+
 @dataclass
 class PackConfig:
     enabled: bool = True
     timeout_s: int = 600
     ruleset: Optional[str] = None
+    # Optional per-pack file size cap in bytes (None = scan files of any size)
+    max_file_bytes: Optional[int] = None
+    # Run the pack in a killable child process (hard timeout, optional memory cap)
+    isolate: bool = False
+    memory_mb: Optional[int] = None
+    # Core budget for sharded external tool runs (static: concurrent semgrep shards)
+    cores: Optional[int] = None
+    # Per external tool invocation limit (None = the pack's timeout_s)
+    tool_timeout_s: Optional[int] = None
+    # Max age of cached results that go stale without input changes (supply: audits)
+    cache_ttl_s: Optional[int] = None
+    # supply: SBOM provider — auto (lockfile parsers when a lockfile exists), native or deep (cyclonedx tools)
+    provider: Optional[str] = None
 
 
 @dataclass
@@ -85,6 +103,10 @@ def load(path) -> PolicyConfig:
         cfg.progressive_enforcement = {"phase": phase}
     if "budgets" in raw:
         cfg.budgets = dict(raw["budgets"])  # structure free-form per pack
+        try:
+            compile_budgets(cfg.budgets)
+        except (AttributeError, TypeError, ValueError) as e:
+            raise PolicyError(f"budgets: {e}")
     if "packs" in raw:
         packs: Dict[str, PackConfig] = {}
         for name, val in raw["packs"].items():
@@ -93,7 +115,36 @@ def load(path) -> PolicyConfig:
             enabled = bool(val.get("enabled", True))
             timeout_s = int(val.get("timeout_s", 600))
             ruleset = val.get("ruleset")
-            packs[name] = PackConfig(enabled=enabled, timeout_s=timeout_s, ruleset=ruleset)
+            max_file_bytes = val.get("max_file_bytes")
+            if max_file_bytes is not None and not isinstance(max_file_bytes, int):
+                raise PolicyError(f"pack '{name}'.max_file_bytes must be an integer")
+            memory_mb = val.get("memory_mb")
+            if memory_mb is not None and not isinstance(memory_mb, int):
+                raise PolicyError(f"pack '{name}'.memory_mb must be an integer")
+            cores = val.get("cores")
+            if cores is not None and not isinstance(cores, int):
+                raise PolicyError(f"pack '{name}'.cores must be an integer")
+            tool_timeout_s = val.get("tool_timeout_s")
+            if tool_timeout_s is not None and not isinstance(tool_timeout_s, int):
+                raise PolicyError(f"pack '{name}'.tool_timeout_s must be an integer")
+            cache_ttl_s = val.get("cache_ttl_s")
+            if cache_ttl_s is not None and not isinstance(cache_ttl_s, int):
+                raise PolicyError(f"pack '{name}'.cache_ttl_s must be an integer")
+            provider = val.get("provider")
+            if provider is not None and provider not in SBOM_PROVIDERS:
+                raise PolicyError(f"pack '{name}'.provider must be one of: {','.join(SBOM_PROVIDERS)}")
+            packs[name] = PackConfig(
+                enabled=enabled,
+                timeout_s=timeout_s,
+                ruleset=ruleset,
+                max_file_bytes=max_file_bytes,
+                isolate=bool(val.get("isolate", False)),
+                memory_mb=memory_mb,
+                cores=cores,
+                tool_timeout_s=tool_timeout_s,
+                cache_ttl_s=cache_ttl_s,
+                provider=provider,
+            )
         cfg.packs = packs
 
     # Optional license rules (allow/deny/fail_on_unknown)
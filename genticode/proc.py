@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from . import trace
+from .telemetry import count_tool_wait, tool_call
+
+
+# Assumed peak memory of one external tool when sizing the slot pool
+TOOL_MEMORY_MB = 1024
+# Bytes of stderr kept for error reporting; the rest stays on disk until the call returns
+STDERR_TAIL = 8192
+
+_which_cache: dict[tuple[str, str], str | None] = {}
+_which_lock = threading.Lock()
+_slots: threading.BoundedSemaphore | None = None
+_slots_lock = threading.Lock()
+
+
+class ToolRun(subprocess.CompletedProcess):
+    """CompletedProcess plus the invocation's timing (`duration_s`, `wait_s` for a slot)."""
+
+    def __init__(self, args, returncode: int, stdout=None, stderr=None, duration_s: float = 0.0, wait_s: float = 0.0):
+        super().__init__(args, returncode, stdout, stderr)
+        self.duration_s = duration_s
+        self.wait_s = wait_s
+
+
+def which(name: str) -> str | None:
+    """`shutil.which`, cached per (name, PATH) for the life of the process."""
+    key = (name, os.environ.get("PATH", ""))
+    with _which_lock:
+        if key in _which_cache:
+            return _which_cache[key]
+    found = shutil.which(name)
+    with _which_lock:
+        _which_cache[key] = found
+    return found
+
+
+def clear_which_cache() -> None:
+    with _which_lock:
+        _which_cache.clear()
+
+
+def tool_slots() -> int:
+    """Concurrent external tools allowed: GENTICODE_TOOL_SLOTS, else min(cores, RAM / TOOL_MEMORY_MB)."""
+    val = os.getenv("GENTICODE_TOOL_SLOTS")
+    if val:
+        return max(1, int(val))
+    cores = os.cpu_count() or 1
+    try:
+        mem_mb = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):  # pragma: no cover - non-POSIX
+        return cores
+    return max(1, min(cores, int(mem_mb // TOOL_MEMORY_MB)))
+
+
+def reset_slots() -> None:
+    """Drop the slot pool so the next call re-reads `tool_slots()`."""
+    global _slots
+    with _slots_lock:
+        _slots = None
+
+
+@contextmanager
+def slot(name: str) -> Iterator[float]:
+    """Hold one of the process-wide tool slots; yields the seconds spent waiting."""
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(tool_slots())
+        pool = _slots
+    t0 = time.perf_counter()
+    if not pool.acquire(blocking=False):
+        with trace.span(f"{name} (queued)", "schedule"):
+            pool.acquire()
+    waited = time.perf_counter() - t0
+    count_tool_wait(waited)
+    try:
+        yield waited
+    finally:
+        pool.release()
+
+
+def _kill_group(proc: subprocess.Popen) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except Exception:
+        proc.kill()
+
+
+def _tail(fh) -> str:
+    fh.flush()
+    size = fh.seek(0, os.SEEK_END)
+    fh.seek(max(0, size - STDERR_TAIL))
+    return fh.read().decode("utf-8", errors="replace")
+
+
+def run_tool(
+    cmd: list[str], cwd: Path | None, stdout, check: bool = False, timeout_s: float | None = None, name: str | None = None
+) -> ToolRun:
+    """Run `cmd` under a tool slot with stdout written to the binary file `stdout`.
+
+    The tool gets its own session, so when `timeout_s` (counted from the
+    start of the process, not the wait for a slot) expires its whole process
+    tree is killed and TimeoutExpired propagates. stderr is spooled to a
+    temporary file and only its tail is kept. A non-zero exit with `check`
+    raises CalledProcessError.
+    """
+    name = name or cmd[0]
+    with slot(name) as waited, tool_call(name), tempfile.TemporaryFile() as err:
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(cmd, cwd=None if cwd is None else str(cwd), stdout=stdout, stderr=err, start_new_session=True)
+        try:
+            rc = proc.wait(timeout=timeout_s)
+        except subprocess.TimeoutExpired:
+            _kill_group(proc)
+            proc.wait()
+            raise subprocess.TimeoutExpired(cmd, timeout_s) from None
+        except BaseException:
+            _kill_group(proc)
+            proc.wait()
+            raise
+        run = ToolRun(cmd, rc, None, _tail(err), time.perf_counter() - t0, waited)
+    if check and rc != 0:
+        raise subprocess.CalledProcessError(rc, cmd, None, run.stderr)
+    return run
+
+
+def run_to_file(
+    cmd: list[str], cwd: Path | None, out_path: Path, check: bool = False, timeout_s: float | None = None, name: str | None = None
+) -> ToolRun:
+    """Run `cmd` with stdout streamed straight to `out_path`.
+
+    The output is never held in memory; `out_path` receives the tool's bytes
+    unchanged, replaced atomically once the process exits. On a non-zero
+    exit with `check`, CalledProcessError propagates and `out_path` is left
+    untouched, as it is when `timeout_s` expires (TimeoutExpired propagates).
+    """
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + ".part")
+    try:
+        with open(tmp, "wb") as fh:
+            run = run_tool(cmd, cwd, fh, check=check, timeout_s=timeout_s, name=name)
+        os.replace(tmp, out_path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return run
+
+
+def run_capture(
+    cmd: list[str], cwd: Path | None, check: bool = False, timeout_s: float | None = None, name: str | None = None
+) -> ToolRun:
+    """Run `cmd` and return its stdout as text, spooled through a temporary file."""
+    with tempfile.TemporaryFile() as fh:
+        run = run_tool(cmd, cwd, fh, check=check, timeout_s=timeout_s, name=name)
+        fh.seek(0)
+        run.stdout = fh.read().decode("utf-8", errors="replace")
+    return run
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from ..cache import DEFAULT_MAX_ENTRIES, ContentCache
+
+
+# Bump whenever detection heuristics change so stale spans are never reused
+DETECTOR_VERSION = "1"
+
+__all__ = ["DEFAULT_MAX_ENTRIES", "DETECTOR_VERSION", "PromptCache"]
+
+
+class PromptCache(ContentCache):
+    """Content-addressed per-file span cache for the prompt pack.
+
+    Entries are keyed by (detector version, file suffix, content sha256) and
+    hold `[start, end, text]` triples; the file path is supplied on lookup so
+    identical files share one entry. Stored under `.genticode/cache/`;
+    `max_entries` defaults to env `GENTICODE_PROMPT_CACHE_MAX`, `max_bytes`
+    to `GENTICODE_PROMPT_CACHE_MAX_BYTES`.
+    """
+
+    version = DETECTOR_VERSION
+    field = "spans"
+    max_env = "GENTICODE_PROMPT_CACHE_MAX"
+    max_bytes_env = "GENTICODE_PROMPT_CACHE_MAX_BYTES"
+
+    @staticmethod
+    def key(suffix: str, sha256: str) -> str:
+        return f"{DETECTOR_VERSION}:{suffix}:{sha256}"
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import ast
+import concurrent.futures as cf
 import hashlib
+import multiprocessing as mp
 import os
 import re
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, Iterator
-import os
+
+from ..fileindex import FileIndex, max_file_bytes
+from ..scheduler import cpu_budget
+from ..telemetry import children, count_files
+from ..trace import span
+from .cache import PromptCache
 
 
 PROMPT_KEYWORDS = (
@@ -56,11 +63,12 @@ def _is_prompt_like(text: str) -> bool:
     return False
 
 
-def _scan_python(path: Path) -> Iterator[PromptSpan]:
-    try:
-        src = path.read_text(encoding="utf-8", errors="ignore")
-    except Exception:
-        return iter(())
+PROMPT_SUFFIXES = (".py", ".js", ".ts", ".tsx", ".jsx")
+# Generated and non-source trees skipped by the prompt pack (dir prefixes)
+PROMPT_EXCLUDE_DIRS = (".venv", "ssot", "images", "docs/templates", "build", "dist")
+
+
+def _scan_python(path: Path, src: str) -> Iterator[PromptSpan]:
     try:
         tree = ast.parse(src)
     except SyntaxError:
@@ -79,11 +87,7 @@ def _scan_python(path: Path) -> Iterator[PromptSpan]:
 _JS_STRING_RE = re.compile(r"`[^`]+`|\"[^\n\r\"]{80,}?\"|'[^\n\r']{80,}?'", re.S)
 
 
-def _scan_js_ts(path: Path) -> Iterator[PromptSpan]:
-    try:
-        src = path.read_text(encoding="utf-8", errors="ignore")
-    except Exception:
-        return iter(())
+def _scan_js_ts(path: Path, src: str) -> Iterator[PromptSpan]:
     for m in _JS_STRING_RE.finditer(src):
         s = m.group(0)
         # Strip quotes/backticks
@@ -99,33 +103,144 @@ def _scan_js_ts(path: Path) -> Iterator[PromptSpan]:
             yield PromptSpan(path, start_line, end_line, txt)
 
 
-def scan_paths(paths: Iterable[Path]) -> list[PromptSpan]:
-    spans: list[PromptSpan] = []
+def _scan_file(path: Path, src: str) -> list[PromptSpan]:
+    if path.suffix == ".py":
+        return list(_scan_python(path, src))
+    if path.suffix in PROMPT_SUFFIXES:
+        return list(_scan_js_ts(path, src))
+    return []
+
+
+def _read_text(path: Path, index: FileIndex | None) -> str | None:
+    """Decoded content, preferring the shared index."""
+    entry = index.get(path) if index is not None else None
+    try:
+        data = entry.read_bytes() if entry is not None else path.read_bytes()
+    except Exception:
+        return None
+    return data.decode("utf-8", errors="ignore")
+
+
+def _content_sha(path: Path, index: FileIndex | None) -> str | None:
+    entry = index.get(path) if index is not None else None
+    try:
+        return entry.sha256 if entry is not None else hashlib.sha256(path.read_bytes()).hexdigest()
+    except Exception:
+        return None
+
+
+# Below this many files to parse, process start-up costs more than it saves:
+# a spawn worker takes ~0.1s to start, serial parsing ~80us per file (see
+# scripts/bench_prompt_scan.py)
+PARALLEL_MIN_FILES = 4096
+
+
+def prompt_workers() -> int:
+    """Worker processes for prompt parsing.
+
+    GENTICODE_PROMPT_WORKERS when set (> 0); otherwise the scheduler's CPU
+    budget for the running pack, so the pool doesn't oversubscribe cores
+    other CPU jobs hold. One core means a serial scan.
+    """
+    n = int(os.getenv("GENTICODE_PROMPT_WORKERS", "0"))
+    return n if n > 0 else cpu_budget()
+
+
+def _scan_chunk(paths: list[str]) -> list[tuple[str | None, list[tuple[int, int, str]]]]:
+    # Runs in a worker process: it reads its own files, so only paths go out
+    # and (content sha256, plain span tuples) come back
+    out: list[tuple[str | None, list[tuple[int, int, str]]]] = []
     for p in paths:
-        if p.suffix == ".py":
-            spans.extend(list(_scan_python(p)))
-        elif p.suffix in {".js", ".ts", ".tsx", ".jsx"}:
-            spans.extend(list(_scan_js_ts(p)))
+        try:
+            data = Path(p).read_bytes()
+        except Exception:
+            out.append((None, []))
+            continue
+        found = _scan_file(Path(p), data.decode("utf-8", errors="ignore"))
+        out.append((hashlib.sha256(data).hexdigest(), [(s.start, s.end, s.text) for s in found]))
+    return out
+
+
+def _chunks(items: list, n: int) -> list[list]:
+    size = max(1, -(-len(items) // n))
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _parse_pending(
+    pending: list[tuple[Path, str | None]], workers: int, index: FileIndex | None = None
+) -> list[tuple[str | None, list[PromptSpan]]]:
+    """Parse (path, content sha256) pairs, fanning out to a process pool when worthwhile.
+
+    Returns (sha256 of the content parsed, spans) in input order, so merging
+    stays deterministic. Workers read the files themselves; their sha256
+    describes what they read, should a file change after it was hashed.
+    """
+    if workers > 1 and len(pending) >= PARALLEL_MIN_FILES:
+        # A few chunks per worker evens out skew from a handful of huge files
+        chunks = _chunks([str(p) for p, _ in pending], workers * 4)
+        try:
+            # spawn: forking from run_all's worker threads is not safe
+            # Workers are reaped on shutdown, inside the block: their CPU counts for the pack
+            with children(), cf.ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as ex:
+                raw = [r for chunk in ex.map(_scan_chunk, chunks) for r in chunk]
+        except Exception:  # noqa: BLE001 — no usable pool (sandbox, spawn failure): stay serial
+            raw = None
+        if raw is not None:
+            return [(sha, [PromptSpan(p, a, b, t) for a, b, t in found]) for (p, _), (sha, found) in zip(pending, raw)]
+    out: list[tuple[str | None, list[PromptSpan]]] = []
+    for p, sha in pending:
+        src = _read_text(p, index)
+        out.append((sha, _scan_file(p, src) if src is not None else []))
+    return out
+
+
+def scan_paths(
+    paths: Iterable[Path],
+    index: FileIndex | None = None,
+    cache: PromptCache | None = None,
+    workers: int | None = 1,
+) -> list[PromptSpan]:
+    """Scan the given files; content comes from `index` when it covers a path.
+
+    With a `cache`, files whose content hash is already known reuse their
+    cached spans instead of being re-parsed. `workers` > 1 parses the
+    remaining files in a process pool (`None` picks `prompt_workers()`).
+    """
+    spans: list[PromptSpan] = []
+    pending: list[tuple[Path, str | None]] = []
+    with span("prompt.read", "io"):
+        for p in paths:
+            if p.suffix not in PROMPT_SUFFIXES:
+                continue
+            # Only the cache needs the hash up front; parsing reads the file itself
+            sha = _content_sha(p, index) if cache is not None else None
+            if cache is not None:
+                if sha is None:
+                    continue
+                hit = cache.get(cache.key(p.suffix, sha))
+                if hit is not None:
+                    spans.extend(PromptSpan(p, int(a), int(b), str(t)) for a, b, t in hit)
+                    continue
+            pending.append((p, sha))
+    n_workers = prompt_workers() if workers is None else int(workers)
+    with span("prompt.parse", "parse", files=len(pending), workers=n_workers):
+        results = _parse_pending(pending, n_workers, index)
+    for (p, _), (sha, found) in zip(pending, results):
+        if cache is not None and sha is not None:
+            cache.put(cache.key(p.suffix, sha), [[s.start, s.end, s.text] for s in found])
+        spans.extend(found)
     # Deterministic: sort by file, start
     spans.sort(key=lambda s: (str(s.file), s.start, s.end))
     return spans
 
 
-def scan_repo(root: Path) -> list[PromptSpan]:
-    candidates: list[Path] = []
-    max_bytes = int(os.getenv("GENTICODE_MAX_FILE_BYTES", "1048576"))
-    for dirpath, dirnames, filenames in os.walk(root):
-        # Skip common vendor and internal dirs
-        rel = os.path.relpath(dirpath, root)
-        if (rel.startswith(".git") or rel.startswith(".genticode") or rel.startswith(".venv") or "node_modules" in rel or rel.startswith("ssot") or rel.startswith("images") or rel.startswith("docs/templates") or rel.startswith("build") or rel.startswith("dist")):
-            continue
-        for fn in filenames:
-            p = Path(dirpath) / fn
-            if p.suffix in {".py", ".js", ".ts", ".tsx", ".jsx"}:
-                try:
-                    if p.stat().st_size > max_bytes:
-                        continue
-                except Exception:
-                    continue
-                candidates.append(p)
-    return scan_paths(candidates)
+def scan_repo(
+    root: Path,
+    index: FileIndex | None = None,
+    cache: PromptCache | None = None,
+    workers: int | None = None,
+) -> list[PromptSpan]:
+    index = index if index is not None else FileIndex.build(root)
+    entries = index.select(suffixes=PROMPT_SUFFIXES, exclude_dirs=PROMPT_EXCLUDE_DIRS, max_bytes=max_file_bytes())
+    count_files(len(entries), sum(e.size for e in entries))
+    return scan_paths([e.path for e in entries], index=index, cache=cache, workers=workers)
@@ -1,24 +1,32 @@
 from __future__ import annotations
 
 import json
-import shutil
-import subprocess
 from pathlib import Path
+from typing import Iterable
 
+from ..proc import run_capture, which
 
-def _run_cmd(cmd: list[str], cwd: Path) -> list[dict]:
+
+def _run_cmd(cmd: list[str], cwd: Path, timeout_s: float | None = None) -> list[dict]:
     try:
-        cp = subprocess.run(cmd, cwd=str(cwd), capture_output=True, text=True, check=False)
+        cp = run_capture(cmd, cwd, timeout_s=timeout_s)
         data = json.loads(cp.stdout or "[]")
         return data if isinstance(data, list) else []
     except Exception:
         return []
 
 
-def maybe_run_quality(root: Path) -> dict:
+_PY_SUFFIXES = (".py", ".pyi")
+_JS_SUFFIXES = (".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs")
+
+
+def maybe_run_quality(root: Path, paths: Iterable[str] | None = None, timeout_s: float | None = None) -> dict:
     """Return normalized counts from available linters (ruff/eslint).
 
-    Produces counts.findings and counts.by_severity mapping.
+    Produces counts.findings and counts.by_severity mapping. When `paths`
+    (root-relative) is given, each linter only sees the matching files and is
+    skipped entirely if there are none. A linter exceeding `timeout_s` is
+    killed and contributes nothing.
     """
     counts = {"findings": 0, "by_severity": {}}
 
@@ -27,17 +35,21 @@ def maybe_run_quality(root: Path) -> dict:
         m = counts["by_severity"]
         m[sev] = int(m.get(sev, 0)) + int(n)
 
+    path_list = list(paths) if paths is not None else None
+    py_targets = [str(root)] if path_list is None else [p for p in path_list if p.endswith(_PY_SUFFIXES)]
+    js_targets = ["."] if path_list is None else [p for p in path_list if p.endswith(_JS_SUFFIXES)]
+
     # ruff (JSON): ruff check --output-format json
-    if shutil.which("ruff") is not None:
-        data = _run_cmd(["ruff", "check", "--output-format", "json", str(root)], root)
+    if py_targets and which("ruff") is not None:
+        data = _run_cmd(["ruff", "check", "--output-format", "json", *py_targets], root, timeout_s)
         # Treat ruff items as warnings by default
         n = len(data)
         counts["findings"] += n
         if n:
             bump("warning", n)
     # eslint (JSON): eslint -f json .
-    if shutil.which("eslint") is not None:
-        data = _run_cmd(["eslint", "-f", "json", "."], root)
+    if js_targets and which("eslint") is not None:
+        data = _run_cmd(["eslint", "-f", "json", *js_targets], root, timeout_s)
         # Sum up messages
         total = 0
         for f in data:
@@ -1,9 +1,27 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
 import json
+import os
 from pathlib import Path
 import re
-from typing import Any
+from typing import Any, Iterator
+
+from .jsonstream import iter_items
+
+
+SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+# GitHub code scanning upload limits: results per run, and file size (we
+# count uncompressed bytes, so gzip'd chunks land well under it)
+MAX_RESULTS = 25000
+MAX_BYTES = 10 * 1024 * 1024
+# Chunk files written under .genticode/sarif/ when splitting, one per bucket
+CHUNK_DIR = "sarif"
+CHUNK_FILE = "genticode-{n:04d}.sarif"
+CHUNK_CATEGORY = "genticode/bucket-{n:04d}/"
+# Beyond this a single rule and file must hold more than the limits allow
+MAX_BUCKETS = 1024
 
 
 def _level_from_severity(sev: str) -> str:
@@ -37,86 +55,257 @@ def _redact(text: str) -> str:
     return out
 
 
-def to_sarif(report: dict, gc_dir: Path | None = None) -> dict:
-    """Build unified SARIF from available normalized artifacts.
+def _items(path: Path, key: str) -> Iterator[Any]:
+    """Stream a source artifact's array; a missing or malformed file ends it."""
+    if not path.exists():
+        return
+    try:
+        yield from iter_items(path, key)
+    except (OSError, ValueError):
+        return
 
-    - Includes Prompt findings from `.genticode/prompts.manifest.json`
-    - Includes Static findings from `.genticode/raw/semgrep.json` (if present)
-    """
-    gc = gc_dir or (Path.cwd() / ".genticode")
-    results: list[dict] = []
-    rules: dict[str, dict] = {}
 
+def iter_results(gc_dir: Path) -> Iterator[tuple[dict, dict]]:
+    """(rule, result) pairs from the finding sources, one at a time.
+
+    - Prompt findings from `.genticode/prompts.manifest.json`
+    - Static findings from `.genticode/raw/semgrep.json` (if present)
+    """
     # Prompt manifest → SARIF
-    pm = _load_json(gc / "prompts.manifest.json")
-    if isinstance(pm, dict):
-        for it in pm.get("items", []) or []:
-            rid = "prompt.detected"
-            rules.setdefault(rid, {"id": rid, "name": "Prompt detected"})
-            message = _redact(f"Prompt-like string (role={it.get('role')})")
-            loc = {
-                "physicalLocation": {
-                    "artifactLocation": {"uri": it.get("file")},
-                    "region": {"startLine": int(it.get("start", 1))},
-                }
+    for it in _items(gc_dir / "prompts.manifest.json", "items"):
+        if not isinstance(it, dict):
+            continue
+        rid = "prompt.detected"
+        message = _redact(f"Prompt-like string (role={it.get('role')})")
+        loc = {
+            "physicalLocation": {
+                "artifactLocation": {"uri": it.get("file")},
+                "region": {"startLine": int(it.get("start", 1))},
             }
-            results.append({
-                "ruleId": rid,
-                "level": "note",
-                "message": {"text": message},
-                "locations": [loc],
-                "properties": {"id": it.get("id"), "role": it.get("role")},
-            })
-            # Add lint items as separate notes
-            for code in it.get("lints", []) or []:
-                lid = f"prompt.lint.{code.lower()}"
-                rules.setdefault(lid, {"id": lid, "name": f"Prompt lint: {code}"})
-                results.append({
-                    "ruleId": lid,
-                    "level": "warning",
+        }
+        yield {"id": rid, "name": "Prompt detected"}, {
+            "ruleId": rid,
+            "level": "note",
+            "message": {"text": message},
+            "locations": [loc],
+            "properties": {"id": it.get("id"), "role": it.get("role")},
+        }
+        # Add lint items as separate notes
+        for code in it.get("lints", []) or []:
+            lid = f"prompt.lint.{code.lower()}"
+            yield {"id": lid, "name": f"Prompt lint: {code}"}, {
+                "ruleId": lid,
+                "level": "warning",
                 "message": {"text": _redact(code)},
-                    "locations": [loc],
-                    "properties": {"id": it.get("id")},
-                })
+                "locations": [loc],
+                "properties": {"id": it.get("id")},
+            }
 
     # Static (Semgrep JSON) → SARIF
-    sg = _load_json(gc / "raw" / "semgrep.json")
-    if isinstance(sg, dict):
-        for r in sg.get("results", []) or []:
-            rid = str(r.get("check_id") or r.get("extra", {}).get("check_id"))
-            sev = (r.get("extra", {}).get("severity") or "info").lower()
-            msg = _redact(r.get("extra", {}).get("message") or r.get("message") or rid)
-            path = r.get("path") or r.get("extra", {}).get("path")
-            start = (r.get("start", {}) or {}).get("line") or 1
-            end = (r.get("end", {}) or {}).get("line") or start
-            rules.setdefault(rid, {"id": rid, "name": rid})
-            results.append({
-                "ruleId": rid,
-                "level": _level_from_severity(sev),
-                "message": {"text": msg},
-                "locations": [
-                    {
-                        "physicalLocation": {
-                            "artifactLocation": {"uri": path},
-                            "region": {"startLine": int(start), "endLine": int(end)},
-                        }
+    for r in _items(gc_dir / "raw" / "semgrep.json", "results"):
+        if not isinstance(r, dict):
+            continue
+        rid = str(r.get("check_id") or r.get("extra", {}).get("check_id"))
+        sev = (r.get("extra", {}).get("severity") or "info").lower()
+        msg = _redact(r.get("extra", {}).get("message") or r.get("message") or rid)
+        path = r.get("path") or r.get("extra", {}).get("path")
+        start = (r.get("start", {}) or {}).get("line") or 1
+        end = (r.get("end", {}) or {}).get("line") or start
+        yield {"id": rid, "name": rid}, {
+            "ruleId": rid,
+            "level": _level_from_severity(sev),
+            "message": {"text": msg},
+            "locations": [
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": path},
+                        "region": {"startLine": int(start), "endLine": int(end)},
                     }
-                ],
-            })
+                }
+            ],
+        }
 
+
+def _driver(report: dict, rules: list[dict]) -> dict:
+    return {
+        "name": "genticode",
+        "semanticVersion": str(report.get("genticode_version", "0")),
+        "rules": sorted(rules, key=lambda d: d.get("id", "")),
+    }
+
+
+def to_sarif(report: dict, gc_dir: Path | None = None) -> dict:
+    """Build unified SARIF in memory (see `write_sarif` for large result sets)."""
+    gc = gc_dir or (Path.cwd() / ".genticode")
+    results: list[dict] = []
+    rules: dict[str, dict] = {}
+    for rule, result in iter_results(gc):
+        rules.setdefault(rule["id"], rule)
+        results.append(result)
     return {
         "version": "2.1.0",
-        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
-        "runs": [
-            {
-                "tool": {
-                    "driver": {
-                        "name": "genticode",
-                        "semanticVersion": str(report.get("genticode_version", "0")),
-                        "rules": sorted(rules.values(), key=lambda d: d.get("id", "")),
-                    }
-                },
-                "results": results,
-            }
-        ],
+        "$schema": SCHEMA,
+        "runs": [{"tool": {"driver": _driver(report, list(rules.values()))}, "results": results}],
     }
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"))
+
+
+class _Chunk:
+    """One SARIF file being written: results streamed first, the rules they use last."""
+
+    # `results` precedes `tool` in the run object so it can be streamed
+    HEAD = '{"version":"2.1.0","$schema":' + json.dumps(SCHEMA) + ',"runs":[{"results":['
+
+    def __init__(self, report: dict, path: Path, compress: bool, category: str | None):
+        self.report = report
+        self.path = path
+        self.tmp = path.with_name(path.name + ".tmp")
+        self.fh = gzip.open(self.tmp, "wt", encoding="utf-8") if compress else open(self.tmp, "w", encoding="utf-8")
+        self.fh.write(self.HEAD)
+        self.category = category
+        self.count = 0
+        self.rules: dict[str, dict] = {}
+        # Uncompressed size so far (the tail with an empty rules table
+        # included), plus what the rules table will add
+        self.size = len(self.HEAD) + len(self._tail([]))
+        self.rules_size = 0
+
+    def _tail(self, rules: list[dict]) -> str:
+        run_tail: dict = {"tool": {"driver": _driver(self.report, rules)}}
+        if self.category:
+            run_tail["automationDetails"] = {"id": self.category}
+        return "]," + _dumps(run_tail)[1:] + "]}\n"
+
+    def cost(self, rule: dict, line: str) -> int:
+        extra = 0 if rule["id"] in self.rules else len(_dumps(rule)) + 1
+        return self.size + len(line) + 1 + self.rules_size + extra
+
+    def add(self, rule: dict, line: str) -> None:
+        if rule["id"] not in self.rules:
+            self.rules[rule["id"]] = rule
+            self.rules_size += len(_dumps(rule)) + 1
+        self.fh.write(("," if self.count else "") + line)
+        self.size += len(line) + 1
+        self.count += 1
+
+    def close(self) -> None:
+        self.fh.write(self._tail(list(self.rules.values())))
+        self.fh.close()
+        os.replace(self.tmp, self.path)
+
+
+def _bucket(result: dict, buckets: int) -> int:
+    """Stable bucket of a result: a hash of its rule and file, never its position."""
+    loc = ((result.get("locations") or [{}])[0] or {}).get("physicalLocation") or {}
+    key = f"{result.get('ruleId')}\0{(loc.get('artifactLocation') or {}).get('uri')}"
+    return int.from_bytes(hashlib.sha256(key.encode("utf-8")).digest()[:8], "big") % buckets
+
+
+def bucket_count(results: int, nbytes: int, max_results: int | None, max_bytes: int | None) -> int:
+    """Buckets for a split: 1 if everything fits, else a power of two with 2x headroom.
+
+    The headroom absorbs hash skew and growth, so the count (and with it
+    each result's category) only changes when the volume roughly doubles
+    or halves.
+    """
+    need = 1
+    if max_results:
+        need = max(need, -(-results // max_results))
+    if max_bytes:
+        need = max(need, -(-nbytes // max_bytes))
+    if need <= 1:
+        return 1
+    n = 2
+    while n < 2 * need:
+        n *= 2
+    return n
+
+
+def _write_single(report: dict, gc_dir: Path, out: Path, compress: bool) -> list[Path]:
+    chunk = _Chunk(report, out.with_name(out.name + (".gz" if compress else "")), compress, None)
+    try:
+        for rule, result in iter_results(gc_dir):
+            chunk.add(rule, _dumps(result))
+        chunk.close()
+    finally:
+        if not chunk.fh.closed:
+            chunk.fh.close()
+            chunk.tmp.unlink()
+    # The other variant (plain or .gz) of this output is now stale
+    stale = out.with_name(out.name + ("" if compress else ".gz"))
+    stale.unlink(missing_ok=True)
+    return [chunk.path]
+
+
+def _write_buckets(
+    report: dict, gc_dir: Path, out: Path, compress: bool, buckets: int, max_results: int | None, max_bytes: int | None
+) -> list[Path] | None:
+    """One pass routing results into `buckets` files; None if a bucket overflows."""
+    suffix = ".gz" if compress else ""
+    chunks = [
+        _Chunk(report, out / (CHUNK_FILE.format(n=i + 1) + suffix), compress, CHUNK_CATEGORY.format(n=i + 1)) for i in range(buckets)
+    ]
+    try:
+        for rule, result in iter_results(gc_dir):
+            line = _dumps(result)
+            chunk = chunks[_bucket(result, buckets)]
+            if chunk.count and (
+                (max_results is not None and chunk.count >= max_results)
+                or (max_bytes is not None and chunk.cost(rule, line) > max_bytes)
+            ):
+                return None
+            chunk.add(rule, line)
+        for chunk in chunks:
+            chunk.close()
+        return [c.path for c in chunks]
+    finally:
+        for chunk in chunks:
+            if not chunk.fh.closed:
+                chunk.fh.close()
+                chunk.tmp.unlink()
+
+
+def write_sarif(
+    report: dict,
+    gc_dir: Path,
+    out: Path,
+    compress: bool = False,
+    max_results: int | None = None,
+    max_bytes: int | None = None,
+    buckets: int | None = None,
+) -> list[Path]:
+    """Stream SARIF for the finding sources to `out` without holding the results.
+
+    Without limits a single file is written to `out`. With `max_results`
+    and/or `max_bytes` (uncompressed), `out` is a directory that receives
+    one file per bucket, each a complete SARIF log carrying only the rules
+    its results reference and its own `automationDetails` category, so
+    files can be uploaded separately. A result's bucket is a hash of its
+    rule and file, so it keeps its category from run to run; empty buckets
+    are still written so their categories' alerts close. `buckets` pins
+    the count (see `bucket_count` for the default); it is doubled until
+    every bucket fits the limits, and ValueError raised past MAX_BUCKETS.
+    `compress` gzips each file (`.gz`). Returns the files written.
+    """
+    if max_results is None and max_bytes is None:
+        return _write_single(report, gc_dir, out, compress)
+    n = buckets
+    if not n:
+        # Sizing pass: counts and bytes only, nothing held
+        count = nbytes = 0
+        for _, result in iter_results(gc_dir):
+            count += 1
+            nbytes += len(_dumps(result)) + 1
+        n = bucket_count(count, nbytes, max_results, max_bytes)
+    out.mkdir(parents=True, exist_ok=True)
+    for stale in out.glob("genticode-*.sarif*"):
+        stale.unlink()
+    while n <= MAX_BUCKETS:
+        written = _write_buckets(report, gc_dir, out, compress, n, max_results, max_bytes)
+        if written is not None:
+            return written
+        n *= 2
+    raise ValueError("the results of one rule in one file exceed the SARIF chunk limits")
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import concurrent.futures as cf
+import heapq
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable
+
+from . import trace
+
+
+# Resource classes a job can declare; each has its own concurrency cap.
+CPU = "cpu"  # in-process Python work (parsing, regex scans)
+IO = "io"  # filesystem-bound work (tree walks, artifact reads)
+EXTERNAL = "external"  # external tool subprocesses (semgrep, linters, audits)
+
+
+_local = threading.local()
+
+
+def cpu_budget() -> int:
+    """Cores the calling job may use for its own workers.
+
+    Inside `run_jobs`: the CPU slots no other CPU job held when it started
+    (at least one), capped at the core count. Elsewhere one per core.
+    """
+    cores = os.cpu_count() or 1
+    return min(cores, getattr(_local, "cpu_budget", cores))
+
+
+def default_limits() -> Dict[str, int]:
+    """Per-resource caps: CPU work one per core, external tools separately.
+
+    Overridable via GENTICODE_MAX_CPU_JOBS / GENTICODE_MAX_IO_JOBS /
+    GENTICODE_MAX_EXTERNAL_JOBS.
+    """
+    cores = os.cpu_count() or 1
+    return {
+        CPU: int(os.getenv("GENTICODE_MAX_CPU_JOBS", str(max(1, cores)))),
+        IO: int(os.getenv("GENTICODE_MAX_IO_JOBS", str(max(4, 2 * cores)))),
+        EXTERNAL: int(os.getenv("GENTICODE_MAX_EXTERNAL_JOBS", str(max(2, cores // 2)))),
+    }
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], Any]
+    resource: str = CPU
+    deps: tuple[str, ...] = ()
+    # Priority hint: longest expected jobs start first
+    expected_ms: float = 0.0
+    # Wall-clock limit measured from when the job actually starts
+    timeout_s: float | None = None
+
+
+@dataclass
+class JobResult:
+    name: str
+    status: str  # ok | error | timeout | skipped
+    value: Any = None
+    error: str | None = None
+    queued_ms: int = 0
+    duration_ms: int = 0
+    started_at: float | None = field(default=None, repr=False)
+
+
+def spawn(func: Callable[..., Any], *args: Any, name: str | None = None) -> cf.Future:
+    """Run `func(*args)` on a daemon thread; the returned future holds the outcome.
+
+    Unlike executor workers, a thread left running (a timed-out job) does not
+    hold up interpreter exit.
+    """
+    fut: cf.Future = cf.Future()
+    fut.set_running_or_notify_cancel()
+
+    def target() -> None:
+        try:
+            fut.set_result(func(*args))
+        except BaseException as e:  # noqa: BLE001 — surfaced through the future
+            fut.set_exception(e)
+
+    threading.Thread(target=target, name=name, daemon=True).start()
+    return fut
+
+
+def order(jobs: Iterable[Job]) -> list[str]:
+    """Deterministic start order: dependencies first, then longest expected first.
+
+    Dependencies on names outside `jobs` (e.g. disabled packs) are ignored.
+    Raises ValueError on a dependency cycle.
+    """
+    by_name = {j.name: j for j in jobs}
+    indeg = {n: sum(1 for d in j.deps if d in by_name) for n, j in by_name.items()}
+    dependents: Dict[str, list[str]] = {n: [] for n in by_name}
+    for n, j in by_name.items():
+        for d in j.deps:
+            if d in by_name:
+                dependents[d].append(n)
+    heap = [(-by_name[n].expected_ms, n) for n, k in indeg.items() if k == 0]
+    heapq.heapify(heap)
+    out: list[str] = []
+    while heap:
+        _, n = heapq.heappop(heap)
+        out.append(n)
+        for m in dependents[n]:
+            indeg[m] -= 1
+            if indeg[m] == 0:
+                heapq.heappush(heap, (-by_name[m].expected_ms, m))
+    if len(out) != len(by_name):
+        stuck = sorted(set(by_name) - set(out))
+        raise ValueError(f"dependency cycle among jobs: {', '.join(stuck)}")
+    return out
+
+
+def run_jobs(jobs: Iterable[Job], limits: Dict[str, int] | None = None) -> Dict[str, JobResult]:
+    """Run jobs on daemon threads honoring dependencies and per-resource caps.
+
+    A job starts once all of its dependencies succeeded; if any failed, timed
+    out or were skipped, the job is skipped. Among ready jobs the longest
+    expected starts first, subject to its resource class having a free slot.
+    Timed-out threads cannot be interrupted; their slot is released, the
+    result discarded, and the thread does not keep the interpreter alive.
+    """
+    jobs = list(jobs)
+    by_name = {j.name: j for j in jobs}
+    rank = {n: i for i, n in enumerate(order(jobs))}
+    limits = {**default_limits(), **(limits or {})}
+    waiting = {j.name: {d for d in j.deps if d in by_name} for j in jobs}
+    dependents: Dict[str, list[str]] = {n: [] for n in by_name}
+    for j in jobs:
+        for d in waiting[j.name]:
+            dependents[d].append(j.name)
+
+    results: Dict[str, JobResult] = {}
+    running: Dict[cf.Future, Job] = {}
+    in_use: Dict[str, int] = {}
+    started: Dict[str, float] = {}
+    submitted: Dict[str, float] = {}
+    lock = threading.Lock()
+    t0 = time.perf_counter()
+    ready = sorted((n for n, w in waiting.items() if not w), key=rank.__getitem__)
+
+    def call(job: Job, budget: int) -> Any:
+        _local.cpu_budget = budget
+        with lock:
+            started[job.name] = begin = time.perf_counter()
+        tracer = trace.active()
+        if tracer is not None:
+            tracer.add(f"{job.name} (queued)", "schedule", submitted.get(job.name, begin), begin, {"resource": job.resource})
+        with trace.span(job.name, "job", resource=job.resource):
+            return job.func()
+
+    def settle(job: Job, res: JobResult) -> None:
+        results[job.name] = res
+        in_use[job.resource] = in_use.get(job.resource, 0) - 1
+        for m in dependents[job.name]:
+            waiting[m].discard(job.name)
+            if res.status != "ok":
+                skip(m, f"dependency {job.name} {res.status}")
+            elif not waiting[m] and m not in results:
+                ready.append(m)
+        ready.sort(key=rank.__getitem__)
+
+    def skip(name: str, why: str) -> None:
+        if name in results:
+            return
+        results[name] = JobResult(name, "skipped", error=why)
+        if name in ready:
+            ready.remove(name)
+        for m in dependents[name]:
+            skip(m, f"dependency {name} skipped")
+
+    while ready or running:
+        for name in list(ready):
+            job = by_name[name]
+            if in_use.get(job.resource, 0) >= max(1, limits.get(job.resource, 1)):
+                continue
+            ready.remove(name)
+            # CPU slots idle at start (a CPU job's own included) are its to fan out on
+            budget = max(1, limits.get(CPU, 1) - in_use.get(CPU, 0))
+            in_use[job.resource] = in_use.get(job.resource, 0) + 1
+            submitted[name] = time.perf_counter()
+            running[spawn(call, job, budget, name=f"genticode-job-{name}")] = job
+        if not running:
+            break
+        # Jobs with a deadline need polling: their start time is only
+        # known once the thread picks them up.
+        now = time.perf_counter()
+        timed = [j for j in running.values() if j.timeout_s is not None]
+        wait_s = None
+        if timed:
+            wait_s = min([0.05] + [max(0.0, started[j.name] + j.timeout_s - now) for j in timed if j.name in started])
+        done, _ = cf.wait(list(running), timeout=wait_s, return_when=cf.FIRST_COMPLETED)
+        now = time.perf_counter()
+        for fut in list(running):
+            job = running[fut]
+            begin = started.get(job.name)
+            queued_ms = int(((begin if begin is not None else now) - t0) * 1000)
+            if fut in done:
+                del running[fut]
+                dur = int((now - (begin if begin is not None else now)) * 1000)
+                try:
+                    res = JobResult(job.name, "ok", value=fut.result(), queued_ms=queued_ms, duration_ms=dur, started_at=begin)
+                except TimeoutError as e:
+                    # Jobs that enforce their own deadline (isolated packs)
+                    res = JobResult(job.name, "timeout", error=str(e), queued_ms=queued_ms, duration_ms=dur, started_at=begin)
+                except Exception as e:  # noqa: BLE001 — a failing job must not stop the others
+                    res = JobResult(job.name, "error", error=str(e), queued_ms=queued_ms, duration_ms=dur, started_at=begin)
+                settle(job, res)
+            elif job.timeout_s is not None and begin is not None and now - begin >= job.timeout_s:
+                # The thread is a daemon: left running, it won't block exit
+                del running[fut]
+                settle(job, JobResult(job.name, "timeout", queued_ms=queued_ms, duration_ms=int(job.timeout_s * 1000), started_at=begin))
+    for name in by_name:
+        if name not in results:
+            results[name] = JobResult(name, "skipped", error="not scheduled")
+    return results
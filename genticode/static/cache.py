@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Iterable
+
+from ..cache import ContentCache
+
+
+# Bump when the cached result shape or the merge logic changes
+RESULTS_VERSION = "2"
+
+_RULE_SUFFIXES = (".yaml", ".yml", ".json")
+
+
+class SemgrepCache(ContentCache):
+    """Per-file semgrep results keyed by (ruleset hash, semgrep version, content sha256).
+
+    Cached results are stored in full, without their `path`, which is
+    filled in on lookup. Semgrep OSS rules are intra-file, so a file's results depend only
+    on its content, the rules and the engine version. `max_entries` defaults
+    to env `GENTICODE_SEMGREP_CACHE_MAX`, `max_bytes` to
+    `GENTICODE_SEMGREP_CACHE_MAX_BYTES`.
+    """
+
+    version = RESULTS_VERSION
+    field = "results"
+    max_env = "GENTICODE_SEMGREP_CACHE_MAX"
+    max_bytes_env = "GENTICODE_SEMGREP_CACHE_MAX_BYTES"
+
+    @staticmethod
+    def key(ruleset: str, semgrep_version: str, sha256: str) -> str:
+        return f"{ruleset}:{semgrep_version}:{sha256}"
+
+
+def ruleset_hash(root: Path, configs: Iterable[str]) -> str:
+    """Hash of the semgrep configs in use.
+
+    Local rule files (or directories of them) contribute their content;
+    registry configs such as `p/python` contribute only their name, so clear
+    `.genticode/cache/` to pick up upstream registry changes.
+    """
+    h = hashlib.sha256()
+    for cfg in configs:
+        h.update(cfg.encode("utf-8") + b"\0")
+        p = Path(cfg) if Path(cfg).is_absolute() else root / cfg
+        try:
+            files = sorted(f for f in p.rglob("*") if f.suffix in _RULE_SUFFIXES) if p.is_dir() else ([p] if p.is_file() else [])
+        except Exception:
+            files = []
+        for f in files:
+            h.update(str(f.relative_to(p) if f != p else f.name).encode("utf-8") + b"\0")
+            h.update(f.read_bytes())
+    return h.hexdigest()[:16]
@@ -1,19 +1,39 @@
 from __future__ import annotations
 
+import mmap
 import os
 import re
+from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterator, List
-import os
 
+from ..fileindex import FileIndex
+from ..telemetry import count_files
+from ..trace import span
+
+
+# Named so hits can be attributed per pattern. Patterns must not cross line
+# boundaries: the scanner matches over whole file buffers.
+SECRET_PATTERNS = {
+    "aws_secret_access_key": re.compile(r"aws_secret_access_key\b", re.I),
+    "password_assignment": re.compile(r"password[^\S\r\n]*=[^\S\r\n]*['\"]?\w+", re.I),
+    "api_key": re.compile(r"api[_-]?key\b", re.I),
+    "ssn": re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),  # SSN-like
+}
 
-SECRET_PATTERNS = [
-    re.compile(r"aws_secret_access_key\b", re.I),
-    re.compile(r"password\s*=\s*['\"]?\w+", re.I),
-    re.compile(r"api[_-]?key\b", re.I),
-    re.compile(r"\b\d{3}-\d{2}-\d{4}\b"),  # SSN-like
-]
+# Bytes sniffed to decide whether a file is binary
+BINARY_SNIFF_BYTES = 8192
+# Large files are streamed through mmap in windows of about this size, cut
+# at line boundaries
+WINDOW_BYTES = 1 << 20
+# Files above this size (GENTICODE_SECRETS_STREAM_BYTES) are streamed rather
+# than read whole through the shared index
+DEFAULT_STREAM_BYTES = 1 << 20
+# A line longer than a window is matched on the map in place; its hit's text
+# is this many bytes either side of the match
+LONG_LINE_CONTEXT = 256
+_TEXT_BYTES = bytes(range(0x20, 0x7F)) + b"\t\n\r\f\b\x1b"
 
 
 @dataclass(frozen=True)
@@ -21,26 +41,121 @@ class SecretFinding:
     file: Path
     line: int
     text: str
+    rule: str = ""
 
 
-def scan_repo_for_secrets(root: Path) -> List[SecretFinding]:
-    findings: List[SecretFinding] = []
-    max_bytes = int(os.getenv("GENTICODE_MAX_FILE_BYTES", "1048576"))
-    for dirpath, dirnames, filenames in os.walk(root):
-        rel = os.path.relpath(dirpath, root)
-        if rel.startswith(".git") or ".genticode" in rel or ".venv" in rel or "node_modules" in rel:
+def _compile_combined(patterns: dict[str, re.Pattern]) -> re.Pattern:
+    """Fold all patterns into one bytes regex with a named group per pattern."""
+    parts = []
+    for name, pat in patterns.items():
+        flags = "i" if pat.flags & re.I else ""
+        body = f"(?{flags}:{pat.pattern})" if flags else pat.pattern
+        parts.append(f"(?P<{name}>{body})")
+    return re.compile("|".join(parts).encode("utf-8"))
+
+
+_COMBINED = _compile_combined(SECRET_PATTERNS)
+
+
+def looks_binary(sample: bytes) -> bool:
+    """NUL byte, or more than 30% non-text bytes (high bytes count as text for UTF-8)."""
+    if not sample:
+        return False
+    if b"\x00" in sample:
+        return True
+    non_text = sample.translate(None, _TEXT_BYTES + bytes(range(0x80, 0x100)))
+    return len(non_text) / len(sample) > 0.30
+
+
+def scan_buffer(data: bytes, first_line: int = 1) -> Iterator[tuple[int, str, str]]:
+    """Yield (line, rule, stripped line text) with at most one hit per line."""
+    line = first_line
+    pos = 0
+    last_line = 0
+    for m in _COMBINED.finditer(data):
+        start = m.start()
+        line += data.count(b"\n", pos, start)
+        pos = start
+        if line == last_line:
             continue
-        for fn in filenames:
-            p = Path(dirpath) / fn
+        last_line = line
+        bol = data.rfind(b"\n", 0, start) + 1
+        eol = data.find(b"\n", m.end())
+        text = data[bol : eol if eol != -1 else len(data)].decode("utf-8", errors="ignore").strip()
+        yield line, str(m.lastgroup), text
+
+
+def scan_stream(path: Path, window: int = WINDOW_BYTES) -> Iterator[tuple[int, str, str]]:
+    """Like `scan_buffer` over a file of any size, holding one window in memory.
+
+    Windows always end at a newline (patterns never span lines), so no
+    match sees a false word boundary at a cut. A line longer than `window`
+    is searched on the map itself, without copying it.
+    """
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if looks_binary(mm[:BINARY_SNIFF_BYTES]):
+                return
+            start, line = 0, 1
+            while start < size:
+                end = min(size, start + window)
+                cut = end
+                if end < size:
+                    nl = mm.rfind(b"\n", start, end)
+                    if nl == -1:
+                        # No newline in the window: the line runs past it
+                        nl = mm.find(b"\n", end)
+                    cut = nl + 1 if nl != -1 else size
+                if cut - start > window:
+                    # One long line (minified bundle, lockfile): at most one hit
+                    m = _COMBINED.search(mm, start, cut)
+                    if m:
+                        lo = max(start, m.start() - LONG_LINE_CONTEXT)
+                        hi = min(cut, m.end() + LONG_LINE_CONTEXT)
+                        yield line, str(m.lastgroup), mm[lo:hi].decode("utf-8", errors="ignore").strip()
+                    line += 1
+                else:
+                    chunk = mm[start:cut]
+                    yield from scan_buffer(chunk, first_line=line)
+                    line += chunk.count(b"\n")
+                start = cut
+
+
+def stream_bytes() -> int:
+    return int(os.getenv("GENTICODE_SECRETS_STREAM_BYTES", str(DEFAULT_STREAM_BYTES)))
+
+
+def scan_repo_for_secrets(root: Path, index: FileIndex | None = None, max_bytes: int | None = None) -> List[SecretFinding]:
+    """Scan every indexed file for secret-like lines.
+
+    Files up to `stream_bytes()` are scanned from the shared index; larger
+    ones are streamed so memory stays bounded. Unlike other packs, secrets
+    doesn't skip files above GENTICODE_MAX_FILE_BYTES; only `max_bytes`
+    (policy `packs.static.max_file_bytes`) skips files above a size.
+    """
+    findings: List[SecretFinding] = []
+    index = index if index is not None else FileIndex.build(root)
+    in_memory = stream_bytes()
+    with span("secrets.scan", "scan"):
+        for entry in index.select(max_bytes=max_bytes):
             try:
-                if p.stat().st_size > max_bytes:
-                    continue
-                src = p.read_text(encoding="utf-8", errors="ignore")
+                if entry.size > in_memory:
+                    hits = list(scan_stream(entry.path))
+                else:
+                    data = entry.read_bytes()
+                    if looks_binary(data[:BINARY_SNIFF_BYTES]):
+                        continue
+                    hits = list(scan_buffer(data))
             except Exception:
                 continue
-            for i, line in enumerate(src.splitlines(), start=1):
-                for pat in SECRET_PATTERNS:
-                    if pat.search(line):
-                        findings.append(SecretFinding(p, i, line.strip()))
-                        break
+            count_files(1, entry.size)
+            for line, rule, text in hits:
+                findings.append(SecretFinding(entry.path, line, text, rule))
     return findings
+
+
+def hits_by_rule(findings: List[SecretFinding]) -> dict[str, int]:
+    return dict(sorted(Counter(f.rule for f in findings).items()))
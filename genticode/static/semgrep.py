@@ -1,52 +1,463 @@
 from __future__ import annotations
 
+import concurrent.futures as cf
+import fnmatch
+import heapq
 import json
 import os
-import shutil
+import posixpath
 import subprocess
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, Iterator
 
+from ..fileindex import FileIndex
+from ..jsonstream import iter_members
+from ..proc import run_capture, run_to_file, which
+from ..telemetry import count_cache
+from .cache import SemgrepCache, ruleset_hash
 
-def maybe_run_semgrep(root: Path, out_path: Path, timeout_s: int = 120, configs: Iterable[str] | None = None) -> dict | None:
-    if shutil.which("semgrep") is None:
-        return None
-    jobs = max(1, min(4, (os.cpu_count() or 1)))
-    cfgs = list(configs) if configs else ["p/python", "p/typescript"]
-    cmd = ["semgrep", "--error"]
+
+# Default registry packs when policy sets no ruleset
+DEFAULT_CONFIGS = ("p/python", "p/typescript")
+# Generated and non-source paths semgrep never needs to see
+SEMGREP_EXCLUDES = (
+    ".git",
+    ".genticode",
+    ".venv",
+    "node_modules",
+    "ssot",
+    "images",
+    "docs/templates",
+    "build",
+    "dist",
+)
+# Smallest path bin worth its own semgrep process (startup and rule parsing)
+MIN_SHARD_FILES = 50
+# Explicit targets per semgrep process, by count and total argv characters (ARG_MAX)
+TARGET_BATCH = 1000
+TARGET_BATCH_CHARS = 100_000
+
+
+def _write(out_path: Path, data: dict) -> None:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+# Result fields kept in memory; the rest (rule metadata, source lines) stays in the raw file
+_EXTRA_KEEP = ("message", "severity", "fingerprint")
+
+
+def _slim(r: dict) -> dict:
+    extra = r.get("extra")
+    if not isinstance(extra, dict):
+        return r
+    return {**r, "extra": {k: extra[k] for k in _EXTRA_KEEP if k in extra}}
+
+
+def _spool_results(path: Path, root: Path | None = None) -> Iterator[dict]:
+    """Full result objects from a semgrep output file, paths root-relative with `root`."""
+    for _, _, item in iter_members(path, ("results",)):
+        if isinstance(item, dict):
+            yield {**item, "path": _rel(item.get("path", ""), root)} if root is not None else item
+
+
+def _write_merged(out_path: Path, head: dict, parts: Iterable[Iterable[dict]]) -> None:
+    """Stream a merged semgrep document into `out_path`.
+
+    `head` supplies the members other than `results`; results from `parts`
+    are written unslimmed, in order, minus duplicates of an earlier result.
+    """
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    seen: set[str] = set()
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write("{")
+        for k, v in head.items():
+            if k != "results":
+                fh.write(f"{json.dumps(k)}:{json.dumps(v, separators=(',', ':'))},")
+        fh.write('"results":[')
+        sep = ""
+        for part in parts:
+            for r in part:
+                key = _result_key(r)
+                if key in seen:
+                    continue
+                seen.add(key)
+                fh.write(sep + json.dumps(r, separators=(",", ":")))
+                sep = ","
+        fh.write("]}\n")
+    os.replace(tmp, out_path)
+
+
+def load_output(path: Path) -> dict:
+    """Stream a semgrep JSON document into slimmed `results` and `errors` lists."""
+    data: dict = {"errors": [], "results": []}
+    for key, _, item in iter_members(path, ("results", "errors")):
+        if key == "results" and isinstance(item, dict):
+            data["results"].append(_slim(item))
+        elif key == "errors" and item is not None:
+            data["errors"].append(item)
+    return data
+
+
+def _run(
+    root: Path,
+    cfgs: list[str],
+    targets: list[str] | None,
+    timeout_s: int,
+    spool: Path,
+    jobs: int | None = None,
+    deadline_s: float | None = None,
+) -> dict | None:
+    """Run one semgrep process with its JSON output streamed into `spool`.
+
+    `timeout_s` is semgrep's per-file rule timeout; `deadline_s` bounds the
+    whole process (its tree is killed and TimeoutExpired raised).
+    """
+    jobs = jobs or max(1, min(4, (os.cpu_count() or 1)))
+    # No --error: findings must not turn into a failed run (and an uncached one);
+    # a non-zero exit then means semgrep itself failed
+    cmd = ["semgrep"]
     for c in cfgs:
         cmd += ["--config", c]
-    # Exclude generated and non-source paths
-    excludes = [
-        ".git",
-        ".genticode",
-        ".venv",
-        "node_modules",
-        "ssot",
-        "images",
-        "docs/templates",
-        "build",
-        "dist",
-    ]
-    for ex in excludes:
+    for ex in SEMGREP_EXCLUDES:
         cmd += ["--exclude", ex]
-
     cmd += [
         "--json",
         "--timeout",
         str(timeout_s),
         "--jobs",
         str(jobs),
-        str(root),
     ]
+    cmd += targets if targets is not None else [str(root)]
     try:
-        cp = subprocess.run(cmd, cwd=str(root), capture_output=True, text=True, check=True)
+        run_to_file(cmd, root, spool, check=True, timeout_s=deadline_s)
     except subprocess.CalledProcessError:
         return None
-    data = json.loads(cp.stdout or "{}")
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
-    return data
+    return load_output(spool)
+
+
+def default_cores() -> int | None:
+    """Core budget for sharded runs from GENTICODE_SEMGREP_CORES (unset = one process)."""
+    val = os.getenv("GENTICODE_SEMGREP_CORES")
+    if not val:
+        return None
+    return (os.cpu_count() or 1) if int(val) <= 0 else int(val)
+
+
+def balanced_bins(targets: list[str], sizes: dict[str, int], n: int) -> list[list[str]]:
+    """Split targets into `n` bins of roughly equal total size (largest first)."""
+    n = max(1, min(n, len(targets)))
+    heap = [(0, i) for i in range(n)]
+    bins: list[list[str]] = [[] for _ in range(n)]
+    for t in sorted(targets, key=lambda t: (-int(sizes.get(t, 0)), t)):
+        total, i = heapq.heappop(heap)
+        bins[i].append(t)
+        heapq.heappush(heap, (total + max(1, int(sizes.get(t, 0))), i))
+    return [sorted(b) for b in bins if b]
+
+
+def plan_shards(
+    cfgs: list[str],
+    targets: list[str] | None,
+    sizes: dict[str, int] | None,
+    cores: int,
+    min_files: int | None = None,
+) -> list[tuple[list[str], list[str] | None]]:
+    """Shard work by ruleset (one config per shard) and by size-balanced path bins.
+
+    Path bins need explicit targets and hold at least `min_files` files each;
+    the total shard count stays within `cores` where possible.
+    """
+    min_files = MIN_SHARD_FILES if min_files is None else min_files
+    groups = [[c] for c in cfgs] if len(cfgs) > 1 else [list(cfgs)]
+    bins: list[list[str] | None] = [targets]
+    if targets:
+        n = min(max(1, cores // len(groups)), -(-len(targets) // max(1, min_files)))
+        bins = list(balanced_bins(targets, sizes or {}, n))
+    return [(g, b) for g in groups for b in bins]
+
+
+def target_batches(targets: list[str]) -> list[list[str]]:
+    """Split explicit targets so no single command line exceeds the batch limits."""
+    out: list[list[str]] = [[]]
+    chars = 0
+    for t in targets:
+        if out[-1] and (len(out[-1]) >= TARGET_BATCH or chars + len(t) + 1 > TARGET_BATCH_CHARS):
+            out.append([])
+            chars = 0
+        out[-1].append(t)
+        chars += len(t) + 1
+    return out
+
+
+def semgrepignore(root: Path) -> Callable[[str], bool]:
+    """Predicate for root-relative paths matched by `root/.semgrepignore`.
+
+    Explicit targets bypass semgrep's own ignore handling, so incremental
+    runs filter them here. Gitignore-style: `#` comments, anchored patterns
+    (containing `/`), trailing `/` for directories; negations and
+    `:include` lines are not supported and skipped.
+    """
+    try:
+        lines = (root / ".semgrepignore").read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return lambda rel: False
+    pats: list[tuple[str, bool]] = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(("#", "!", ":")):
+            continue
+        pat = line.rstrip("/")
+        anchored = "/" in pat
+        pats.append((pat.lstrip("/"), anchored))
+    if not pats:
+        return lambda rel: False
+
+    def ignored(rel: str) -> bool:
+        parts = rel.split("/")
+        # The file itself and each parent directory
+        prefixes = ["/".join(parts[: i + 1]) for i in range(len(parts))]
+        for pat, anchored in pats:
+            if anchored:
+                if any(fnmatch.fnmatchcase(p, pat) for p in prefixes):
+                    return True
+            elif any(fnmatch.fnmatchcase(part, pat) for part in parts):
+                return True
+        return False
+
+    return ignored
+
+
+def _result_key(r: dict) -> str:
+    return json.dumps([r.get("path"), r.get("check_id"), r.get("start"), r.get("end")], sort_keys=True)
+
+
+def merge_results(outputs: list[dict]) -> dict:
+    """Deterministically merge shard outputs, dropping duplicate results and errors."""
+    results: dict[str, dict] = {}
+    errors: dict[str, dict] = {}
+    scanned: set[str] = set()
+    for out in outputs:
+        for res in out.get("results", []) or []:
+            results.setdefault(_result_key(res), res)
+        for err in out.get("errors", []) or []:
+            errors.setdefault(json.dumps(err, sort_keys=True), err)
+        scanned.update((out.get("paths") or {}).get("scanned", []) or [])
+    merged = {**(outputs[0] if outputs else {}), "results": sorted(results.values(), key=_result_order), "errors": [errors[k] for k in sorted(errors)]}
+    if scanned:
+        merged["paths"] = {**(merged.get("paths") or {}), "scanned": sorted(scanned)}
+    return merged
+
+
+def _scan(
+    root: Path,
+    cfgs: list[str],
+    targets: list[str] | None,
+    timeout_s: int,
+    spool: Path,
+    cores: int | None = None,
+    sizes: dict[str, int] | None = None,
+    deadline_s: float | None = None,
+) -> dict | None:
+    """Run semgrep once, or as concurrent shards within a `cores` budget.
+
+    A single process writes its output to `spool` as-is; shard outputs are
+    spooled next to it, merged, and their full results streamed into `spool`.
+    """
+    cores = cores if cores and cores > 1 else 1
+    shards = plan_shards(cfgs, targets, sizes, cores) if cores > 1 else [(cfgs, targets)]
+    # Long target lists are split across processes to stay within ARG_MAX
+    shards = [(g, b) for g, bins in shards for b in (target_batches(bins) if bins else [bins])]
+    if len(shards) == 1:
+        return _run(root, cfgs, targets, timeout_s, spool, jobs=cores if cores > 1 else None, deadline_s=deadline_s)
+    jobs = max(1, cores // min(cores, len(shards))) if cores > 1 else None
+    spools = [spool.with_name(f"{spool.stem}.shard{i}{spool.suffix}") for i in range(len(shards))]
+    try:
+        with cf.ThreadPoolExecutor(max_workers=min(cores, len(shards)), thread_name_prefix="semgrep-shard") as ex:
+            outputs = list(ex.map(lambda i: _run(root, shards[i][0], shards[i][1], timeout_s, spools[i], jobs=jobs, deadline_s=deadline_s), range(len(shards))))
+        if any(o is None for o in outputs):
+            return None
+        merged = merge_results(outputs)
+        _write_merged(spool, merged, (_spool_results(sp) for sp in spools))
+    finally:
+        for sp in spools:
+            if sp.exists():
+                sp.unlink()
+    return merged
+
+
+def semgrep_version() -> str:
+    try:
+        cp = run_capture(["semgrep", "--version"], None, timeout_s=30, name="semgrep --version")
+        return (cp.stdout or "").strip().splitlines()[0]
+    except Exception:
+        return "unknown"
+
+
+def _rel(path: str, root: Path | None = None) -> str:
+    p = str(path)
+    if root is not None and os.path.isabs(p):
+        try:
+            p = os.path.relpath(p, root)
+        except ValueError:
+            pass
+    return posixpath.normpath(p.replace(os.sep, "/"))
+
+
+def _result_order(r: dict) -> tuple:
+    start = r.get("start", {}) or {}
+    return (str(r.get("path", "")), int(start.get("line", 0) or 0), int(start.get("col", 0) or 0), str(r.get("check_id", "")))
+
+
+def maybe_run_semgrep(
+    root: Path,
+    out_path: Path,
+    timeout_s: int = 120,
+    configs: Iterable[str] | None = None,
+    targets: Iterable[str] | None = None,
+    index: FileIndex | Callable[[], FileIndex] | None = None,
+    cache: SemgrepCache | None = None,
+    cores: int | None = None,
+    tool_timeout_s: float | None = None,
+) -> dict | None:
+    """Run semgrep over `root`, or only over `targets` (root-relative) when given.
+
+    With an `index` and a `cache`, only files whose (content hash, ruleset
+    hash, semgrep version) misses the cache are passed to semgrep as explicit
+    targets, in batches, minus `.semgrepignore` matches; their results are
+    merged with the cached per-file results into the usual `results`/`errors`
+    document. When most files miss (a cold cache), semgrep scans the root.
+    `index` may be a callable returning the index once the tree walk is done:
+    with no cached results for the ruleset, the root scan then starts
+    without waiting for it.
+
+    `cores` > 1 (default: `default_cores()`) runs semgrep as concurrent
+    shards split by ruleset and by size-balanced file bins, then merges and
+    de-duplicates their results. With an `index`, a whole-tree scan (cold
+    cache included) is binned over the indexed files too. `tool_timeout_s` is a wall-clock deadline
+    per semgrep process.
+    """
+    if which("semgrep") is None:
+        return None
+    target_list = list(targets) if targets is not None else None
+    if target_list is not None and not target_list:
+        # Empty change set: nothing to scan, but don't leave stale results behind
+        data = {"errors": [], "results": []}
+        _write(out_path, data)
+        return data
+    cfgs = list(configs) if configs else list(DEFAULT_CONFIGS)
+    cores = cores if cores is not None else default_cores()
+    if cache is None or index is None:
+        sizes = None
+        if index is not None and target_list is None and cores and cores > 1:
+            # The index's sizes let a whole-tree scan shard by path, not just by ruleset
+            sizes = _index_sizes(root, index() if callable(index) else index)
+            target_list = sorted(sizes)
+        return _scan(root, cfgs, target_list, timeout_s, out_path, cores=cores, sizes=sizes, deadline_s=tool_timeout_s)
+    return _run_incremental(root, out_path, timeout_s, cfgs, target_list, index, cache, cores, tool_timeout_s)
+
+
+def _index_sizes(root: Path, index: FileIndex) -> dict[str, int]:
+    """Size by root-relative path of the indexed files semgrep would scan."""
+    ignored = semgrepignore(root)
+    return {e.rel: e.size for e in index.select(exclude_dirs=SEMGREP_EXCLUDES) if not ignored(e.rel)}
+
+
+def _run_incremental(
+    root: Path,
+    out_path: Path,
+    timeout_s: int,
+    cfgs: list[str],
+    target_list: list[str] | None,
+    index: FileIndex | Callable[[], FileIndex],
+    cache: SemgrepCache,
+    cores: int | None = None,
+    deadline_s: float | None = None,
+) -> dict | None:
+    rules = ruleset_hash(root, cfgs)
+    version = semgrep_version()
+    wanted = set(target_list) if target_list is not None else None
+    ignored = semgrepignore(root)
+    spool = out_path.with_name(f"{out_path.stem}.fresh{out_path.suffix}")
+    early: dict | None = None
+    if callable(index):
+        prefix = SemgrepCache.key(rules, version, "")
+        sharded = bool(cores and cores > 1)
+        if wanted is None and not sharded and not any(k.startswith(prefix) for k in cache.entries):
+            # Nothing cached for this ruleset: scan the root while the tree walk finishes
+            # (a sharded scan waits for it: its path bins come from the index)
+            early = _scan(root, cfgs, ["."], timeout_s, spool, cores=cores, deadline_s=deadline_s)
+            if early is None:
+                spool.unlink(missing_ok=True)
+                return None
+        try:
+            index = index()
+        except Exception:
+            spool.unlink(missing_ok=True)
+            raise
+    hits: list[dict] = []
+    missing: dict[str, str] = {}
+    sizes: dict[str, int] = {}
+    all_sizes: dict[str, int] = {}
+    for e in index.select(exclude_dirs=SEMGREP_EXCLUDES):
+        if wanted is not None and e.rel not in wanted:
+            continue
+        if ignored(e.rel):
+            continue
+        all_sizes[e.rel] = e.size
+        try:
+            key = cache.key(rules, version, e.sha256)
+        except Exception:
+            continue
+        hit = cache.get(key)
+        if hit is None:
+            missing[e.rel] = key
+            sizes[e.rel] = e.size
+        else:
+            hits.extend({**r, "path": e.rel} for r in hit)
+    count_cache(cache.hits, cache.misses)
+    fresh: dict = {"errors": [], "results": []}
+    try:
+        if early is not None:
+            fresh, hits = early, []
+        elif missing:
+            # Cold cache: one scan of the root (semgrep's own ignores apply) beats many
+            # target lists, unless it is sharded: then every indexed file, binned by size
+            whole = wanted is None and 2 * len(missing) > len(all_sizes)
+            if whole and cores and cores > 1:
+                targets, sizes = sorted(all_sizes), all_sizes
+            else:
+                targets = ["."] if whole else sorted(missing)
+            data = _scan(root, cfgs, targets, timeout_s, spool, cores=cores, sizes=sizes, deadline_s=deadline_s)
+            if data is None:
+                return None
+            fresh = data
+            if whole:
+                # Every file was rescanned; cached results would duplicate them
+                hits = []
+        # Cached entries hold full results; only their slimmed form stays in memory
+        results = [_slim(r) for r in hits] + [{**r, "path": _rel(r.get("path", ""), root)} for r in fresh.get("results", []) or []]
+        by_path: dict[str, list[dict]] = {rel: [] for rel in missing}
+
+        def fresh_results() -> Iterator[dict]:
+            for r in _spool_results(spool, root):
+                if r["path"] in by_path:
+                    by_path[r["path"]].append({k: v for k, v in r.items() if k != "path"})
+                yield r
+
+        merged = {**fresh, "results": sorted(results, key=_result_order)}
+        _write_merged(out_path, merged, (hits, fresh_results() if missing or early is not None else ()))
+    finally:
+        if spool.exists():
+            spool.unlink()
+    # Files semgrep reported errors for are retried next run
+    errored = {_rel(e.get("path", ""), root) for e in (fresh.get("errors") or []) if isinstance(e, dict) and e.get("path")}
+    for rel, found in by_path.items():
+        if rel not in errored:
+            cache.put(missing[rel], found)
+    cache.save()
+    return merged
 
 
 def normalize_semgrep(data: dict) -> list[dict[str, Any]]:
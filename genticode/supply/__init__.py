@@ -1,9 +1,11 @@
 from .sbom import maybe_cyclonedx_py, maybe_cyclonedx_npm
 from .license import evaluate_licenses
+from .lockfiles import native_sbom
 
 __all__ = [
     "maybe_cyclonedx_py",
     "maybe_cyclonedx_npm",
     "evaluate_licenses",
+    "native_sbom",
 ]
 
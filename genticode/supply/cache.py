@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from ..proc import which
+
+
+# Root-level dependency inputs per ecosystem; tool results are reused while
+# these (and the tool binary) are unchanged
+PY_INPUTS = (
+    "requirements.txt",
+    "requirements.lock",
+    "requirements-dev.txt",
+    "poetry.lock",
+    "uv.lock",
+    "pip-tools.lock",
+    "Pipfile.lock",
+    "pyproject.toml",
+    "setup.cfg",
+    "setup.py",
+)
+NODE_INPUTS = ("package.json", "package-lock.json", "npm-shrinkwrap.json", "pnpm-lock.yaml", "yarn.lock")
+
+TOOL_INPUTS = {
+    "cyclonedx-py": PY_INPUTS,
+    "pip-audit": PY_INPUTS,
+    "cyclonedx-npm": NODE_INPUTS,
+    "npm-audit": NODE_INPUTS,
+}
+# Executable whose upgrade invalidates a tool's cached results
+TOOL_BINARY = {"cyclonedx-py": "cyclonedx-py", "pip-audit": "pip-audit", "cyclonedx-npm": "npx", "npm-audit": "npm"}
+# Tools that inspect the installed Python environment rather than just the lockfiles
+ENV_TOOLS = ("cyclonedx-py", "pip-audit")
+# Variables that point those tools at another environment
+ENV_VARS = ("VIRTUAL_ENV", "PIPAPI_PYTHON_LOCATION", "PYTHONPATH")
+
+# Default max age of cached audit results, so new advisories are picked up
+DEFAULT_VULN_TTL_S = 24 * 3600
+
+
+def _interpreter(exe: str) -> str | None:
+    """The Python a console script runs under, from its shebang."""
+    try:
+        with open(exe, "rb") as fh:
+            line = fh.readline(512).decode("utf-8", errors="replace").strip()
+    except OSError:
+        return None
+    if not line.startswith("#!"):
+        return None
+    parts = line[2:].split()
+    if not parts:
+        return None
+    if Path(parts[0]).name == "env" and len(parts) > 1:
+        return which(parts[1])
+    return parts[0]
+
+
+def environment_state(exe: str | None) -> str:
+    """Interpreter, redirecting variables and installed distributions of the tool's environment.
+
+    Installed packages are taken from the `*.dist-info` names in the
+    interpreter prefix's site-packages, so an install or upgrade changes it.
+    """
+    h = hashlib.sha256()
+    for var in ENV_VARS:
+        h.update(f"{var}={os.environ.get(var, '')}\0".encode("utf-8"))
+    python = _interpreter(exe) if exe else None
+    if python:
+        h.update(python.encode("utf-8") + b"\0")
+        prefix = Path(python).parent.parent
+        for site in sorted(prefix.glob("lib/python*/site-packages")) + [prefix / "Lib" / "site-packages"]:
+            try:
+                names = sorted(n for n in os.listdir(site) if n.endswith(".dist-info"))
+            except OSError:
+                continue
+            h.update(str(site).encode("utf-8") + b"\0" + "\0".join(names).encode("utf-8"))
+    return h.hexdigest()
+
+
+def fingerprint(root: Path, tool: str) -> str:
+    """Hash of the tool's dependency inputs (name and content) and its binary.
+
+    For tools that audit the installed environment, its state is included
+    too (see `environment_state`).
+    """
+    h = hashlib.sha256(tool.encode("utf-8") + b"\0")
+    for name in TOOL_INPUTS.get(tool, ()):
+        p = root / name
+        if p.is_file():
+            h.update(name.encode("utf-8") + b"\0")
+            h.update(hashlib.sha256(p.read_bytes()).digest())
+    exe = which(TOOL_BINARY.get(tool, tool))
+    if exe:
+        try:
+            st = os.stat(exe)
+            h.update(f"{exe}:{st.st_size}:{st.st_mtime_ns}".encode("utf-8"))
+        except OSError:
+            h.update(exe.encode("utf-8"))
+    if tool in ENV_TOOLS:
+        h.update(environment_state(exe).encode("utf-8"))
+    return h.hexdigest()
+
+
+class SupplyCache:
+    """Last good artifact per supply tool, keyed by its input fingerprint.
+
+    Artifacts live as files under `dir` (`.genticode/cache/supply/`) next to an
+    `index.json` recording each tool's fingerprint and capture time.
+    """
+
+    def __init__(self, dir: Path):
+        self.dir = dir
+        self.index: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, dir: Path) -> "SupplyCache":
+        cache = cls(dir)
+        try:
+            data = json.loads((dir / "index.json").read_text())
+            if isinstance(data, dict):
+                cache.index = {k: v for k, v in data.items() if isinstance(v, dict)}
+        except Exception:
+            pass
+        return cache
+
+    def lookup(self, tool: str, fp: str, ttl_s: float | None = None, now: float | None = None) -> Path | None:
+        """Cached artifact for `tool` if its fingerprint matches and it is younger than `ttl_s`."""
+        with self._lock:
+            ent = self.index.get(tool)
+        if not ent or ent.get("fingerprint") != fp:
+            return None
+        now = time.time() if now is None else now
+        if ttl_s is not None and now - float(ent.get("created", 0)) >= ttl_s:
+            return None
+        path = self.dir / str(ent.get("file", ""))
+        return path if path.is_file() else None
+
+    def store(self, tool: str, fp: str, artifact: Path, now: float | None = None) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        name = f"{tool}.json"
+        tmp = self.dir / (name + ".tmp")
+        shutil.copyfile(artifact, tmp)
+        os.replace(tmp, self.dir / name)
+        with self._lock:
+            self.index[tool] = {"fingerprint": fp, "created": time.time() if now is None else now, "file": name}
+
+    def save(self) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.dir / "index.json.tmp"
+        with self._lock:
+            tmp.write_text(json.dumps(self.index, indent=2, sort_keys=True) + "\n")
+        os.replace(tmp, self.dir / "index.json")
@@ -1,30 +1,180 @@
 from __future__ import annotations
 
+import re
+from functools import lru_cache
 from typing import Iterable, Tuple
 
 
-def _iter_component_licenses(sbom: dict) -> Iterable[str]:
-    for comp in (sbom.get("components") or []):
-        lic = None
-        # CycloneDX license component forms
-        licenses = comp.get("licenses") or []
-        for l in licenses:
-            choice = l.get("license") or {}
-            lic = choice.get("id") or choice.get("name")
-            if lic:
-                yield str(lic)
+DEFAULT_ALLOW = {"MIT", "BSD-2-Clause", "BSD-3-Clause", "Apache-2.0"}
+DEFAULT_DENY = {"AGPL-3.0"}
 
+# Verdicts, best first: OR picks the best alternative, AND the worst term
+VERDICTS = ("allow", "unknown", "deny")
+_RANK = {v: i for i, v in enumerate(VERDICTS)}
 
-def evaluate_licenses(sbom: dict, allow: set[str] | None = None, deny: set[str] | None = None, fail_on_unknown: bool = True) -> Tuple[int, dict]:
-    allow = allow or {"MIT", "BSD-2-Clause", "BSD-3-Clause", "Apache-2.0"}
-    deny = deny or {"AGPL-3.0"}
+_TOKEN = re.compile(r"\s*(\(|\)|[A-Za-z0-9.+:-]+)")
+_OPERATORS = {"AND", "OR", "WITH"}
+
+
+class SpdxError(ValueError):
+    pass
+
+
+def _tokens(expr: str) -> list[str]:
+    out: list[str] = []
+    pos = 0
+    expr = expr.rstrip()
+    while pos < len(expr):
+        m = _TOKEN.match(expr, pos)
+        if not m:
+            raise SpdxError(f"unexpected character at {pos} in {expr!r}")
+        tok = m.group(1)
+        out.append(tok.upper() if tok.upper() in _OPERATORS else tok)
+        pos = m.end()
+    return out
+
+
+@lru_cache(maxsize=4096)
+def parse_expression(expr: str) -> tuple:
+    """Parse an SPDX license expression into a tree.
+
+    Nodes are `("id", license)`, `("with", license, exception)` and
+    `("and" | "or", (child, ...))`; WITH binds tighter than AND, AND tighter
+    than OR. Raises SpdxError on malformed input.
+    """
+    toks = _tokens(expr)
+    pos = 0
+
+    def peek() -> str | None:
+        return toks[pos] if pos < len(toks) else None
+
+    def take() -> str:
+        nonlocal pos
+        if pos >= len(toks):
+            raise SpdxError(f"unexpected end of {expr!r}")
+        pos += 1
+        return toks[pos - 1]
+
+    def primary() -> tuple:
+        tok = take()
+        if tok == "(":
+            node = disjunction()
+            if take() != ")":
+                raise SpdxError(f"unbalanced parentheses in {expr!r}")
+            return node
+        if tok in _OPERATORS or tok == ")":
+            raise SpdxError(f"unexpected {tok!r} in {expr!r}")
+        if peek() == "WITH":
+            take()
+            exc = take()
+            if exc in _OPERATORS or exc in ("(", ")"):
+                raise SpdxError(f"missing exception after WITH in {expr!r}")
+            return ("with", tok, exc)
+        return ("id", tok)
+
+    def chain(op: str, operand) -> tuple:
+        items = [operand()]
+        while peek() == op:
+            take()
+            items.append(operand())
+        return items[0] if len(items) == 1 else (op.lower(), tuple(items))
+
+    def conjunction() -> tuple:
+        return chain("AND", primary)
+
+    def disjunction() -> tuple:
+        return chain("OR", conjunction)
+
+    node = disjunction()
+    if pos != len(toks):
+        raise SpdxError(f"trailing {toks[pos]!r} in {expr!r}")
+    return node
+
+
+def _leaf(lic: str, allow: set[str], deny: set[str]) -> str:
+    if lic in deny:
+        return "deny"
+    return "allow" if lic in allow else "unknown"
+
+
+def evaluate_expression(node: tuple, allow: set[str], deny: set[str]) -> str:
+    """Verdict for a parsed expression: "allow", "deny" or "unknown"."""
+    kind = node[0]
+    if kind == "id":
+        return _leaf(node[1], allow, deny)
+    if kind == "with":
+        # A policy entry for the exact "X WITH Y" pair wins over the bare license
+        full = f"{node[1]} WITH {node[2]}"
+        return _leaf(full, allow, deny) if (full in allow or full in deny) else _leaf(node[1], allow, deny)
+    verdicts = [evaluate_expression(child, allow, deny) for child in node[1]]
+    pick = min if kind == "or" else max
+    return pick(verdicts, key=_RANK.__getitem__)
+
+
+def _component_licenses(comp: dict) -> Iterable[tuple[str, bool]]:
+    """(license, is_expression) for each CycloneDX license entry of a component."""
+    for entry in comp.get("licenses") or []:
+        if not isinstance(entry, dict):
+            continue
+        if entry.get("expression"):
+            yield str(entry["expression"]), True
+            continue
+        choice = entry.get("license") or {}
+        lic = choice.get("id") or choice.get("name")
+        if lic:
+            # Free-text names are matched verbatim, never parsed
+            yield str(lic), bool(choice.get("id"))
+
+
+def evaluate_licenses(
+    sbom: dict,
+    allow: set[str] | None = None,
+    deny: set[str] | None = None,
+    fail_on_unknown: bool = True,
+    missing_unknown: bool = False,
+) -> Tuple[int, dict]:
+    """Count license entries that are denied or (with `fail_on_unknown`) unknown.
+
+    Ids and expressions (AND/OR/WITH) are evaluated once per distinct string.
+    `detail["components"]` holds a verdict per licensed component, the worst
+    of its entries; unparseable expressions count as unknown. With
+    `missing_unknown`, a component without license data counts as one
+    unknown `NOASSERTION` entry instead of being skipped.
+    """
+    allow = allow or DEFAULT_ALLOW
+    deny = deny or DEFAULT_DENY
+    memo: dict[str, str] = {}
     violations = []
     unknown = []
-    for lic in _iter_component_licenses(sbom):
-        if lic in deny:
-            violations.append(lic)
-        elif lic not in allow and fail_on_unknown:
-            unknown.append(lic)
+    components = []
+    for comp in sbom.get("components") or []:
+        verdicts = []
+        for lic, parse in _component_licenses(comp):
+            verdict = memo.get(lic)
+            if verdict is None:
+                try:
+                    # Policy entries matching the whole string verbatim win
+                    verbatim = not parse or lic in allow or lic in deny
+                    verdict = _leaf(lic, allow, deny) if verbatim else evaluate_expression(parse_expression(lic), allow, deny)
+                except SpdxError:
+                    verdict = "unknown"
+                memo[lic] = verdict
+            verdicts.append(verdict)
+            if verdict == "deny":
+                violations.append(lic)
+            elif verdict == "unknown" and fail_on_unknown:
+                unknown.append(lic)
+        if not verdicts and missing_unknown:
+            verdicts.append("unknown")
+            if fail_on_unknown:
+                unknown.append("NOASSERTION")
+        if verdicts:
+            components.append(
+                {
+                    "name": comp.get("name"),
+                    "version": comp.get("version"),
+                    "verdict": max(verdicts, key=_RANK.__getitem__),
+                }
+            )
     total = len(violations) + len(unknown)
-    return total, {"deny": violations, "unknown": unknown}
-
+    return total, {"deny": violations, "unknown": unknown, "components": components}
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Callable, Iterable
+from urllib.parse import quote
+
+
+# Lockfiles the native SBOM provider understands, per ecosystem
+NODE_LOCKFILES = ("package-lock.json", "npm-shrinkwrap.json", "pnpm-lock.yaml", "yarn.lock")
+PY_LOCKFILES = ("poetry.lock", "uv.lock", "requirements.lock")
+# Pinned requirements files (`name==version` lines) also count for Python
+PY_REQUIREMENTS_GLOB = "requirements*.txt"
+
+_PIN = re.compile(r"^([A-Za-z0-9][A-Za-z0-9._-]*)(?:\[[^\]]*\])?\s*===?\s*([^\s;#\\]+)")
+_TOML_STR = re.compile(r'^(\w+)\s*=\s*"((?:[^"\\]|\\.)*)"')
+_SPDX_ID = re.compile(r"^[A-Za-z0-9.+-]+$")
+
+
+def _purl(ecosystem: str, name: str, version: str) -> str:
+    if ecosystem == "pypi":
+        name = re.sub(r"[-_.]+", "-", name).lower()
+    return f"pkg:{ecosystem}/{quote(name, safe='/')}@{quote(version, safe='')}"
+
+
+def component(ecosystem: str, name: str, version: str, license: str | None = None, dev: bool = False) -> dict:
+    """A CycloneDX `library` component; `license` may be an SPDX id or expression."""
+    purl = _purl(ecosystem, name, version)
+    comp: dict = {"type": "library", "bom-ref": purl, "name": name, "version": version, "purl": purl}
+    if license:
+        comp["licenses"] = [{"license": {"id": license}}] if _SPDX_ID.match(license) else [{"expression": license}]
+    if dev:
+        comp["scope"] = "optional"
+    return comp
+
+
+def parse_package_lock(path: Path) -> list[dict]:
+    """npm package-lock.json / npm-shrinkwrap.json (v1 `dependencies`, v2/v3 `packages`)."""
+    data = json.loads(path.read_text() or "{}")
+    out: list[dict] = []
+    packages = data.get("packages")
+    if isinstance(packages, dict):
+        for key, meta in packages.items():
+            # "" is the root project; links point at workspace folders
+            if not key or not isinstance(meta, dict) or meta.get("link"):
+                continue
+            name = meta.get("name") or key.rsplit("node_modules/", 1)[-1]
+            if meta.get("version"):
+                lic = meta.get("license")
+                out.append(component("npm", name, str(meta["version"]), lic if isinstance(lic, str) else None, bool(meta.get("dev"))))
+        return out
+
+    def walk(deps: dict) -> None:
+        for name, meta in (deps or {}).items():
+            if isinstance(meta, dict) and meta.get("version"):
+                out.append(component("npm", name, str(meta["version"]), dev=bool(meta.get("dev"))))
+                walk(meta.get("dependencies") or {})
+
+    walk(data.get("dependencies") or {})
+    return out
+
+
+def _split_pnpm_key(key: str, v5: bool) -> tuple[str, str] | None:
+    key = key.strip().strip("'\"").lstrip("/")
+    if v5:
+        # /name/1.2.3_peer@x  or  /@scope/name/1.2.3
+        if "/" not in key:
+            return None
+        name, ver = key.rsplit("/", 1)
+        return name, ver.split("_", 1)[0]
+    # name@1.2.3(peer@x)  or  @scope/name@1.2.3
+    key = key.split("(", 1)[0]
+    at = key.rfind("@")
+    if at <= 0:
+        return None
+    return key[:at], key[at + 1 :]
+
+
+def parse_pnpm_lock(path: Path) -> list[dict]:
+    """pnpm-lock.yaml (v5 `/name/ver`, v6 `/name@ver`, v9 `name@ver` package keys).
+
+    Line-based: reads the keys of the top-level `packages:` mapping only.
+    """
+    out: list[dict] = []
+    v5 = False
+    in_packages = False
+    for line in path.read_text().splitlines():
+        if line.startswith("lockfileVersion:"):
+            ver = line.split(":", 1)[1].strip().strip("'\"")
+            v5 = ver.split(".", 1)[0] == "5"
+        elif line and not line[0].isspace():
+            in_packages = line.rstrip() == "packages:"
+        elif in_packages and line.startswith("  ") and not line.startswith("   ") and line.rstrip().endswith(":"):
+            parsed = _split_pnpm_key(line.rstrip()[:-1], v5)
+            if parsed:
+                out.append(component("npm", *parsed))
+    return out
+
+
+def parse_yarn_lock(path: Path) -> list[dict]:
+    """yarn.lock, classic (v1) and berry (v2+) formats."""
+    out: list[dict] = []
+    name: str | None = None
+    for line in path.read_text().splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        if not line[0].isspace():
+            spec = line.rstrip().rstrip(":").split(",")[0].strip().strip("'\"")
+            at = spec.find("@", 1)
+            name = spec[:at] if at > 0 else None
+            if name is None or spec == "__metadata" or "@workspace:" in spec:
+                name = None
+        elif name is not None:
+            body = line.strip()
+            if body.startswith("version"):
+                ver = body[len("version") :].lstrip(":").strip().strip("'\"")
+                if ver:
+                    out.append(component("npm", name, ver))
+                name = None
+    return out
+
+
+def _toml_packages(path: Path) -> Iterable[dict]:
+    """Top-level string keys of each `[[package]]` table (enough for poetry.lock/uv.lock)."""
+    cur: dict | None = None
+    for line in path.read_text().splitlines():
+        s = line.strip()
+        if s.startswith("["):
+            if cur is not None:
+                yield cur
+            cur = {} if s == "[[package]]" else None
+            continue
+        if cur is None:
+            continue
+        m = _TOML_STR.match(s)
+        if m:
+            cur[m.group(1)] = m.group(2)
+        elif s.startswith("source") and ("editable" in s or "virtual" in s):
+            # uv: the project itself and workspace members
+            cur["_local"] = "1"
+    if cur is not None:
+        yield cur
+
+
+def parse_poetry_lock(path: Path) -> list[dict]:
+    """poetry.lock or uv.lock `[[package]]` entries."""
+    out: list[dict] = []
+    for pkg in _toml_packages(path):
+        if pkg.get("name") and pkg.get("version") and not pkg.get("_local"):
+            out.append(component("pypi", pkg["name"], pkg["version"], dev=pkg.get("category") == "dev"))
+    return out
+
+
+parse_uv_lock = parse_poetry_lock
+
+
+def parse_requirements(path: Path) -> list[dict]:
+    """Pinned `name==version` lines; ranges, options and includes are skipped."""
+    out: list[dict] = []
+    for line in path.read_text().splitlines():
+        m = _PIN.match(line.strip())
+        if m:
+            out.append(component("pypi", m.group(1), m.group(2)))
+    return out
+
+
+PARSERS: dict[str, Callable[[Path], list[dict]]] = {
+    "package-lock.json": parse_package_lock,
+    "npm-shrinkwrap.json": parse_package_lock,
+    "pnpm-lock.yaml": parse_pnpm_lock,
+    "yarn.lock": parse_yarn_lock,
+    "poetry.lock": parse_poetry_lock,
+    "uv.lock": parse_uv_lock,
+    "requirements.lock": parse_requirements,
+}
+
+
+def unlicensed(sbom: dict) -> int:
+    """Components without any license entry (pnpm, yarn and Python lockfiles record none)."""
+    return sum(1 for c in sbom.get("components") or [] if not c.get("licenses"))
+
+
+def lockfiles(root: Path, ecosystem: str) -> list[Path]:
+    """Root-level lockfiles present for `ecosystem` ("python" or "node")."""
+    if ecosystem == "node":
+        return [root / n for n in NODE_LOCKFILES if (root / n).is_file()]
+    found = [root / n for n in PY_LOCKFILES if (root / n).is_file()]
+    return found + sorted(root.glob(PY_REQUIREMENTS_GLOB))
+
+
+def native_sbom(root: Path, ecosystem: str) -> dict | None:
+    """CycloneDX-shaped SBOM from the ecosystem's lockfiles.
+
+    None unless at least one pinned component was parsed (e.g. requirements
+    files with only ranges), so callers fall back to the deep provider.
+    """
+    comps: dict[str, dict] = {}
+    files = []
+    for f in lockfiles(root, ecosystem):
+        parse = PARSERS.get(f.name, parse_requirements)
+        parsed = parse(f)
+        if parsed:
+            files.append(f)
+        for c in parsed:
+            comps.setdefault(c["purl"], c)
+    if not comps:
+        return None
+    return {
+        "bomFormat": "CycloneDX",
+        "specVersion": "1.5",
+        "version": 1,
+        "metadata": {
+            "tools": [{"vendor": "genticode", "name": "genticode-lockfiles"}],
+            "properties": [{"name": "genticode:lockfile", "value": f.name} for f in files],
+        },
+        "components": [comps[k] for k in sorted(comps)],
+    }
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import sqlite3
+import zipfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Collection, Iterable, Iterator
+from urllib.parse import unquote
+
+
+# Local index location under .genticode/, built by `genticode supply db import`
+OSV_DB_REL = "osv/index.sqlite"
+# Ecosystems the matcher can evaluate (OSV name -> purl type)
+ECOSYSTEMS = {"PyPI": "pypi", "npm": "npm"}
+_PURL_ECOSYSTEM = {v: k for k, v in ECOSYSTEMS.items()}
+_QUERY_CHUNK = 500
+
+_SEVERITY_ALIASES = {"moderate": "medium", "important": "high"}
+
+
+def default_db(gc_dir: Path) -> Path:
+    return gc_dir / OSV_DB_REL
+
+
+def normalize_name(ecosystem: str, name: str) -> str:
+    if ecosystem == "PyPI":
+        return re.sub(r"[-_.]+", "-", name).lower()
+    return name
+
+
+# --- Versions -----------------------------------------------------------------
+
+_PEP440 = re.compile(
+    r"^\s*v?(?:(\d+)!)?(\d+(?:\.\d+)*)"
+    r"(?:[-_.]?(a|b|c|rc|alpha|beta|pre|preview)[-_.]?(\d*))?"
+    r"(?:-(\d+)|[-_.]?(post|rev|r)[-_.]?(\d*))?"
+    r"(?:[-_.]?(dev)[-_.]?(\d*))?"
+    r"(?:\+[a-z0-9]+(?:[-_.][a-z0-9]+)*)?\s*$",
+    re.I,
+)
+_PRE_RANK = {"a": 0, "alpha": 0, "b": 1, "beta": 1, "c": 2, "rc": 2, "pre": 2, "preview": 2}
+_SEMVER = re.compile(r"^\s*v?(\d+)\.(\d+)\.(\d+)(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?\s*$")
+
+
+@lru_cache(maxsize=65536)
+def pep440_key(version: str) -> tuple | None:
+    """Sort key following PEP 440 ordering (local versions ignored); None if unparseable."""
+    m = _PEP440.match(version)
+    if not m:
+        return None
+    epoch, release, pre_l, pre_n, post_implicit, post_l, post_n, dev_l, dev_n = m.groups()
+    rel = tuple(int(x) for x in release.split("."))
+    while len(rel) > 1 and rel[-1] == 0:
+        rel = rel[:-1]
+    has_post = post_implicit is not None or post_l is not None
+    if pre_l:
+        pre: tuple = (0, _PRE_RANK[pre_l.lower()], int(pre_n or 0))
+    elif dev_l and not has_post:
+        pre = (-1,)  # 1.0.dev1 sorts before 1.0a1
+    else:
+        pre = (1,)
+    post = (int(post_implicit if post_implicit is not None else (post_n or 0)),) if has_post else (-1,)
+    dev = (0, int(dev_n or 0)) if dev_l else (1, 0)
+    return (int(epoch or 0), rel, pre, post, dev)
+
+
+@lru_cache(maxsize=65536)
+def semver_key(version: str) -> tuple | None:
+    """Sort key following SemVer 2.0 precedence (build metadata ignored)."""
+    m = _SEMVER.match(version)
+    if not m:
+        return None
+    major, minor, patch, pre = m.groups()
+    if not pre:
+        return (int(major), int(minor), int(patch), (1,))
+    ids = tuple((0, int(p), "") if p.isdigit() else (1, 0, p) for p in pre.split("."))
+    return (int(major), int(minor), int(patch), (0, ids))
+
+
+def version_key(ecosystem: str, version: str) -> tuple | None:
+    return pep440_key(version) if ecosystem == "PyPI" else semver_key(version)
+
+
+def _affected_by_range(ecosystem: str, key: tuple, events: list[dict]) -> bool:
+    """OSV range evaluation: walk events in version order toggling 'vulnerable'."""
+    ordered: list[tuple[tuple, int, str]] = []
+    for ev in events:
+        for kind, rank in (("introduced", 0), ("fixed", 1), ("last_affected", 2)):
+            if kind in ev:
+                v = str(ev[kind])
+                ek = () if (kind == "introduced" and v == "0") else version_key(ecosystem, v)
+                if ek is not None:
+                    ordered.append((ek, rank, kind))
+    vulnerable = False
+    for ek, _, kind in sorted(ordered):
+        if kind == "introduced" and key >= ek:
+            vulnerable = True
+        elif kind == "fixed" and key >= ek:
+            vulnerable = False
+        elif kind == "last_affected" and key > ek:
+            vulnerable = False
+    return vulnerable
+
+
+def is_affected(ecosystem: str, version: str, ranges: list[dict], versions: Collection[str] = ()) -> bool:
+    if version in versions:
+        return True
+    key = version_key(ecosystem, version)
+    if key is None:
+        return False
+    for r in ranges:
+        if r.get("type") in ("SEMVER", "ECOSYSTEM") and _affected_by_range(ecosystem, key, r.get("events") or []):
+            return True
+    return False
+
+
+# --- Severity -------------------------------------------------------------------
+
+_CVSS3 = {
+    "AV": {"N": 0.85, "A": 0.62, "L": 0.55, "P": 0.2},
+    "AC": {"L": 0.77, "H": 0.44},
+    "UI": {"N": 0.85, "R": 0.62},
+    "CIA": {"H": 0.56, "L": 0.22, "N": 0.0},
+}
+
+
+def _roundup(x: float) -> float:
+    i = round(x * 100000)
+    return i / 100000.0 if i % 10000 == 0 else (math.floor(i / 10000) + 1) / 10.0
+
+
+def cvss3_score(vector: str) -> float | None:
+    """CVSS v3.x base score from a vector string, or None if it isn't one."""
+    if not vector.startswith("CVSS:3"):
+        return None
+    m = dict(part.split(":", 1) for part in vector.split("/")[1:] if ":" in part)
+    try:
+        changed = m["S"] == "C"
+        pr = {"N": 0.85, "L": 0.68 if changed else 0.62, "H": 0.5 if changed else 0.27}[m["PR"]]
+        c, i, a = (_CVSS3["CIA"][m[k]] for k in ("C", "I", "A"))
+        iss = 1 - (1 - c) * (1 - i) * (1 - a)
+        impact = 7.52 * (iss - 0.029) - 3.25 * (iss - 0.02) ** 15 if changed else 6.42 * iss
+        expl = 8.22 * _CVSS3["AV"][m["AV"]] * _CVSS3["AC"][m["AC"]] * pr * _CVSS3["UI"][m["UI"]]
+    except KeyError:
+        return None
+    if impact <= 0:
+        return 0.0
+    return _roundup(min((1.08 if changed else 1.0) * (impact + expl), 10))
+
+
+def _rating(score: float) -> str:
+    if score >= 9.0:
+        return "critical"
+    if score >= 7.0:
+        return "high"
+    if score >= 4.0:
+        return "medium"
+    return "low" if score > 0 else "info"
+
+
+def severity_of(vuln: dict, affected: dict | None = None) -> str:
+    for src in ((affected or {}).get("ecosystem_specific"), (affected or {}).get("database_specific"), vuln.get("database_specific")):
+        sev = (src or {}).get("severity") if isinstance(src, dict) else None
+        if isinstance(sev, str) and sev:
+            sev = sev.lower()
+            return _SEVERITY_ALIASES.get(sev, sev)
+    for s in vuln.get("severity") or []:
+        score = cvss3_score(str(s.get("score", ""))) if s.get("type") == "CVSS_V3" else None
+        if score is not None:
+            return _rating(score)
+    return "info"
+
+
+# --- Index ----------------------------------------------------------------------
+
+_SCHEMA = """
+CREATE TABLE affected (
+    ecosystem TEXT NOT NULL,
+    name TEXT NOT NULL,
+    vuln_id TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    ranges TEXT NOT NULL,
+    versions TEXT NOT NULL
+);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+class OsvImportError(ValueError):
+    pass
+
+
+def _iter_dump(src: Path, skipped: list[str]) -> Iterator[dict]:
+    """OSV records from a directory of JSON files and/or OSV `all.zip` archives.
+
+    Unreadable files and archive members are appended to `skipped`; the rest
+    of the dump is still imported.
+    """
+    paths = [src] if src.is_file() else sorted(p for p in src.rglob("*") if p.suffix in (".json", ".zip"))
+    for p in paths:
+        if p.suffix != ".zip":
+            try:
+                record = json.loads(p.read_text())
+            except Exception:
+                skipped.append(str(p))
+                continue
+            yield record
+            continue
+        try:
+            zf = zipfile.ZipFile(p)
+        except Exception:
+            skipped.append(str(p))
+            continue
+        with zf:
+            for member in sorted(zf.namelist()):
+                if not member.endswith(".json"):
+                    continue
+                try:
+                    record = json.loads(zf.read(member))
+                except Exception:
+                    skipped.append(f"{p}:{member}")
+                    continue
+                yield record
+
+
+def import_dump(src: Path, db_path: Path) -> dict:
+    """Build the SQLite index at `db_path` from an OSV dump; replaces any existing index.
+
+    Malformed files or archive members are skipped and counted in
+    `stats["skipped"]`. A dump that yields no advisories raises
+    OsvImportError and leaves an existing index untouched.
+    """
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = db_path.with_name(db_path.name + ".tmp")
+    if tmp.exists():
+        tmp.unlink()
+    con = sqlite3.connect(tmp)
+    stats = {"records": 0, "withdrawn": 0, "affected": 0, "skipped": 0}
+    skipped: list[str] = []
+    try:
+        con.executescript(_SCHEMA)
+        rows: list[tuple] = []
+        for vuln in _iter_dump(src, skipped):
+            if not isinstance(vuln, dict) or not vuln.get("id"):
+                continue
+            stats["records"] += 1
+            if vuln.get("withdrawn"):
+                stats["withdrawn"] += 1
+                continue
+            for aff in vuln.get("affected") or []:
+                pkg = aff.get("package") or {}
+                eco = pkg.get("ecosystem")
+                if eco not in ECOSYSTEMS or not pkg.get("name"):
+                    continue
+                ranges = [{"type": r.get("type"), "events": r.get("events") or []} for r in aff.get("ranges") or [] if r.get("type") != "GIT"]
+                rows.append(
+                    (
+                        eco,
+                        normalize_name(eco, pkg["name"]),
+                        vuln["id"],
+                        severity_of(vuln, aff),
+                        json.dumps(ranges, separators=(",", ":")),
+                        json.dumps(aff.get("versions") or [], separators=(",", ":")),
+                    )
+                )
+            if len(rows) >= 10_000:
+                con.executemany("INSERT INTO affected VALUES (?,?,?,?,?,?)", rows)
+                rows.clear()
+        con.executemany("INSERT INTO affected VALUES (?,?,?,?,?,?)", rows)
+        con.execute("CREATE INDEX affected_pkg ON affected (ecosystem, name)")
+        stats["affected"] = int(con.execute("SELECT COUNT(*) FROM affected").fetchone()[0])
+        con.execute("INSERT INTO meta VALUES ('source', ?)", (str(src),))
+        con.commit()
+    finally:
+        con.close()
+    stats["skipped"] = len(skipped)
+    if stats["records"] == 0:
+        tmp.unlink()
+        raise OsvImportError(f"no OSV advisories in {src} ({len(skipped)} unreadable file(s) skipped)")
+    os.replace(tmp, db_path)
+    return stats
+
+
+# --- Matching -------------------------------------------------------------------
+
+
+def parse_purl(purl: str) -> tuple[str, str, str] | None:
+    """(OSV ecosystem, normalized name, version) for pypi/npm purls."""
+    if not purl.startswith("pkg:") or "@" not in purl:
+        return None
+    body = purl[4:].split("?", 1)[0].split("#", 1)[0]
+    kind, _, rest = body.partition("/")
+    eco = _PURL_ECOSYSTEM.get(kind.lower())
+    at = rest.rfind("@")
+    if eco is None or at <= 0:
+        return None
+    return eco, normalize_name(eco, unquote(rest[:at])), unquote(rest[at + 1 :])
+
+
+def match_components(db_path: Path, components: Iterable[dict]) -> list[dict[str, Any]]:
+    """Resolve SBOM components against the local index.
+
+    Returns records shaped like `normalize_pip_audit` output (plus `id` and
+    `version`), one per (package, version, advisory), sorted.
+    """
+    wanted: dict[tuple[str, str], set[str]] = {}
+    for comp in components:
+        parsed = parse_purl(str(comp.get("purl") or ""))
+        if parsed:
+            eco, name, version = parsed
+            wanted.setdefault((eco, name), set()).add(version)
+    out: dict[tuple, dict] = {}
+    con = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        for eco in sorted({e for e, _ in wanted}):
+            names = sorted(n for e, n in wanted if e == eco)
+            for i in range(0, len(names), _QUERY_CHUNK):
+                chunk = names[i : i + _QUERY_CHUNK]
+                rows = con.execute(
+                    f"SELECT name, vuln_id, severity, ranges, versions FROM affected WHERE ecosystem = ? AND name IN ({','.join('?' * len(chunk))})",
+                    (eco, *chunk),
+                )
+                for name, vid, sev, ranges, versions in rows:
+                    ranges_l, versions_l = json.loads(ranges), set(json.loads(versions))
+                    for version in wanted[(eco, name)]:
+                        if is_affected(eco, version, ranges_l, versions_l):
+                            out[(name, version, vid)] = {"tool": "osv", "package": name, "version": version, "severity": sev, "id": vid}
+    finally:
+        con.close()
+    return [out[k] for k in sorted(out)]
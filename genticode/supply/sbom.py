@@ -1,39 +1,52 @@
 from __future__ import annotations
 
 import json
-import shutil
 import subprocess
 from pathlib import Path
 
+from ..proc import run_capture, which
 
-def maybe_cyclonedx_py(root: Path, out: Path) -> dict | None:
-    if shutil.which("cyclonedx-py") is None:
+
+def load_sbom(path: Path) -> dict:
+    return json.loads(path.read_text() or "{}")
+
+
+def _sbom(data) -> dict | None:
+    """`data` if it looks like a CycloneDX document; empty or error output is no SBOM."""
+    return data if isinstance(data, dict) and ("components" in data or "bomFormat" in data) else None
+
+
+def maybe_cyclonedx_py(root: Path, out: Path, timeout_s: float | None = None) -> dict | None:
+    if which("cyclonedx-py") is None:
         return None
     try:
-        cp = subprocess.run(["cyclonedx-py", "-o", str(out)], cwd=str(root), capture_output=True, text=True, check=False)
+        cp = run_capture(["cyclonedx-py", "-o", str(out)], root, check=True, timeout_s=timeout_s)
         # Tool may write directly to file; try to read it
         if out.exists():
-            return json.loads(out.read_text() or "{}")
-        return json.loads(cp.stdout or "{}")
+            return _sbom(load_sbom(out))
+        return _sbom(json.loads(cp.stdout or "{}"))
+    except subprocess.TimeoutExpired:
+        raise
     except Exception:
         return None
 
 
-def maybe_cyclonedx_npm(root: Path, out: Path) -> dict | None:
-    if shutil.which("npx") is None:
+def maybe_cyclonedx_npm(root: Path, out: Path, timeout_s: float | None = None) -> dict | None:
+    if which("npx") is None:
         return None
     try:
-        cp = subprocess.run([
-            "npx",
-            "@cyclonedx/cyclonedx-npm",
-            "--output-format",
-            "json",
-            "--output-file",
-            str(out),
-        ], cwd=str(root), capture_output=True, text=True, check=False)
+        cp = run_capture(
+            ["npx", "@cyclonedx/cyclonedx-npm", "--output-format", "json", "--output-file", str(out)],
+            root,
+            check=True,
+            timeout_s=timeout_s,
+            name="cyclonedx-npm",
+        )
         if out.exists():
-            return json.loads(out.read_text() or "{}")
-        return json.loads(cp.stdout or "{}")
+            return _sbom(load_sbom(out))
+        return _sbom(json.loads(cp.stdout or "{}"))
+    except subprocess.TimeoutExpired:
+        raise
     except Exception:
         return None
 
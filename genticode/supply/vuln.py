@@ -1,39 +1,75 @@
 from __future__ import annotations
 
-import json
-import shutil
 import subprocess
 from pathlib import Path
 from typing import Any, Iterable
 
+from ..jsonstream import iter_items, iter_members
+from ..proc import run_to_file, which
 
-def maybe_pip_audit(root: Path, out: Path) -> dict | None:
-    if shutil.which("pip-audit") is None:
+
+# Audit exit codes: 0 clean, 1 vulnerabilities found; anything else is a failed run
+AUDIT_EXIT_OK = (0, 1)
+
+# Only these fields are kept in memory; the raw output stays on disk as written
+_PIP_KEEP = ("name", "package", "severity", "id")
+_NPM_KEEP = ("severity", "module_name")
+
+
+def _slim(item: Any, keep: tuple[str, ...]) -> Any:
+    return {k: item[k] for k in keep if k in item} if isinstance(item, dict) else item
+
+
+def load_pip_audit(path: Path) -> dict:
+    """Stream a pip-audit JSON artifact into slimmed `vulns`."""
+    return {"vulns": [_slim(v, _PIP_KEEP) for v in iter_items(path, "vulns")]}
+
+
+def load_npm_audit(path: Path) -> dict:
+    """Stream an npm audit JSON artifact into slimmed advisories/vulnerabilities."""
+    data: dict = {}
+    for key, name, item in iter_members(path, ("advisories", "vulnerabilities")):
+        if name is not None:
+            data.setdefault(key, {})[name] = _slim(item, _NPM_KEEP)
+        elif isinstance(item, dict):
+            data[key] = {k: _slim(v, _NPM_KEEP) for k, v in item.items()}
+    return data
+
+
+def _completed(run, out: Path) -> bool:
+    """The audit exited normally and wrote a JSON object that is not an error body.
+
+    Offline or failed runs (empty output, `{"error": ...}`) must not load as
+    an empty, clean vulnerability list. Malformed JSON raises ValueError.
+    """
+    if run.returncode not in AUDIT_EXIT_OK or not out.exists() or out.stat().st_size == 0:
+        return False
+    return not any(True for _ in iter_members(out, ("error",)))
+
+
+def maybe_pip_audit(root: Path, out: Path, timeout_s: float | None = None) -> dict | None:
+    """Run pip-audit with its JSON streamed to `out`; return the slimmed `vulns`."""
+    if which("pip-audit") is None:
         return None
     try:
-        cp = subprocess.run([
-            "pip-audit", "-f", "json"
-        ], cwd=str(root), capture_output=True, text=True, check=False)
-        data = json.loads(cp.stdout or "{}")
-        out.parent.mkdir(parents=True, exist_ok=True)
-        out.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
-        return data
+        run = run_to_file(["pip-audit", "-f", "json"], root, out, timeout_s=timeout_s)
+        return load_pip_audit(out) if _completed(run, out) else None
+    except subprocess.TimeoutExpired:
+        raise
     except Exception:
         return None
 
 
-def maybe_npm_audit(root: Path, out: Path) -> dict | None:
+def maybe_npm_audit(root: Path, out: Path, timeout_s: float | None = None) -> dict | None:
+    """Run npm audit with its JSON streamed to `out`; return slimmed advisories/vulnerabilities."""
     # Prefer npm audit for availability
-    if shutil.which("npm") is None:
+    if which("npm") is None:
         return None
     try:
-        cp = subprocess.run([
-            "npm", "audit", "--json"
-        ], cwd=str(root), capture_output=True, text=True, check=False)
-        data = json.loads(cp.stdout or "{}")
-        out.parent.mkdir(parents=True, exist_ok=True)
-        out.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
-        return data
+        run = run_to_file(["npm", "audit", "--json"], root, out, timeout_s=timeout_s, name="npm-audit")
+        return load_npm_audit(out) if _completed(run, out) else None
+    except subprocess.TimeoutExpired:
+        raise
     except Exception:
         return None
 
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+from .trace import span
+
+try:
+    import resource  # POSIX only
+except Exception:  # pragma: no cover - Windows
+    resource = None  # type: ignore
+
+
+# Per-pack metrics recorded under counts.telemetry and gateable via
+# budgets.performance.metrics (see gate.evaluate)
+METRICS = (
+    "cpu_user_ms",
+    "cpu_sys_ms",
+    "cpu_children_user_ms",
+    "cpu_children_sys_ms",
+    "files_scanned",
+    "bytes_read",
+    "subprocesses",
+    "tool_ms",
+    "tool_wait_ms",
+    "python_ms",
+    "cache_hits",
+    "cache_misses",
+)
+
+_local = threading.local()
+
+
+def _rss_kb(raw: int) -> int:
+    # ru_maxrss is KiB on Linux but bytes on macOS
+    return int(raw // 1024) if sys.platform == "darwin" else int(raw)
+
+
+def _thread_cpu() -> tuple[float, float]:
+    """(user, sys) CPU seconds of the calling thread, best effort."""
+    who = getattr(resource, "RUSAGE_THREAD", None) if resource is not None else None
+    if who is not None:
+        ru = resource.getrusage(who)
+        return ru.ru_utime, ru.ru_stime
+    return time.thread_time(), 0.0
+
+
+def _children_cpu() -> tuple[float, float]:
+    """(user, sys) CPU seconds of all reaped child processes so far."""
+    if resource is None:
+        return 0.0, 0.0
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return ru.ru_utime, ru.ru_stime
+
+
+def process_peaks() -> dict:
+    """Process-wide peak RSS of this process and of its largest reaped child.
+
+    These are high-water marks shared by every pack, so they are reported
+    once per run rather than per pack.
+    """
+    if resource is None:
+        return {}
+    return {
+        "peak_rss_kb": _rss_kb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss),
+        "peak_rss_children_kb": _rss_kb(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss),
+    }
+
+
+@dataclass
+class PackMeter:
+    """Accumulates resource usage for the pack running on the current thread."""
+
+    files_scanned: int = 0
+    bytes_read: int = 0
+    subprocesses: int = 0
+    tool_s: float = 0.0
+    # Time spent queued for a tool slot (see proc.slot)
+    tool_wait_s: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # CPU of helper threads (see `attach`) and of child processes (see `children`)
+    helper_user_s: float = 0.0
+    helper_sys_s: float = 0.0
+    children_user_s: float = 0.0
+    children_sys_s: float = 0.0
+    # Packs may fan work out to helper threads sharing this meter (see `attach`)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def snapshot(self, wall_s: float, cpu_user_s: float, cpu_sys_s: float) -> dict:
+        return {
+            # In-process CPU: the pack's thread plus attached helper threads
+            "cpu_user_ms": int((cpu_user_s + self.helper_user_s) * 1000),
+            "cpu_sys_ms": int((cpu_sys_s + self.helper_sys_s) * 1000),
+            "cpu_children_user_ms": int(self.children_user_s * 1000),
+            "cpu_children_sys_ms": int(self.children_sys_s * 1000),
+            "files_scanned": self.files_scanned,
+            "bytes_read": self.bytes_read,
+            "subprocesses": self.subprocesses,
+            "tool_ms": int(self.tool_s * 1000),
+            "tool_wait_ms": int(self.tool_wait_s * 1000),
+            "python_ms": max(0, int((wall_s - self.tool_s - self.tool_wait_s) * 1000)),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+def current() -> PackMeter | None:
+    return getattr(_local, "meter", None)
+
+
+def count_files(files: int, nbytes: int = 0) -> None:
+    m = current()
+    if m is not None:
+        with m.lock:
+            m.files_scanned += int(files)
+            m.bytes_read += int(nbytes)
+
+
+def count_cache(hits: int, misses: int) -> None:
+    m = current()
+    if m is not None:
+        with m.lock:
+            m.cache_hits += int(hits)
+            m.cache_misses += int(misses)
+
+
+def count_tool_wait(seconds: float) -> None:
+    m = current()
+    if m is not None:
+        with m.lock:
+            m.tool_wait_s += float(seconds)
+
+
+@contextmanager
+def children() -> Iterator[None]:
+    """Attribute CPU of child processes reaped inside the block to the pack.
+
+    RUSAGE_CHILDREN is process-wide: children another pack reaps within the
+    same window are counted too.
+    """
+    u0, s0 = _children_cpu()
+    try:
+        yield
+    finally:
+        m = current()
+        if m is not None:
+            u1, s1 = _children_cpu()
+            with m.lock:
+                m.children_user_s += max(0.0, u1 - u0)
+                m.children_sys_s += max(0.0, s1 - s0)
+
+
+@contextmanager
+def tool_call(name: str = "tool") -> Iterator[None]:
+    """Attribute one external tool invocation (count, wall and CPU time) to the pack."""
+    t0 = time.perf_counter()
+    try:
+        with span(name, "tool"), children():
+            yield
+    finally:
+        m = current()
+        if m is not None:
+            with m.lock:
+                m.subprocesses += 1
+                m.tool_s += time.perf_counter() - t0
+
+
+@contextmanager
+def attach(meter: PackMeter | None) -> Iterator[None]:
+    """Record into `meter` from a helper thread (pass `current()` from the pack thread).
+
+    The thread's CPU time counts toward the pack's. Concurrent tool time adds
+    up, so `tool_ms` can exceed the pack's wall time.
+    """
+    prev = current()
+    _local.meter = meter
+    u0, s0 = _thread_cpu()
+    try:
+        yield
+    finally:
+        _local.meter = prev
+        if meter is not None:
+            u1, s1 = _thread_cpu()
+            with meter.lock:
+                meter.helper_user_s += u1 - u0
+                meter.helper_sys_s += s1 - s0
+
+
+def metered_call(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a pack function under a fresh meter; dict results gain `telemetry`.
+
+    Module-level so it can also be shipped to isolated pack processes.
+    """
+    meter = PackMeter()
+    prev = current()
+    _local.meter = meter
+    u0, s0 = _thread_cpu()
+    t0 = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        _local.meter = prev
+    u1, s1 = _thread_cpu()
+    if isinstance(result, dict):
+        result = {**result, "telemetry": meter.snapshot(time.perf_counter() - t0, u1 - u0, s1 - s0)}
+    return result
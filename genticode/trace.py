@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+
+class Tracer:
+    """Collects Chrome trace-event spans (viewable in Perfetto / chrome://tracing).
+
+    Spans are complete ("X") events on the recording thread; timestamps are
+    microseconds since the tracer started.
+    """
+
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()
+        self.pid = os.getpid()
+        self.events: list[dict] = []
+        self._threads: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def _us(self, t: float) -> int:
+        return int((t - self.t0) * 1_000_000)
+
+    def add(self, name: str, cat: str, start: float, end: float, args: dict | None = None) -> None:
+        """Record a span from perf_counter timestamps `start`..`end`."""
+        th = threading.current_thread()
+        ev = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": self._us(start),
+            "dur": max(0, self._us(end) - self._us(start)),
+            "pid": self.pid,
+            "tid": th.ident or 0,
+        }
+        if args:
+            ev["args"] = args
+        with self._lock:
+            self._threads.setdefault(th.ident or 0, th.name)
+            self.events.append(ev)
+
+    def to_json(self) -> dict:
+        with self._lock:
+            meta = [
+                {"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": "genticode check"}}
+            ] + [
+                {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                for tid, name in sorted(self._threads.items())
+            ]
+            events = sorted(self.events, key=lambda e: (e["ts"], -e["dur"]))
+        return {"traceEvents": meta + events, "displayTimeUnit": "ms"}
+
+    def write(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_json()) + "\n")
+        return path
+
+
+_active: Tracer | None = None
+
+
+def start() -> Tracer:
+    global _active
+    _active = Tracer()
+    return _active
+
+
+def stop() -> Tracer | None:
+    global _active
+    tracer, _active = _active, None
+    return tracer
+
+
+def active() -> Tracer | None:
+    return _active
+
+
+@contextmanager
+def span(name: str, cat: str, **args: Any) -> Iterator[None]:
+    """Record `name` as a span when tracing is on; a no-op otherwise."""
+    tracer = _active
+    if tracer is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        tracer.add(name, cat, t0, time.perf_counter(), args or None)
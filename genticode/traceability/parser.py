@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import re
 from pathlib import Path
-import os
+from typing import Iterable
+
+from ..fileindex import FileIndex
+from ..telemetry import count_files
+from ..trace import span
 
 
 def load_priority(path: Path) -> dict:
@@ -20,24 +25,79 @@ def load_priority(path: Path) -> dict:
     return {"ids": ids}
 
 
-def scan_test_coverage(root: Path, ids: list[str]) -> dict:
-    """Scan test files for occurrences of AC IDs.
+def _trie_regex(words: list[str]) -> str:
+    """Factor words into a prefix-trie regex so the engine fails fast per position.
 
-    Simple heuristic: look for ID substrings in files under `tests/`.
-    Returns {id: count} for matches found.
+    Longer continuations are tried before a shorter word ends, giving
+    longest-match semantics at each start position.
     """
-    coverage: dict[str, int] = {i: 0 for i in ids}
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        end = "" in node
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if end:
+            return "(?:" + body + ")?"
+        return body
+
+    return emit(trie)
+
+
+def compile_id_matcher(ids: Iterable[str]) -> re.Pattern | None:
+    """Compile one matcher for the whole AC ID set (None when there are no IDs).
+
+    IDs match as whole tokens: `AC_1` does not match inside `AC_10`. Only
+    letters and digits continue a token, so underscore-joined names such as
+    `test_AC_0_1a_login` still reference `AC_0_1a`.
+    """
+    words = sorted({i for i in ids if i})
+    if not words:
+        return None
+    return re.compile(r"(?<![A-Za-z0-9])(" + _trie_regex(words) + r")(?![A-Za-z0-9])")
+
+
+def find_id_hits(root: Path, ids: list[str], index: FileIndex | None = None) -> dict[str, list[tuple[str, int]]]:
+    """Locate AC IDs in files under `tests/` with a single pass per file.
+
+    Returns {id: [(root-relative file, line), ...]} with every ID present.
+    """
+    hits: dict[str, list[tuple[str, int]]] = {i: [] for i in ids}
     test_root = root / "tests"
-    if not test_root.exists():
-        return coverage
-    for dirpath, dirnames, filenames in os.walk(test_root):
-        for fn in filenames:
-            p = Path(dirpath) / fn
+    matcher = compile_id_matcher(ids)
+    if matcher is None or not test_root.exists():
+        return hits
+    if index is not None:
+        entries = [(e.rel, e) for e in index.select(under="tests")]
+    else:
+        entries = [("tests/" + e.rel, e) for e in FileIndex.build(test_root)]
+    with span("traceability.scan", "scan", files=len(entries)):
+        for rel, entry in entries:
             try:
-                s = p.read_text(encoding="utf-8", errors="ignore")
+                s = entry.text()
             except Exception:
                 continue
-            for i in ids:
-                if i in s:
-                    coverage[i] += 1
-    return coverage
+            count_files(1, entry.size)
+            line, pos = 1, 0
+            for m in matcher.finditer(s):
+                line += s.count("\n", pos, m.start())
+                pos = m.start()
+                hits[m.group(1)].append((rel, line))
+    return hits
+
+
+def scan_test_coverage(root: Path, ids: list[str], index: FileIndex | None = None, hits: dict | None = None) -> dict:
+    """Scan test files for occurrences of AC IDs.
+
+    Returns {id: number of test files mentioning it}. Pass `hits` from
+    `find_id_hits` to avoid rescanning.
+    """
+    hits = hits if hits is not None else find_id_hits(root, ids, index=index)
+    return {i: len({f for f, _ in hits.get(i, [])}) for i in ids}
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Benchmark prompt scanning throughput vs worker processes.
+
+Generates a synthetic tree (default 50k files, mostly Python with some TS)
+and times `scan_paths` serially and with a process pool at each worker
+count (the pool is forced, whatever PARALLEL_MIN_FILES says), checking
+that every mode returns identical spans. It also times an empty pool's
+start-up and prints the file count at which each pool would break even
+with a serial scan, given the cores it prints.
+
+Measured on one core: parsing costs ~80us per file (256 files: 0.02s,
+5k files: 0.42s) while a spawn pool takes ~0.1s per worker to start, so
+at the old 256-file threshold a pool was 10x slower than serial on any
+core count. From those numbers, two cores break even at an estimated
+~3.5k files, hence PARALLEL_MIN_FILES = 4096; re-run on a multi-core box
+before changing it.
+
+Usage: scripts/bench_prompt_scan.py [--files N] [--workers 1,2,4,8,16] [--dir PATH]
+"""
+from __future__ import annotations
+
+import argparse
+import concurrent.futures as cf
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from genticode.prompt import detect  # noqa: E402
+from genticode.prompt.detect import scan_paths  # noqa: E402
+
+
+PY_TEMPLATE = '''import os
+
+SYSTEM = """You are a careful assistant for module {i}.
+Answer briefly and cite sources."""
+
+
+def handler_{i}(x):
+    msg = f"user: please summarise item {{x}} for {i}"
+    return [msg, "short", {i}] + [n * 2 for n in range({n})]
+'''
+
+TS_TEMPLATE = """export const P{i} = `system: you translate text for tenant {i}
+and never reveal internal notes`;
+export function f{i}(a: number): number {{ return a + {i}; }}
+"""
+
+
+def make_tree(root: Path, files: int) -> list[Path]:
+    paths: list[Path] = []
+    for i in range(files):
+        d = root / f"pkg{i // 500:03d}"
+        d.mkdir(parents=True, exist_ok=True)
+        if i % 10 == 0:
+            p = d / f"m{i}.ts"
+            p.write_text(TS_TEMPLATE.format(i=i))
+        else:
+            p = d / f"m{i}.py"
+            p.write_text(PY_TEMPLATE.format(i=i, n=i % 50))
+        paths.append(p)
+    return paths
+
+
+def pool_startup(workers: int) -> float:
+    """Seconds to start a spawn pool of `workers` and round-trip one empty task each."""
+    t0 = time.perf_counter()
+    with cf.ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as ex:
+        list(ex.map(detect._scan_chunk, [[] for _ in range(workers)]))
+    return time.perf_counter() - t0
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--files", type=int, default=50_000)
+    ap.add_argument("--workers", default="1,2,4,8,16")
+    ap.add_argument("--dir", default=None, help="Reuse/generate the tree here instead of a temp dir")
+    args = ap.parse_args(argv)
+    counts = [int(w) for w in args.workers.split(",") if w.strip()]
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    # Measure the pool itself, not the threshold that guards it
+    threshold, detect.PARALLEL_MIN_FILES = detect.PARALLEL_MIN_FILES, 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(args.dir) if args.dir else Path(tmp)
+        t0 = time.perf_counter()
+        paths = make_tree(root, args.files)
+        print(f"generated {len(paths)} files in {time.perf_counter() - t0:.1f}s on {cores} core(s)")
+        ref = None
+        base_s = None
+        print(f"{'workers':>8} {'seconds':>9} {'speedup':>8} {'spans':>8} {'startup':>8} {'break-even':>11}")
+        for w in counts:
+            t0 = time.perf_counter()
+            spans = scan_paths(paths, workers=w)
+            dt = time.perf_counter() - t0
+            key = [(str(s.file), s.start, s.end, s.text) for s in spans]
+            if ref is None:
+                ref, base_s = key, dt
+            elif key != ref:
+                print(f"mismatch at workers={w}", file=sys.stderr)
+                return 1
+            if w == 1:
+                print(f"{w:>8} {dt:>9.2f} {1:>7.2f}x {len(spans):>8}")
+                continue
+            # Files at which the start-up cost is paid back by the cores actually there
+            startup = pool_startup(w)
+            per_file = base_s / len(paths)
+            gain = 1 - 1 / min(w, cores)
+            even = f"{startup / (per_file * gain):>11.0f}" if gain > 0 else f"{'never':>11}"
+            note = "  (more workers than cores)" if w > cores else ""
+            print(f"{w:>8} {dt:>9.2f} {base_s / dt:>7.2f}x {len(spans):>8} {startup:>8.2f} {even}{note}")
+    print(f"PARALLEL_MIN_FILES = {threshold}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
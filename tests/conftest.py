@@ -9,3 +9,45 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+
+import pytest
+
+from genticode import proc
+
+
+@pytest.fixture(autouse=True)
+def _fresh_tool_lookup():
+    # Tests patch shutil.which; don't let one test's answer leak into the next
+    proc.clear_which_cache()
+    yield
+    proc.clear_which_cache()
+
+
+@pytest.fixture
+def popen_from_run():
+    """Adapt a `subprocess.run`-style fake into a Popen stand-in for genticode.proc.
+
+    The fake receives `(cmd, **kw)` with `kw["stdout"]` an open binary file;
+    it may write there or return an object whose `stdout` is then written.
+    """
+
+    def adapt(run):
+        class FakePopen:
+            pid = 0
+
+            def __init__(self, cmd, **kw):
+                cp = run(cmd, **kw)
+                out = getattr(cp, "stdout", None)
+                if out:
+                    kw["stdout"].write(out.encode() if isinstance(out, str) else out)
+                self.returncode = getattr(cp, "returncode", 0)
+
+            def wait(self, timeout=None):
+                return self.returncode
+
+            def kill(self):
+                pass
+
+        return FakePopen
+
+    return adapt
@@ -0,0 +1,96 @@
+import gzip
+import json
+import subprocess
+from pathlib import Path
+
+from genticode.baseline import baseline_capture, load_index, object_path, prune_index, resolve, snapshot
+
+
+def git(root: Path, *args: str) -> str:
+    cp = subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=root, capture_output=True, text=True, check=True)
+    return cp.stdout.strip()
+
+
+def write_report(gc: Path, high: int) -> None:
+    gc.mkdir(parents=True, exist_ok=True)
+    (gc / "report.json").write_text(json.dumps({"packs": [{"name": "static", "counts": {"by_severity": {"high": high}}}]}))
+
+
+def high(b) -> int:
+    return b.report["packs"][0]["counts"]["by_severity"]["high"]
+
+
+def test_branches_keep_separate_baselines(tmp_path, capsys):
+    root, gc = tmp_path, tmp_path / ".genticode"
+    git(root, "init", "-q", "-b", "main")
+    git(root, "commit", "-q", "--allow-empty", "-m", "c1")
+    write_report(gc, 1)
+    assert baseline_capture(gc, root) == 0
+    main_c1 = git(root, "rev-parse", "HEAD")
+    # Release branch gets its own baseline
+    git(root, "checkout", "-q", "-b", "release/1.x")
+    git(root, "commit", "-q", "--allow-empty", "-m", "r1")
+    write_report(gc, 7)
+    baseline_capture(gc, root)
+    # Feature branch off main: no snapshot of its own → merge-base with main
+    git(root, "checkout", "-q", "main")
+    git(root, "checkout", "-q", "-b", "feature")
+    git(root, "commit", "-q", "--allow-empty", "-m", "f1")
+    b = resolve(gc, root)
+    assert (b.source, b.commit, high(b)) == ("merge-base", main_c1, 1)
+    git(root, "checkout", "-q", "release/1.x")
+    git(root, "commit", "-q", "--allow-empty", "-m", "r2")
+    b = resolve(gc, root)
+    assert (b.source, high(b)) == ("branch", 7)
+    # The legacy single file has been thrashed to the last capture; history isn't
+    assert json.loads((gc / "baseline/report.json").read_text())["packs"][0]["counts"]["by_severity"]["high"] == 7
+    # Main advanced past its snapshot: merge-base (HEAD itself) has none → main's latest
+    git(root, "checkout", "-q", "main")
+    git(root, "commit", "-q", "--allow-empty", "-m", "c2")
+    b = resolve(gc, root)
+    assert (b.source, high(b)) == ("branch", 1)
+
+
+def test_snapshots_dedupe_and_prune(tmp_path):
+    gc = tmp_path / ".genticode"
+    write_report(gc, 0)
+    (gc / "findings.jsonl").write_text('{"fingerprint":"a"}\n')
+    for i in range(5):
+        snapshot(gc, f"c{i}", "main" if i == 0 else None, now=1000.0 + i)
+    base = gc / "baseline"
+    index = load_index(base)
+    # Identical content is stored once, gzip-compressed
+    assert len({e["report"] for e in index["snapshots"].values()}) == 1
+    assert len(list((base / "objects").glob("*.gz"))) == 2
+    ent = index["snapshots"]["c0"]
+    assert json.loads(gzip.open(object_path(base, ent["findings"])).read()) == {"fingerprint": "a"}
+    write_report(gc, 3)
+    snapshot(gc, "c5", None, max_count=2, now=1005.0)
+    index = load_index(base)
+    # Newest two kept, plus the exempt branch head
+    assert sorted(index["snapshots"]) == ["c0", "c4", "c5"]
+    dropped = prune_index(base, index, max_count=10, max_age_days=1, now=1004.0 + 86400 + 1)
+    assert dropped == ["c4", "c0"] and index["branches"] == {}
+    assert len(list((base / "objects").glob("*.gz"))) == 2
+
+
+def test_detached_head_without_merge_base_falls_back(tmp_path, monkeypatch):
+    for k in ("GENTICODE_BRANCH", "GITHUB_HEAD_REF", "GITHUB_REF_NAME", "GENTICODE_BASE_REF"):
+        monkeypatch.delenv(k, raising=False)
+    root, gc = tmp_path, tmp_path / ".genticode"
+    git(root, "init", "-q", "-b", "trunk")
+    git(root, "commit", "-q", "--allow-empty", "-m", "c1")
+    write_report(gc, 2)
+    baseline_capture(gc, root)
+    # CI: detached at a new commit, no main/master to take a merge-base with
+    git(root, "commit", "-q", "--allow-empty", "-m", "c2")
+    git(root, "checkout", "-q", "--detach")
+    b = resolve(gc, root)
+    assert (b.source, high(b)) == ("legacy", 2)
+    # Without the single-file copy, the newest snapshot
+    (gc / "baseline/report.json").unlink()
+    b = resolve(gc, root)
+    assert (b.source, high(b)) == ("latest", 2)
+    # The CI's branch name finds the branch's snapshot
+    monkeypatch.setenv("GITHUB_REF_NAME", "trunk")
+    assert resolve(gc, root).source == "branch"
@@ -0,0 +1,105 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from shutil import copytree
+
+import pytest
+
+from genticode.gitdiff import GitDiffError, changed_files
+from genticode.orchestrator import run_all, PackRunner
+from genticode.policy import PolicyConfig
+
+
+def git(root: Path, *args: str) -> None:
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=root, check=True, capture_output=True)
+
+
+def make_repo(root: Path) -> None:
+    git(root, "init", "-q")
+    (root / "old.py").write_text("password = 'x'\n")
+    (root / "gone.py").write_text("x = 1\n")
+    git(root, "add", "-A")
+    git(root, "commit", "-qm", "init")
+
+
+def test_changed_files_since_ref_and_staged(tmp_path: Path):
+    make_repo(tmp_path)
+    (tmp_path / "staged.py").write_text("y = 2\n")
+    git(tmp_path, "add", "staged.py")
+    (tmp_path / "untracked.py").write_text("z = 3\n")
+    (tmp_path / "gone.py").unlink()
+    assert changed_files(tmp_path, since="HEAD") == ["staged.py", "untracked.py"]
+    assert changed_files(tmp_path, staged=True) == ["staged.py"]
+    with pytest.raises(GitDiffError):
+        changed_files(tmp_path, since="no-such-ref")
+
+
+def test_run_all_scopes_only_marked_packs(tmp_path: Path):
+    (tmp_path / "a.py").write_text("x = 1\n")
+    (tmp_path / "b.py").write_text("x = 2\n")
+
+    def files(root: Path, gc: Path, policy=None, index=None):
+        return {"files": [e.rel for e in index], "scoped": index.scoped}
+
+    packs = {
+        "scoped": PackRunner("scoped", files, uses_index=True, scoped=True),
+        "full": PackRunner("full", files, uses_index=True),
+    }
+    report = {"packs": []}
+    run_all(PolicyConfig(), tmp_path, tmp_path / ".genticode", report, packs=packs, changed=["b.py", "deleted.py"])
+    summary = {p["name"]: p["counts"] for p in report["packs"]}
+    assert summary["scoped"]["files"] == ["b.py"] and summary["scoped"]["scoped"] is True
+    assert summary["full"]["files"] == ["a.py", "b.py"] and summary["full"]["scoped"] is False
+    assert report["scope"]["packs"] == ["scoped"]
+
+
+def test_cli_check_changed_since_limits_secrets(tmp_path: Path):
+    copytree(Path(__file__).parents[1] / "genticode", tmp_path / "genticode")
+    make_repo(tmp_path)
+    (tmp_path / "new.py").write_text("api_key = 'k'\n")
+    cp = subprocess.run([sys.executable, "-m", "genticode", "check", "--changed-since", "HEAD"], cwd=tmp_path, capture_output=True, text=True)
+    assert cp.returncode == 0, cp.stderr
+    report = json.loads((tmp_path / ".genticode/report-changed.json").read_text())
+    static = {p["name"]: p for p in report["packs"]}["static"]["counts"]
+    # old.py's password is outside the change set
+    assert static["secrets"] == 1
+    assert report["scope"]["changed_since"] == "HEAD"
+    # The full run's report and store are left alone
+    assert report["findings_store"]["path"] == "findings-changed.jsonl"
+    assert not (tmp_path / ".genticode/report.json").exists()
+    assert not (tmp_path / ".genticode/findings.jsonl").exists()
+
+
+def test_baseline_capture_refuses_a_scoped_report(tmp_path: Path, capsys):
+    from genticode.baseline import baseline_capture, load_index
+
+    gc = tmp_path / ".genticode"
+    gc.mkdir()
+    (gc / "report.json").write_text(json.dumps({"scope": {"changed_since": "HEAD"}, "packs": []}))
+    assert baseline_capture(gc, tmp_path) == 2
+    assert "changed-files" in capsys.readouterr().out
+    assert not (gc / "baseline/report.json").exists() and load_index(gc / "baseline")["snapshots"] == {}
+    assert baseline_capture(gc, tmp_path, force=True) == 0
+    assert (gc / "baseline/report.json").exists()
+
+
+def test_gate_skips_count_deltas_of_scoped_packs():
+    from genticode.gate import evaluate
+
+    base = {"packs": [{"name": "prompt", "counts": {"prompts": 2}}, {"name": "static", "counts": {"by_severity": {"high": 5}}}]}
+    cur = {
+        "scope": {"changed_since": "HEAD", "packs": ["prompt", "static"]},
+        "packs": [{"name": "prompt", "counts": {"prompts": 9}}, {"name": "static", "counts": {"by_severity": {"high": 1}}}],
+        "delta": {"findings": {"new_by_pack": {"static": {"high": 1}}}},
+    }
+    budgets = {"static": {"high": 0}, "prompt": {"count": 0}}
+    rc, summary = evaluate(cur, base, budgets=budgets)
+    verdicts = {t["rule"]: t["verdict"] for t in summary["rules"]}
+    assert verdicts["prompt.count"] == "skip"
+    # The new static finding is still caught by its fingerprint
+    assert verdicts["static.high"] == "fail" and rc == 2
+    # Without a findings delta, a scoped static count is not compared either
+    del cur["delta"]
+    rc, summary = evaluate(cur, base, budgets=budgets)
+    assert rc == 0 and {t["verdict"] for t in summary["rules"]} == {"skip"}
@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import os
+
+from genticode.fileindex import FileIndex, HashStore
+from genticode.orchestrator import run_all, PackRunner
+from genticode.policy import PolicyConfig
+
+
+def test_fileindex_walks_once_and_prunes_internal_dirs(tmp_path: Path):
+    for d in (".git", ".genticode", "node_modules", "src", "build"):
+        (tmp_path / d).mkdir()
+        (tmp_path / d / "f.py").write_text("x = 1\n")
+    (tmp_path / "top.js").write_text("let a = 1\n")
+    idx = FileIndex.build(tmp_path)
+    rels = [e.rel for e in idx]
+    assert rels == ["build/f.py", "src/f.py", "top.js"]
+    assert [e.rel for e in idx.select(suffixes={".py"}, exclude_dirs=("build",))] == ["src/f.py"]
+    assert [e.rel for e in idx.select(under="src")] == ["src/f.py"]
+
+
+def test_fileindex_reads_once_across_packs_within_a_byte_bound(tmp_path: Path, monkeypatch):
+    (tmp_path / "a.py").write_text("password = 'x'\n")
+    for i in range(5):
+        (tmp_path / f"b{i}.py").write_text("y" * 100)
+    monkeypatch.setenv("GENTICODE_CONTENT_CACHE_BYTES", "480")
+    idx = FileIndex.build(tmp_path)
+    entry = idx.get(tmp_path / "a.py")
+    assert entry is not None and not entry.loaded
+    calls = []
+    orig = Path.read_bytes
+
+    def counting(self):
+        calls.append(self.name)
+        return orig(self)
+
+    monkeypatch.setattr(Path, "read_bytes", counting)
+    assert entry.text() == "password = 'x'\n"
+    # No hash unless asked for; a later pack (or a scoped view) reuses the bytes
+    assert entry._sha256 is None
+    assert idx.restrict(["a.py"]).get(tmp_path / "a.py").text() == entry.text()
+    assert len(entry.sha256) == 64 and calls == ["a.py"]
+    # Past the byte bound the least recently used content is dropped and re-read
+    for e in idx.entries[1:]:
+        e.read_bytes()
+    assert idx.content.bytes <= 480
+    entry.read_bytes()
+    assert calls == ["a.py", "b0.py", "b1.py", "b2.py", "b3.py", "b4.py", "a.py"]
+    assert idx.files_read == 6
+
+
+def test_hash_store_skips_reading_unchanged_files(tmp_path: Path, monkeypatch):
+    for n in ("a.py", "b.py", "new.py"):
+        (tmp_path / n).write_text(f"{n} = 1\n")
+    old = 1_000_000_000
+    os.utime(tmp_path / "a.py", ns=(old, old))
+    os.utime(tmp_path / "b.py", ns=(old, old))
+    store = HashStore.load(tmp_path / "hashes.json")
+    idx = FileIndex.build(tmp_path)
+    shas = {e.rel: e.sha256 for e in idx}
+    idx.record_hashes(store)
+    store.save()
+    # new.py was modified just before the walk: not trusted yet
+    assert sorted(HashStore.load(tmp_path / "hashes.json").entries) == ["a.py", "b.py"]
+
+    (tmp_path / "b.py").write_text("b.py = 22\n")
+    calls = []
+    orig = Path.read_bytes
+    monkeypatch.setattr(Path, "read_bytes", lambda self: calls.append(self.name) or orig(self))
+    warm = FileIndex.build(tmp_path)
+    assert warm.use_hashes(HashStore.load(tmp_path / "hashes.json")) == 1
+    assert warm.get(tmp_path / "a.py").sha256 == shas["a.py"] and calls == []
+    # A changed (size, mtime) means a fresh read
+    assert warm.get(tmp_path / "b.py").sha256 != shas["b.py"] and calls == ["b.py"]
+    # Vanished files are dropped; an unchanged store is not rewritten
+    (tmp_path / "b.py").unlink()
+    store = HashStore.load(tmp_path / "hashes.json")
+    FileIndex.build(tmp_path).record_hashes(store)
+    assert sorted(store.entries) == ["a.py"] and store.dirty
+    store.save()
+    store.save()
+    assert not store.dirty
+
+
+def test_run_all_shares_one_index(tmp_path: Path):
+    (tmp_path / "a.py").write_text("x = 1\n")
+    seen = []
+
+    def indexed(root: Path, gc: Path, policy=None, index=None):
+        seen.append(index)
+        return {"files": len(index)}
+
+    def plain(root: Path, gc: Path, policy=None):
+        return {"ok": 1}
+
+    packs = {
+        "one": PackRunner("one", indexed, uses_index=True),
+        "two": PackRunner("two", indexed, uses_index=True),
+        "three": PackRunner("three", plain),
+    }
+    report = {"packs": []}
+    run_all(PolicyConfig(), tmp_path, tmp_path / ".genticode", report, packs=packs)
+    assert len(seen) == 2 and seen[0] is seen[1]
+    summary = {p["name"]: p["counts"] for p in report["packs"]}
+    assert summary["one"]["files"] == 1 and summary["three"]["ok"] == 1
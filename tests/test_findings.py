@@ -0,0 +1,98 @@
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from shutil import copytree
+
+from genticode import orchestrator as orch
+from genticode.findings import delta, fingerprint_all, iter_store, record, write_store
+from genticode.gate import evaluate
+
+
+def rec(rule, file, line, snippet, sev="high"):
+    return record("static", rule, sev, file, line, line, "m", snippet)
+
+
+def fps(records):
+    return [r["fingerprint"] for r in fingerprint_all(records)]
+
+
+def test_fingerprints_survive_line_shifts_and_reindent():
+    before = fps([rec("r", "a.py", 3, "eval(x)"), rec("r", "a.py", 9, "eval(x)"), rec("r", "a.py", 5, "exec(y)")])
+    after = fps([rec("r", "a.py", 13, "    eval(x)"), rec("r", "a.py", 40, "eval( x)".replace("( ", "(")), rec("r", "a.py", 20, "exec(y)")])
+    assert sorted(before) == sorted(after) and len(set(before)) == 3
+    assert fps([rec("r", "b.py", 3, "eval(x)")])[0] not in before
+
+
+def test_delta_hash_join_detects_swaps(tmp_path):
+    base, cur = tmp_path / "base.jsonl", tmp_path / "cur.jsonl"
+    write_store(base, fingerprint_all([rec("r", "a.py", 1, "eval(a)"), rec("r", "b.py", 1, "eval(b)")]))
+    write_store(cur, fingerprint_all([rec("r", "a.py", 7, "eval(a)"), rec("r", "c.py", 1, "eval(c)")]))
+    summary = delta(cur, base, new_out=tmp_path / "new.jsonl", fixed_out=tmp_path / "fixed.jsonl")
+    assert (summary["new"], summary["fixed"], summary["unchanged"]) == (1, 1, 1)
+    assert summary["new_by_pack"] == {"static": {"high": 1}}
+    assert [r["file"] for r in iter_store(tmp_path / "new.jsonl")] == ["c.py"]
+    assert [r["file"] for r in iter_store(tmp_path / "fixed.jsonl")] == ["b.py"]
+    # Out-of-scope baseline findings are not reported fixed
+    assert delta(cur, base, in_scope=lambda r: r["file"] != "b.py")["fixed"] == 0
+    # Totals are equal, but the swapped-in high finding still fails the gate
+    counts = {"by_severity": {"high": 2}}
+    report = {"packs": [{"name": "static", "counts": counts}], "delta": {"findings": summary}}
+    baseline = {"packs": [{"name": "static", "counts": counts}]}
+    assert evaluate(report, baseline)[0] == 2
+    assert evaluate({"packs": report["packs"]}, baseline)[0] == 0
+
+
+def test_delta_is_linear_on_large_stores(tmp_path):
+    n = 200_000
+    base, cur = tmp_path / "base.jsonl", tmp_path / "cur.jsonl"
+    write_store(base, ({"fingerprint": f"{i:032x}", "pack": "static", "severity": "info"} for i in range(n)))
+    write_store(cur, ({"fingerprint": f"{i:032x}", "pack": "static", "severity": "info"} for i in range(1000, n + 1000)))
+    t0 = time.perf_counter()
+    summary = delta(cur, base)
+    assert time.perf_counter() - t0 < 10
+    assert (summary["new"], summary["fixed"], summary["unchanged"]) == (1000, 1000, n - 1000)
+
+
+def test_static_pack_writes_store_without_secret_text(tmp_path, monkeypatch):
+    monkeypatch.setattr("genticode.orchestrator.maybe_run_semgrep", lambda root, out, **kw: None)
+    (tmp_path / "conf.py").write_text("x = 1\npassword = 'hunter2'\n")
+    orch.run_static_pack(tmp_path, tmp_path / ".genticode")
+    store = tmp_path / ".genticode/raw/findings-static.jsonl"
+    (r,) = list(iter_store(store))
+    assert r["file"] == "conf.py" and r["start"] == 2 and r["rule"] == "secrets.password_assignment"
+    assert "hunter2" not in store.read_text()
+
+
+def test_cli_check_reports_finding_delta(tmp_path: Path):
+    copytree(Path(__file__).parents[1] / "genticode", tmp_path / "genticode")
+
+    def run(*args):
+        return subprocess.run([sys.executable, "-m", "genticode", *args], cwd=tmp_path, capture_output=True, text=True)
+
+    (tmp_path / "a.py").write_text("password = 'x'\n")
+    run("check")
+    assert run("baseline", "capture").returncode == 0
+    (tmp_path / "a.py").write_text("\n\npassword = 'x'\n")
+    (tmp_path / "b.py").write_text("api_key = 1\n")
+    run("check")
+    data = json.loads((tmp_path / ".genticode/report.json").read_text())
+    fd = data["delta"]["findings"]
+    # The shifted finding in a.py matches; only b.py's is new
+    assert (fd["new"], fd["fixed"]) == (1, 0) and fd["unchanged"] == data["findings_store"]["count"] - 1
+    assert [r["file"] for r in iter_store(tmp_path / ".genticode/raw/findings-new.jsonl")] == ["b.py"]
+
+
+def test_failed_pack_leaves_no_stale_store(tmp_path):
+    gc = tmp_path / ".genticode"
+    store = gc / "raw" / "findings-static.jsonl"
+    write_store(store, fingerprint_all([rec("r", "a.py", 1, "x")]))
+
+    def boom(root, gc_dir, policy=None):
+        raise RuntimeError("semgrep crashed")
+
+    report: dict = {}
+    orch.run_all(None, tmp_path, gc, report, packs={"static": orch.PackRunner("static", boom)})
+    assert "error" in report["packs"][0]["counts"]
+    assert not store.exists()
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from genticode.gate import compile_budgets, evaluate, index_report
+from genticode.policy import PolicyError, load
+
+
+def _report(**packs):
+    return {"packs": [{"name": name, "counts": counts} for name, counts in packs.items()]}
+
+
+def test_index_report_flattens_counters_and_telemetry():
+    idx = index_report(_report(prompt={"prompts": 3, "lints": {"PL001": 2}, "telemetry": {"cpu_user_ms": 40}, "note": "x"}))
+    assert idx["prompt"] == {"prompts": 3, "lints.PL001": 2, "telemetry.cpu_user_ms": 40, "cpu_user_ms": 40}
+
+
+def test_generic_rules_abs_delta_ratio_with_trace():
+    base = _report(quality={"findings": 10, "by_severity": {"medium": 4}, "duration_ms": 100})
+    cur = _report(quality={"findings": 12, "by_severity": {"medium": 9}, "duration_ms": 150})
+    budgets = {
+        "rules": [
+            {"select": "quality.findings", "max": 20, "delta_max": 1},
+            {"id": "q-medium", "select": "quality.by_severity.medium", "ratio_max": 2.0},
+            {"select": "*.duration_ms", "ratio_max": 2.0},
+        ]
+    }
+    rc, summary = evaluate(cur, base, budgets=budgets, phase="new_code_only")
+    assert rc == 2
+    verdicts = {(t["rule"], t["select"]): (t["value"], t["verdict"]) for t in summary["rules"]}
+    assert verdicts[("quality.findings:max", "quality.findings")] == (12, "pass")
+    assert verdicts[("quality.findings:delta_max", "quality.findings")] == (2, "fail")
+    assert verdicts[("q-medium", "quality.by_severity.medium")] == (2.25, "fail")
+    assert verdicts[("*.duration_ms:ratio_max", "quality.duration_ms")] == (1.5, "pass")
+    # Legacy default: static high, budget 0
+    assert verdicts[("static.high", "static.by_severity.high")] == (0, "pass")
+
+
+def test_rule_phase_and_suppression():
+    base = _report(quality={"findings": 1})
+    cur = _report(quality={"findings": 3})
+    budgets = {"rules": [{"select": "quality.findings", "max": 2, "phase": "hard"}, {"select": "quality.findings", "delta_max": 0}]}
+    rc, summary = evaluate(cur, base, budgets=budgets, phase="warn")
+    assert rc == 1
+    assert [t["verdict"] for t in summary["rules"] if t["rule"].startswith("quality")] == ["skip", "warn"]
+    rc, summary = evaluate(cur, base, budgets=budgets, phase="new_code_only", suppressions=[{"pack": "quality"}])
+    assert rc == 0
+    assert summary["rules"][-1]["verdict"] == "suppressed"
+
+
+def test_compile_is_memoized_and_validates():
+    budgets = {"rules": [{"select": "static.by_severity.medium", "max": 5}]}
+    assert compile_budgets(budgets) is compile_budgets(dict(budgets))
+    with pytest.raises(ValueError):
+        compile_budgets({"rules": [{"select": "static", "max": 1}]})
+    with pytest.raises(ValueError):
+        compile_budgets({"rules": [{"select": "static.findings"}]})
+
+
+def test_policy_rejects_malformed_rules(tmp_path):
+    p = tmp_path / "policy.yml"
+    p.write_text("budgets:\n  rules:\n    - select: static.findings\n      phase: later\n      max: 1\n")
+    with pytest.raises(PolicyError):
+        load(p)
+
+
+def test_thousands_of_rules_evaluate_in_milliseconds():
+    packs = {f"pack{i}": {"by_severity": {s: i for s in ("low", "medium", "high")}, "lints": {f"L{j}": j for j in range(50)}} for i in range(200)}
+    report = _report(**packs)
+    rules = [{"select": f"pack{i % 200}.lints.L{i % 50}", "max": 1000, "delta_max": 5} for i in range(5000)]
+    budgets = {"rules": rules}
+    compile_budgets(budgets)
+    t0 = time.perf_counter()
+    rc, summary = evaluate(report, report, budgets=budgets)
+    elapsed = time.perf_counter() - t0
+    assert rc == 0
+    assert len(summary["rules"]) == 10001
+    assert elapsed < 0.5
@@ -0,0 +1,66 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from genticode import isolate
+from genticode.isolate import IsolationError, IsolationTimeout, run_isolated
+from genticode.orchestrator import run_all
+from genticode.policy import PolicyConfig, PackConfig
+
+
+def test_run_isolated_returns_result_and_reports_errors():
+    assert run_isolated(max, (3, 7)) == 7
+    with pytest.raises(IsolationError) as e:
+        run_isolated(int, ("not a number",))
+    assert "ValueError" in str(e.value)
+
+
+def test_run_isolated_kills_process_tree_at_deadline():
+    t0 = time.perf_counter()
+    with pytest.raises(IsolationTimeout):
+        # The child's own subprocess must die with it
+        run_isolated(subprocess.call, ([sys.executable, "-c", "import time; time.sleep(30)"],), timeout_s=1.0)
+    assert time.perf_counter() - t0 < 10
+
+
+class _SlowToStart:
+    # Unpickled in the child before the pack runs, like a slow interpreter start
+    def __reduce__(self):
+        return (time.sleep, (1.5,))
+
+
+def test_run_isolated_deadline_starts_after_spawn(monkeypatch):
+    # Start-up does not count against the pack's timeout...
+    assert run_isolated(str, (_SlowToStart(),), timeout_s=1.0) == "None"
+    # ...but has its own allowance, reported as a start failure, not a timeout
+    monkeypatch.setattr(isolate, "SPAWN_ALLOWANCE_S", 0.5)
+    with pytest.raises(IsolationError) as e:
+        run_isolated(str, (_SlowToStart(),), timeout_s=30.0)
+    assert "did not start" in str(e.value)
+
+
+def test_run_isolated_memory_limit():
+    with pytest.raises(IsolationError) as e:
+        run_isolated(bytearray, (2 * 1024 * 1024 * 1024,), memory_mb=256)
+    assert "memory" in str(e.value).lower()
+
+
+def test_run_all_isolated_pack_uses_shared_index(tmp_path: Path):
+    (tmp_path / "PRIORITY.yaml").write_text("ids:\n  - AC_1\n  - AC_2\n")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests/test_x.py").write_text("# AC_2\n")
+    pol = PolicyConfig()
+    pol.packs = {
+        "traceability": PackConfig(isolate=True, timeout_s=60),
+        "prompt": PackConfig(enabled=False),
+        "static": PackConfig(enabled=False),
+        "supply": PackConfig(enabled=False),
+        "quality": PackConfig(enabled=False),
+    }
+    report = {"packs": []}
+    run_all(pol, tmp_path, tmp_path / ".genticode", report)
+    counts = report["packs"][0]["counts"]
+    assert counts["covered"] == 1 and counts["uncovered"] == 1
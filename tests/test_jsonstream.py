@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from genticode import jsonstream
+from genticode.jsonstream import iter_items, iter_members
+
+
+def test_iter_members_streams_arrays_objects_and_skips_rest(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(jsonstream, "CHUNK_CHARS", 7)  # force many refills mid-token
+    doc = {
+        "paths": {"scanned": ["a.py"] * 50},
+        "results": [{"path": "a.py", "n": 12345678901234567890}, {"path": "é/ü.py", "s": "x\"]}"}, 3.5],
+        "vulnerabilities": {"lodash": {"severity": "high"}, "minimist": {"severity": "low"}},
+        "version": "1.2.3",
+    }
+    p = tmp_path / "doc.json"
+    p.write_text(json.dumps(doc, indent=2))
+    assert list(iter_items(p, "results")) == doc["results"]
+    members = list(iter_members(p, ("vulnerabilities", "version")))
+    assert members == [
+        ("vulnerabilities", "lodash", {"severity": "high"}),
+        ("vulnerabilities", "minimist", {"severity": "low"}),
+        ("version", None, "1.2.3"),
+    ]
+
+
+def test_iter_members_empty_and_malformed(tmp_path: Path):
+    p = tmp_path / "doc.json"
+    p.write_text("")
+    assert list(iter_items(p, "results")) == []
+    p.write_text('{"results": []}')
+    assert list(iter_items(p, "results")) == []
+    p.write_text('{"results": [1, 2')
+    with pytest.raises(ValueError):
+        list(iter_items(p, "results"))
+    p.write_text("npm ERR! network")
+    with pytest.raises(ValueError):
+        list(iter_items(p, "results"))
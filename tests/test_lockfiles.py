@@ -0,0 +1,114 @@
+import json
+import shutil
+from pathlib import Path
+
+from genticode import orchestrator as orch
+from genticode.policy import PackConfig, PolicyConfig
+from genticode.supply.lockfiles import (
+    native_sbom,
+    parse_package_lock,
+    parse_pnpm_lock,
+    parse_poetry_lock,
+    parse_requirements,
+    parse_uv_lock,
+    parse_yarn_lock,
+)
+
+
+FIXT = Path(__file__).parent / "fixtures" / "lockfiles"
+
+
+def nv(comps):
+    return sorted((c["name"], c["version"]) for c in comps)
+
+
+def test_package_lock_v3():
+    comps = {c["name"] + "@" + c["version"]: c for c in parse_package_lock(FIXT / "package-lock.json")}
+    assert sorted(comps) == ["@babel/core@7.24.0", "dual@1.0.0", "lodash@4.17.21", "semver@6.3.1"]
+    assert comps["lodash@4.17.21"]["licenses"] == [{"license": {"id": "MIT"}}]
+    assert comps["lodash@4.17.21"]["purl"] == "pkg:npm/lodash@4.17.21"
+    assert comps["@babel/core@7.24.0"]["scope"] == "optional"
+    assert comps["dual@1.0.0"]["licenses"] == [{"expression": "(MIT OR Apache-2.0)"}]
+
+
+def test_pnpm_and_yarn_locks():
+    assert nv(parse_pnpm_lock(FIXT / "pnpm-lock.yaml")) == [("@babel/core", "7.24.0"), ("lodash", "4.17.21"), ("react-dom", "18.2.0")]
+    assert nv(parse_yarn_lock(FIXT / "yarn.lock")) == [("@babel/core", "7.24.0"), ("lodash", "4.17.21")]
+    assert nv(parse_yarn_lock(FIXT / "yarn-berry.lock")) == [("lodash", "4.17.21")]
+
+
+def test_python_locks_and_requirements():
+    poetry = parse_poetry_lock(FIXT / "poetry.lock")
+    assert nv(poetry) == [("pytest", "8.0.0"), ("requests", "2.31.0")]
+    assert [c.get("scope") for c in poetry] == [None, "optional"]
+    uv = parse_uv_lock(FIXT / "uv.lock")
+    assert nv(uv) == [("Typing_Extensions", "4.9.0")] and uv[0]["purl"] == "pkg:pypi/typing-extensions@4.9.0"
+    assert nv(parse_requirements(FIXT / "requirements.txt")) == [("requests", "2.31.0"), ("urllib3", "2.2.0")]
+
+
+def test_native_sbom_merges_and_dedupes(tmp_path):
+    assert native_sbom(tmp_path, "node") is None
+    shutil.copy(FIXT / "package-lock.json", tmp_path)
+    shutil.copy(FIXT / "yarn.lock", tmp_path)
+    sbom = native_sbom(tmp_path, "node")
+    purls = [c["purl"] for c in sbom["components"]]
+    assert sbom["bomFormat"] == "CycloneDX" and purls == sorted(set(purls)) and len(purls) == 4
+
+
+def test_supply_pack_prefers_native_provider(tmp_path, monkeypatch):
+    def deep(root, out, **kw):
+        raise AssertionError("deep provider used")
+
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_py", deep)
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_npm", deep)
+    monkeypatch.setattr("genticode.orchestrator.maybe_pip_audit", lambda root, out, **kw: None)
+    monkeypatch.setattr("genticode.orchestrator.maybe_npm_audit", lambda root, out, **kw: None)
+    shutil.copy(FIXT / "package-lock.json", tmp_path)
+    shutil.copy(FIXT / "poetry.lock", tmp_path)
+    counts = orch.run_supply_pack(tmp_path, tmp_path / ".genticode")
+    assert counts["tools"]["cyclonedx-npm"]["status"] == "native"
+    assert counts["components"] == {"python": 2, "node": 4}
+    # Licenses recorded in package-lock (ISC: not allow-listed) are still evaluated
+    assert counts["license_violations"] >= 1
+    raw = json.loads((tmp_path / ".genticode/raw/sbom-node.json").read_text())
+    assert len(raw["components"]) == 4
+    # "deep" forces the external tools
+    pol = PolicyConfig()
+    pol.packs = {"supply": PackConfig(provider="deep")}
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_py", lambda root, out, **kw: None)
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_npm", lambda root, out, **kw: None)
+    counts = orch.run_supply_pack(tmp_path, tmp_path / ".genticode", pol)
+    assert counts["tools"]["cyclonedx-npm"]["status"] == "unavailable"
+
+
+def test_native_sbom_needs_a_pinned_component(tmp_path):
+    (tmp_path / "requirements-dev.txt").write_text("pytest>=7\nruff>=0.4\n")
+    assert native_sbom(tmp_path, "python") is None
+    (tmp_path / "requirements.txt").write_text("requests==2.31.0\n")
+    sbom = native_sbom(tmp_path, "python")
+    assert [c["name"] for c in sbom["components"]] == ["requests"]
+    assert [p["value"] for p in sbom["metadata"]["properties"]] == ["requirements.txt"]
+
+
+def test_license_policy_prefers_deep_sbom_over_unlicensed_lockfile(tmp_path, monkeypatch):
+    deep_sbom = {"components": [{"name": "pytest", "licenses": [{"license": {"id": "MIT"}}]}]}
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_py", lambda root, out, **kw: deep_sbom)
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_npm", lambda root, out, **kw: None)
+    monkeypatch.setattr("genticode.orchestrator.maybe_pip_audit", lambda root, out, **kw: None)
+    monkeypatch.setattr("genticode.orchestrator.maybe_npm_audit", lambda root, out, **kw: None)
+    shutil.copy(FIXT / "poetry.lock", tmp_path)
+    pol = PolicyConfig()
+    pol.licenses = {"deny": ["AGPL-3.0"]}
+    counts = orch.run_supply_pack(tmp_path, tmp_path / ".genticode", pol)
+    assert counts["tools"]["cyclonedx-py"]["status"] == "ok"
+    assert counts["license_violations"] == 0
+    # Deep tool unavailable: the lockfile SBOM is used and its unlicensed components are unknown
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_py", lambda root, out, **kw: None)
+    counts = orch.run_supply_pack(tmp_path, tmp_path / ".genticode", pol)
+    assert counts["tools"]["cyclonedx-py"]["status"] == "native"
+    assert counts["components"]["python"] == 2
+    assert counts["license_violations"] == 2
+    # Without a license policy the lockfile SBOM is used directly
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_py", lambda root, out, **kw: deep_sbom)
+    counts = orch.run_supply_pack(tmp_path, tmp_path / ".genticode")
+    assert counts["tools"]["cyclonedx-py"]["status"] == "native"
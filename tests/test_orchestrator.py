@@ -49,7 +49,7 @@ def test_orchestrator_continues_on_pack_error(tmp_path, monkeypatch):
 
 def test_pack_helper_quality_and_traceability(tmp_path, monkeypatch):
     # quality passthrough
-    monkeypatch.setattr("genticode.orchestrator.maybe_run_quality", lambda root: {"findings": 7})
+    monkeypatch.setattr("genticode.orchestrator.maybe_run_quality", lambda root, **kw: {"findings": 7})
     qc = orch.run_quality_pack(tmp_path, tmp_path / ".genticode")
     assert qc == {"findings": 7}
 
@@ -61,7 +61,7 @@ def test_pack_helper_quality_and_traceability(tmp_path, monkeypatch):
 
 def test_pack_helper_prompt_writes_artifacts(tmp_path, monkeypatch):
     # Simulate a single prompt span via manifest builder
-    monkeypatch.setattr("genticode.orchestrator.prompt_scan", lambda root: [])
+    monkeypatch.setattr("genticode.orchestrator.prompt_scan", lambda root, **kw: [])
     monkeypatch.setattr("genticode.orchestrator.build_manifest", lambda spans: {"items": [{"file": "f.py", "start": 1, "end": 1}]})
     counts = orch.run_prompt_pack(tmp_path, tmp_path / ".genticode")
     assert counts["prompts"] == 1
@@ -96,8 +96,8 @@ def test_pack_helper_supply_counts(tmp_path, monkeypatch):
         {"licenses": [{"license": {"id": "MIT"}}]},
         {"licenses": [{"license": {"id": "AGPL-3.0"}}]}
     ]}
-    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_py", lambda root, out: sbom)
-    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_npm", lambda root, out: sbom)
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_py", lambda root, out, **kw: sbom)
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_npm", lambda root, out, **kw: sbom)
     sc = orch.run_supply_pack(tmp_path, tmp_path / ".genticode")
     # One denied per SBOM → 2
     assert sc["license_violations"] == 2
@@ -10,7 +10,7 @@ def test_static_ruleset_passed_to_semgrep(tmp_path, monkeypatch):
     pol.packs = {"static": type("X", (), {"enabled": True, "timeout_s": 10, "ruleset": "p/python"})()}
 
     captured = {}
-    def fake_semgrep(root, out, configs=None):
+    def fake_semgrep(root, out, configs=None, targets=None):
         captured["configs"] = configs
         return None
 
@@ -25,8 +25,8 @@ def test_supply_lockfile_only_filters_sboms(tmp_path, monkeypatch):
     pol.licenses = {"lockfile_only": True}
     # Make adapters return non-empty SBOMs, but without lockfiles they should be ignored
     dummy = {"components": [{"licenses": []}]}
-    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_py", lambda root, out: dummy)
-    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_npm", lambda root, out: dummy)
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_py", lambda root, out, **kw: dummy)
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_npm", lambda root, out, **kw: dummy)
     counts = run_supply_pack(tmp_path, tmp_path / ".genticode", policy=pol)
     assert counts["sbom_present"] is False
     assert counts["components"] == {"python": 0, "node": 0}
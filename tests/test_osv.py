@@ -0,0 +1,133 @@
+import json
+import shutil
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from genticode import orchestrator as orch
+from genticode.cli import main
+from genticode.supply.lockfiles import component
+from genticode.supply.osv import OsvImportError, cvss3_score, import_dump, is_affected, match_components, pep440_key, semver_key
+
+
+FIXT = Path(__file__).parent / "fixtures" / "osv"
+LOCKS = Path(__file__).parent / "fixtures" / "lockfiles"
+
+
+def test_version_ordering():
+    order = ["1.0.dev1", "1.0a1", "1.0a2.dev1", "1.0b1", "1.0rc1", "1.0", "1.0.post1", "1.1"]
+    assert sorted(order, key=pep440_key) == order
+    assert pep440_key("1.0.0") == pep440_key("1.0") and pep440_key("1!0.1") > pep440_key("9.9")
+    assert semver_key("1.0.0-alpha") < semver_key("1.0.0-alpha.1") < semver_key("1.0.0-beta.2") < semver_key("1.0.0-beta.11") < semver_key("1.0.0")
+    assert semver_key("1.0.0+build") == semver_key("1.0.0") and semver_key("latest") is None
+
+
+def test_range_events():
+    rng = [{"type": "ECOSYSTEM", "events": [{"introduced": "1.0"}, {"fixed": "1.5"}, {"introduced": "2.0"}, {"last_affected": "2.1"}]}]
+    hits = [v for v in ("0.9", "1.0", "1.4.9", "1.5", "1.9", "2.0", "2.1", "2.1.1") if is_affected("PyPI", v, rng)]
+    assert hits == ["1.0", "1.4.9", "2.0", "2.1"]
+    assert is_affected("npm", "0.0.1", [{"type": "SEMVER", "events": [{"introduced": "0"}]}])
+    assert is_affected("npm", "weird", [], versions={"weird"})
+    assert cvss3_score("CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:H") == 9.8
+    assert cvss3_score("CVSS:3.1/AV:N/AC:L/PR:N/UI:R/S:C/C:L/I:L/A:N") == 6.1
+
+
+def test_import_and_match(tmp_path):
+    db = tmp_path / "index.sqlite"
+    stats = import_dump(FIXT, db)
+    assert stats == {"records": 4, "withdrawn": 1, "affected": 3, "skipped": 0}
+    comps = [
+        component("npm", "lodash", "4.17.11"),
+        component("npm", "lodash", "4.17.21"),
+        component("npm", "@scope/pkg", "1.1.0"),
+        component("pypi", "requests", "2.30.0"),
+        component("pypi", "requests", "2.31.0"),
+        {"name": "no-purl"},
+    ]
+    got = [(v["package"], v["version"], v["id"], v["severity"]) for v in match_components(db, comps)]
+    assert got == [
+        ("@scope/pkg", "1.1.0", "GHSA-last-affected", "medium"),
+        ("lodash", "4.17.11", "GHSA-jf85-cpcp-j695", "critical"),
+        ("requests", "2.30.0", "PYSEC-2023-74", "medium"),
+    ]
+
+
+def test_import_zip_and_cli(tmp_path, monkeypatch):
+    dump = tmp_path / "npm" / "all.zip"
+    dump.parent.mkdir()
+    with zipfile.ZipFile(dump, "w") as zf:
+        zf.write(FIXT / "GHSA-jf85-cpcp-j695.json", "GHSA-jf85-cpcp-j695.json")
+    monkeypatch.setattr("genticode.cli.GC_DIR", tmp_path / ".genticode")
+    assert main(["supply", "db", "import", str(tmp_path / "npm")]) == 0
+    assert (tmp_path / ".genticode/osv/index.sqlite").is_file()
+    assert main(["supply", "db", "import", str(tmp_path / "missing")]) == 2
+
+
+def test_import_skips_bad_members_and_keeps_index(tmp_path, capsys, monkeypatch):
+    dump = tmp_path / "dump" / "all.zip"
+    dump.parent.mkdir()
+    with zipfile.ZipFile(dump, "w") as zf:
+        zf.write(FIXT / "GHSA-jf85-cpcp-j695.json", "A.json")
+        zf.writestr("B.json", "{not json")
+        zf.write(FIXT / "PYSEC-2023-74.json", "C.json")
+    db = tmp_path / "index.sqlite"
+    stats = import_dump(dump.parent, db)
+    assert (stats["records"], stats["skipped"]) == (2, 1)
+    # An import that yields nothing leaves the existing index in place
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    (empty / "bad.json").write_text("[")
+    before = db.read_bytes()
+    with pytest.raises(OsvImportError):
+        import_dump(empty, db)
+    assert db.read_bytes() == before and not (tmp_path / "index.sqlite.tmp").exists()
+    monkeypatch.setattr("genticode.cli.GC_DIR", tmp_path / ".genticode")
+    assert main(["supply", "db", "import", str(dump.parent)]) == 0
+    assert "skipped 1" in capsys.readouterr().out
+    assert main(["supply", "db", "import", str(empty)]) == 2
+
+
+def test_match_5k_components_fast(tmp_path):
+    dump = tmp_path / "dump"
+    dump.mkdir()
+    for i in range(2000):
+        vuln = {
+            "id": f"GHSA-{i}",
+            "affected": [{"package": {"ecosystem": "npm", "name": f"pkg{i}"}, "ranges": [{"type": "SEMVER", "events": [{"introduced": "0"}, {"fixed": "1.2.0"}]}]}],
+        }
+        (dump / f"{i}.json").write_text(json.dumps(vuln))
+    db = tmp_path / "index.sqlite"
+    import_dump(dump, db)
+    comps = [component("npm", f"pkg{i}", f"1.{i % 4}.0") for i in range(5000)]
+    t0 = time.perf_counter()
+    got = match_components(db, comps)
+    assert time.perf_counter() - t0 < 1.0
+    assert len(got) == 1000
+
+
+def test_supply_pack_uses_local_index(tmp_path, monkeypatch):
+    def networked(root, out, **kw):
+        raise AssertionError("audit run despite local index")
+
+    monkeypatch.setattr("genticode.orchestrator.maybe_pip_audit", networked)
+    monkeypatch.setattr("genticode.orchestrator.maybe_npm_audit", networked)
+    shutil.copy(LOCKS / "poetry.lock", tmp_path)
+    gc = tmp_path / ".genticode"
+    import_dump(FIXT, gc / "osv/index.sqlite")
+    counts = orch.run_supply_pack(tmp_path, gc)
+    assert list(counts["tools"]) == ["cyclonedx-py", "cyclonedx-npm", "osv"]
+    assert counts["tools"]["osv"]["status"] == "ok"
+    # poetry.lock pins requests 2.31.0: fixed
+    assert counts["vulns"] == 0
+    assert json.loads((gc / "raw/osv.json").read_text()) == {"vulnerabilities": []}
+
+
+def test_osv_without_components_is_unavailable(tmp_path, monkeypatch):
+    monkeypatch.setattr("genticode.orchestrator.maybe_pip_audit", lambda *a, **kw: None)
+    monkeypatch.setattr("genticode.orchestrator.maybe_npm_audit", lambda *a, **kw: None)
+    gc = tmp_path / ".genticode"
+    import_dump(FIXT, gc / "osv/index.sqlite")
+    counts = orch.run_supply_pack(tmp_path, gc)
+    assert counts["tools"]["osv"]["status"] == "unavailable"
@@ -0,0 +1,93 @@
+import pytest
+
+from genticode import perfhistory
+from genticode.gate import evaluate
+from genticode.perfhistory import check, load, record, robust_threshold
+
+
+def _report(ms, files=None, name="static"):
+    counts = {"duration_ms": ms}
+    if files is not None:
+        counts["telemetry"] = {"files_scanned": files}
+    return {"packs": [{"name": name, "counts": counts}]}
+
+
+NOISY = [100, 104, 97, 120, 99, 101, 95, 103, 98, 102]
+
+
+def _history(tmp_path, durations, files=None):
+    for i, ms in enumerate(durations):
+        record(tmp_path, _report(ms, files), commit=f"c{i}", now=float(i))
+    return load(tmp_path)
+
+
+def test_robust_threshold_ignores_outliers():
+    med, thr = robust_threshold([100, 101, 99, 100, 1000], 3.0)
+    assert med == 100
+    assert thr == pytest.approx(100 + 3 * 1.4826)
+
+
+def test_record_keeps_completed_packs_and_caps_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(perfhistory, "MAX_RUNS", 3)
+    rep = {"packs": [{"name": "static", "counts": {"duration_ms": 5}}, {"name": "supply", "counts": {"error": "timeout", "duration_ms": 9}}]}
+    for i in range(5):
+        record(tmp_path, rep, now=float(i))
+    hist = load(tmp_path)
+    assert list(hist) == ["static"]
+    assert [r["ts"] for r in hist["static"]] == [2.0, 3.0, 4.0]
+
+
+def test_noise_passes_regression_fails(tmp_path):
+    hist = _history(tmp_path, NOISY)
+    spec = {"k": 3, "min_runs": 5}
+    assert check(_report(110), hist, spec)[0]["verdict"] == "pass"
+    assert check(_report(400), hist, spec)[0]["verdict"] == "regress"
+    # Too few runs to judge
+    assert check(_report(400), {"static": hist["static"][:3]}, spec)[0]["verdict"] == "skip"
+
+
+def test_floor_and_per_file_normalization(tmp_path):
+    hist = _history(tmp_path, [100, 100, 100, 100, 100], files=10)
+    # 50% slower but only 50ms over: under the floor
+    assert check(_report(150, 10), hist, {"floor_ms": 100})[0]["verdict"] == "pass"
+    assert check(_report(150, 10), hist, {"floor_ms": 0})[0]["verdict"] == "regress"
+    # The default floor absorbs sub-250ms jitter
+    assert check(_report(150, 10), hist, {})[0]["verdict"] == "pass"
+    # Twice the files in twice the time is not a regression per file
+    assert check(_report(200, 20), hist, {"per_file": True})[0]["verdict"] == "pass"
+
+
+def test_gate_uses_history_without_baseline(tmp_path):
+    hist = _history(tmp_path, NOISY)
+    budgets = {"performance": {"history": {"k": 3, "floor_ms": 50}}}
+    rc, summary = evaluate(_report(400), None, budgets=budgets, phase="new_code_only", history=hist)
+    assert rc == 2
+    assert summary["performance_history"][0]["verdict"] == "regress"
+    rc, _ = evaluate(_report(400), _report(100), budgets=budgets, phase="warn", history=hist)
+    assert rc == 1
+    rc, _ = evaluate(_report(110), _report(100), budgets=budgets, history=hist)
+    assert rc == 0
+
+
+def test_regressed_runs_are_held_out_until_the_slowdown_is_accepted(tmp_path):
+    hist = _history(tmp_path, NOISY)
+    spec = {"k": 3, "min_runs": 5}
+    # One slow run doesn't drag the median up...
+    regressed = [t["pack"] for t in check(_report(400), hist, spec) if t["verdict"] == "regress"]
+    hist = record(tmp_path, _report(400), now=100.0, exclude=regressed, accept_after=3)
+    assert check(_report(400), hist, spec)[0]["median"] == 100.5
+    # ...and a normal run in between breaks the streak
+    hist = record(tmp_path, _report(101), now=101.0, accept_after=3)
+    verdicts = []
+    for i in range(4):
+        trace = check(_report(400), hist, {**spec, "min_runs": 3})
+        verdicts.append(trace[0]["verdict"])
+        regressed = [t["pack"] for t in trace if t["verdict"] == "regress"]
+        hist = record(tmp_path, _report(400), now=102.0 + i, exclude=regressed, accept_after=3)
+    # Three consecutive regressions become the new normal and the gate recovers
+    assert verdicts == ["regress", "regress", "regress", "pass"]
+    assert [r["duration_ms"] for r in hist["static"]] == [400, 400, 400, 400]
+    # accept_after=0 never admits them
+    for i in range(5):
+        hist = record(tmp_path, _report(900), now=200.0 + i, exclude=["static"], accept_after=0)
+    assert check(_report(900), hist, {**spec, "min_runs": 3})[0]["verdict"] == "regress"
@@ -33,3 +33,21 @@ def test_performance_gate_no_baseline_passes():
     current = {"packs": [{"name": "static", "counts": {"duration_ms": 500}}]}
     rc, _ = evaluate(current, None, budgets={"performance": {"factor_max": 2.0}}, phase="new_code_only")
     assert rc == 0
+
+
+def test_performance_metric_budgets_max_and_factor():
+    baseline = {"packs": [{"name": "static", "counts": {"telemetry": {"cpu_user_ms": 100, "bytes_read": 10}}}]}
+    current = {
+        "packs": [
+            {"name": "static", "counts": {"telemetry": {"cpu_user_ms": 180, "bytes_read": 50}}},
+            {"name": "prompt", "counts": {"telemetry": {"cpu_user_ms": 900}}},
+        ]
+    }
+    budgets = {"performance": {"metrics": {"cpu_user_ms": {"factor_max": 2.0}}}}
+    assert evaluate(current, baseline, budgets=budgets, phase="new_code_only")[0] == 0
+    budgets = {"performance": {"metrics": {"bytes_read": {"factor_max": 2.0}}}}
+    assert evaluate(current, baseline, budgets=budgets, phase="warn")[0] == 1
+    budgets = {"performance": {"metrics": {"cpu_user_ms": {"max": 500, "packs": ["static"]}}}}
+    assert evaluate(current, baseline, budgets=budgets, phase="hard")[0] == 0
+    budgets = {"performance": {"metrics": {"cpu_user_ms": {"max": 500}}}}
+    assert evaluate(current, baseline, budgets=budgets, phase="hard")[0] == 2
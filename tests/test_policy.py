@@ -143,3 +143,17 @@ def test_policy_pack_must_be_mapping(tmp_path):
         assert "pack 'static'" in str(e)
     else:
         raise AssertionError("expected PolicyError")
+
+
+def test_policy_pack_max_file_bytes(tmp_path):
+    from genticode import policy
+    p = tmp_path / "policy.yaml"
+    p.write_text("packs:\n  static: {max_file_bytes: 1048576}\n")
+    assert policy.load(p).packs["static"].max_file_bytes == 1048576
+    p.write_text("packs:\n  static: {max_file_bytes: big}\n")
+    try:
+        policy.load(p)
+    except policy.PolicyError as e:
+        assert "max_file_bytes" in str(e)
+    else:
+        raise AssertionError("expected PolicyError")
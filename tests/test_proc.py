@@ -0,0 +1,80 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from genticode import proc
+from genticode import telemetry
+from genticode.telemetry import metered_call
+
+
+PY = sys.executable
+
+
+def test_run_capture_and_check(tmp_path):
+    run = proc.run_capture([PY, "-c", "import sys; print('out'); sys.stderr.write('e' * 10000)"], tmp_path)
+    assert run.returncode == 0 and run.stdout == "out\n"
+    assert len(run.stderr) == proc.STDERR_TAIL and run.duration_s > 0
+    with pytest.raises(subprocess.CalledProcessError):
+        proc.run_capture([PY, "-c", "raise SystemExit(3)"], tmp_path, check=True)
+
+
+def test_timeout_kills_process_tree(tmp_path):
+    pidfile = tmp_path / "child.pid"
+    script = (
+        "import subprocess, sys, time\n"
+        f"c = subprocess.Popen([{PY!r}, '-c', 'import time; time.sleep(60)'])\n"
+        f"open({str(pidfile)!r}, 'w').write(str(c.pid))\n"
+        "time.sleep(60)\n"
+    )
+    t0 = time.perf_counter()
+    with pytest.raises(subprocess.TimeoutExpired):
+        proc.run_to_file([PY, "-c", script], tmp_path, tmp_path / "out.json", timeout_s=1)
+    assert time.perf_counter() - t0 < 10
+    assert not (tmp_path / "out.json").exists()
+    child = int(pidfile.read_text())
+    for _ in range(50):
+        try:
+            os.kill(child, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.1)
+    else:
+        raise AssertionError("grandchild survived the deadline")
+
+
+def test_slots_bound_concurrency(tmp_path, monkeypatch):
+    monkeypatch.setenv("GENTICODE_TOOL_SLOTS", "1")
+    proc.reset_slots()
+    runs = []
+
+    def one(meter):
+        with telemetry.attach(meter):
+            runs.append(proc.run_capture([PY, "-c", "import time; time.sleep(0.3)"], tmp_path))
+
+    def pack():
+        threads = [threading.Thread(target=one, args=(telemetry.current(),)) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return {}
+
+    try:
+        counts = metered_call(pack)
+    finally:
+        proc.reset_slots()
+    assert max(r.wait_s for r in runs) >= 0.2
+    tel = counts["telemetry"]
+    assert tel["subprocesses"] == 2 and tel["tool_wait_ms"] >= 200
+    assert proc.tool_slots() == 1
+
+
+def test_which_is_cached(monkeypatch):
+    calls = []
+    monkeypatch.setattr("shutil.which", lambda name: calls.append(name) or f"/usr/bin/{name}")
+    assert proc.which("ruff") == proc.which("ruff") == "/usr/bin/ruff"
+    assert calls == ["ruff"]
@@ -0,0 +1,80 @@
+import hashlib
+from pathlib import Path
+
+from genticode.prompt import detect
+from genticode.prompt.cache import PromptCache
+from genticode.prompt.detect import scan_paths
+
+
+FIXT = Path(__file__).parent / "fixtures" / "prompt"
+
+
+def test_prompt_cache_reuses_spans_for_unchanged_files(tmp_path: Path, monkeypatch):
+    cache_path = tmp_path / "cache" / "prompt-spans.json"
+    paths = [FIXT / "sample.py", FIXT / "sample.ts"]
+    cold = PromptCache.load(cache_path)
+    spans = scan_paths(paths, cache=cold)
+    cold.save()
+    assert cold.stats()["misses"] == 2 and cold.stats()["hits"] == 0
+
+    # Warm run must not parse anything
+    def boom(path, src):
+        raise AssertionError("re-parsed unchanged file")
+
+    monkeypatch.setattr(detect, "_scan_file", boom)
+    warm = PromptCache.load(cache_path)
+    spans2 = scan_paths(paths, cache=warm)
+    assert warm.stats()["hits"] == 2 and warm.stats()["misses"] == 0
+    assert [(s.file, s.start, s.end, s.text) for s in spans2] == [(s.file, s.start, s.end, s.text) for s in spans]
+
+
+def test_prompt_cache_misses_on_change_and_evicts(tmp_path: Path):
+    f = tmp_path / "a.py"
+    f.write_text("X = 'You are a bot'\n")
+    cache = PromptCache.load(tmp_path / "c.json", max_entries=1)
+    scan_paths([f], cache=cache)
+    cache.save()
+    f.write_text("Y = 'system: changed'\n")
+    cache = PromptCache.load(tmp_path / "c.json", max_entries=1)
+    spans = scan_paths([f], cache=cache)
+    assert cache.misses == 1 and spans[0].text == "system: changed"
+    cache.save()
+    # Only the most recently used entry survives
+    reloaded = PromptCache.load(tmp_path / "c.json", max_entries=1)
+    assert len(reloaded.entries) == 1
+    scan_paths([f], cache=reloaded)
+    assert reloaded.hits == 1
+
+
+def test_cache_is_bounded_by_bytes_and_saved_only_when_changed(tmp_path: Path):
+    path = tmp_path / "c.json"
+    cache = PromptCache.load(path, max_bytes=1000)
+    for i in range(20):
+        cache.put(f"k{i:02d}", [[0, 50, "x" * 50]])
+    cache.save()
+    assert path.stat().st_size <= 1000
+    kept = PromptCache.load(path).entries
+    assert 0 < len(kept) < 20 and "k19" in kept
+    # A run of hits only doesn't rewrite the file
+    path.write_text("marker" + path.read_text())
+    warm = PromptCache(path)
+    warm.get("k19")
+    warm.save()
+    assert path.read_text().startswith("marker")
+
+
+def test_scan_paths_process_pool_matches_serial(tmp_path: Path, monkeypatch):
+    paths = []
+    for i in range(12):
+        p = tmp_path / f"m{i:02d}.py"
+        p.write_text(f"S = 'You are bot {i}'\nT = '''system:\\nline {i}'''\n")
+        paths.append(p)
+    serial = scan_paths(paths, workers=1)
+    monkeypatch.setattr(detect, "PARALLEL_MIN_FILES", 1)
+    cache = PromptCache()
+    pooled = scan_paths(list(reversed(paths)), cache=cache, workers=2)
+    assert [(s.file, s.start, s.end, s.text) for s in pooled] == [(s.file, s.start, s.end, s.text) for s in serial]
+    assert cache.misses == 12 and len(cache.entries) == 12
+    # Workers get paths and read the files themselves
+    sha, found = detect._scan_chunk([str(paths[0])])[0]
+    assert sha == hashlib.sha256(paths[0].read_bytes()).hexdigest() and len(found) == 2
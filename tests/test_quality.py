@@ -4,7 +4,7 @@ from pathlib import Path
 from genticode.quality.linter import maybe_run_quality
 
 
-def test_maybe_run_quality_sums_tools(monkeypatch, tmp_path):
+def test_maybe_run_quality_sums_tools(monkeypatch, tmp_path, popen_from_run):
     # Simulate both tools present
     calls = {"ruff": 0, "eslint": 0}
 
@@ -15,7 +15,7 @@ def test_maybe_run_quality_sums_tools(monkeypatch, tmp_path):
         def __init__(self, stdout: str):
             self.stdout = stdout
 
-    def fake_run(cmd, cwd, capture_output, text, check):
+    def fake_run(cmd, **kw):
         if "ruff" in cmd[0]:
             calls["ruff"] += 1
             # ruff JSON is a list per file
@@ -29,7 +29,7 @@ def test_maybe_run_quality_sums_tools(monkeypatch, tmp_path):
             ]))
 
     monkeypatch.setattr("shutil.which", which)
-    monkeypatch.setattr("subprocess.run", fake_run)
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(fake_run))
     counts = maybe_run_quality(tmp_path)
     # 2 ruff items + 3 eslint messages
     assert counts["findings"] == 5
@@ -0,0 +1,101 @@
+import gzip
+import json
+
+from genticode.sarif import to_sarif, write_sarif
+
+
+def _semgrep(gc, n, rules=3):
+    (gc / "raw").mkdir(parents=True, exist_ok=True)
+    results = [
+        {"check_id": f"rule.{i % rules}", "extra": {"severity": "high", "message": f"finding {i}"}, "path": f"f{i}.py", "start": {"line": i + 1}}
+        for i in range(n)
+    ]
+    (gc / "raw" / "semgrep.json").write_text(json.dumps({"results": results, "errors": []}))
+    (gc / "prompts.manifest.json").write_text(json.dumps({"items": [{"id": "p1", "file": "a.py", "start": 2, "role": "system", "lints": ["PL001"]}]}))
+
+
+def test_streamed_matches_in_memory(tmp_path):
+    gc = tmp_path / ".genticode"
+    _semgrep(gc, 5)
+    report = {"genticode_version": "1.2"}
+    [out] = write_sarif(report, gc, gc / "sarif.json")
+    assert json.loads(out.read_text()) == to_sarif(report, gc)
+
+
+def _categories(files):
+    """uri -> automationDetails category of the file that holds it."""
+    out = {}
+    for f in files:
+        run = json.loads(gzip.decompress(f.read_bytes()) if f.suffix == ".gz" else f.read_text())["runs"][0]
+        for res in run["results"]:
+            out[(res["ruleId"], res["locations"][0]["physicalLocation"]["artifactLocation"]["uri"])] = run["automationDetails"]["id"]
+    return out
+
+
+def test_chunks_respect_limits_and_carry_their_rules(tmp_path):
+    gc = tmp_path / ".genticode"
+    _semgrep(gc, 50)
+    out = gc / "sarif"
+    out.mkdir(parents=True)
+    (out / "genticode-0099.sarif.gz").write_text("stale")
+    files = write_sarif({}, gc, out, compress=True, max_results=20)
+    # 52 results over a limit of 20: 3 needed, 8 with headroom
+    assert [f.name for f in files] == [f"genticode-000{n}.sarif.gz" for n in range(1, 9)]
+    assert sorted(p.name for p in out.iterdir()) == [f.name for f in files]
+    runs = [json.loads(gzip.decompress(f.read_bytes()))["runs"][0] for f in files]
+    assert all(len(r["results"]) <= 20 for r in runs) and sum(len(r["results"]) for r in runs) == 52
+    assert len({r["automationDetails"]["id"] for r in runs}) == 8
+    for r in runs:
+        used = {res["ruleId"] for res in r["results"]}
+        assert [d["id"] for d in r["tool"]["driver"]["rules"]] == sorted(used)
+
+
+def test_chunk_categories_are_stable_across_runs(tmp_path):
+    gc = tmp_path / ".genticode"
+    _semgrep(gc, 50)
+    before = _categories(write_sarif({}, gc, gc / "sarif", max_results=20))
+    # Fixing the first findings shifts every later result's position, not its category
+    raw = json.loads((gc / "raw" / "semgrep.json").read_text())
+    raw["results"] = raw["results"][5:]
+    (gc / "raw" / "semgrep.json").write_text(json.dumps(raw))
+    after = _categories(write_sarif({}, gc, gc / "sarif", max_results=20))
+    assert after and all(before[k] == cat for k, cat in after.items())
+    # A pinned bucket count is doubled only when a bucket overflows
+    assert len(write_sarif({}, gc, gc / "sarif", max_results=20, buckets=4)) == 4
+    assert len(write_sarif({}, gc, gc / "sarif", max_results=12, buckets=4)) == 8
+
+
+def test_gzip_output_replaces_plain_sarif(tmp_path, monkeypatch):
+    from genticode.cli import main
+
+    gc = tmp_path / ".genticode"
+    _semgrep(gc, 3)
+    (gc / "report.json").write_text(json.dumps({"packs": []}))
+    monkeypatch.setattr("genticode.cli.GC_DIR", gc)
+    monkeypatch.setattr("genticode.cli.ensure_layout", lambda: None)
+    assert main(["report", "--sarif"]) == 0 and (gc / "sarif.json").exists()
+    assert main(["report", "--sarif", "--sarif-gzip"]) == 0
+    assert (gc / "sarif.json.gz").exists() and not (gc / "sarif.json").exists()
+    assert main(["report", "--sarif", "--sarif-split"]) == 0
+    assert not (gc / "sarif.json.gz").exists() and list((gc / "sarif").iterdir())
+
+
+def test_chunks_respect_byte_limit(tmp_path):
+    gc = tmp_path / ".genticode"
+    _semgrep(gc, 200)
+    files = write_sarif({}, gc, gc / "sarif", max_bytes=8000)
+    assert len(files) > 1
+    total = 0
+    for f in files:
+        assert len(f.read_bytes()) <= 8000
+        total += len(json.loads(f.read_text())["runs"][0]["results"])
+    assert total == 202
+
+
+def test_malformed_source_is_skipped(tmp_path):
+    gc = tmp_path / ".genticode"
+    (gc / "raw").mkdir(parents=True)
+    (gc / "raw" / "semgrep.json").write_text("{not json")
+    [out] = write_sarif({}, gc, gc / "sarif.json", compress=True)
+    assert out.name == "sarif.json.gz"
+    assert json.loads(gzip.decompress(out.read_bytes()))["runs"][0]["results"] == []
@@ -4,7 +4,7 @@ from pathlib import Path
 from genticode.supply.sbom import maybe_cyclonedx_npm
 
 
-def test_maybe_cyclonedx_npm_reads_file(monkeypatch, tmp_path):
+def test_maybe_cyclonedx_npm_reads_file(monkeypatch, tmp_path, popen_from_run):
     out = tmp_path / "sbom-node.json"
     sample = (Path(__file__).parent / "fixtures/sbom/python.json").read_text()
 
@@ -17,7 +17,7 @@ def test_maybe_cyclonedx_npm_reads_file(monkeypatch, tmp_path):
         return FakeCP()
 
     monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/npx")
-    monkeypatch.setattr("subprocess.run", fake_run)
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(fake_run))
     data = maybe_cyclonedx_npm(tmp_path, out)
     assert data is not None and "components" in data
 
@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+
+from genticode.scheduler import CPU, EXTERNAL, Job, cpu_budget, order, run_jobs
+
+
+def test_order_deps_first_then_longest_expected():
+    jobs = [
+        Job("short", lambda: 1, expected_ms=10),
+        Job("semgrep", lambda: 1, resource=EXTERNAL, expected_ms=9000),
+        Job("after", lambda: 1, deps=("short", "disabled"), expected_ms=99999),
+        Job("mid", lambda: 1, expected_ms=500),
+    ]
+    assert order(jobs) == ["semgrep", "mid", "short", "after"]
+    with pytest.raises(ValueError):
+        order([Job("a", lambda: 1, deps=("b",)), Job("b", lambda: 1, deps=("a",))])
+
+
+def test_run_jobs_caps_each_resource_class():
+    lock = threading.Lock()
+    live = {CPU: 0, EXTERNAL: 0}
+    peak = {CPU: 0, EXTERNAL: 0}
+
+    def work(res):
+        def f():
+            with lock:
+                live[res] += 1
+                peak[res] = max(peak[res], live[res])
+            time.sleep(0.02)
+            with lock:
+                live[res] -= 1
+            return res
+        return f
+
+    jobs = [Job(f"c{i}", work(CPU), resource=CPU) for i in range(4)]
+    jobs += [Job(f"e{i}", work(EXTERNAL), resource=EXTERNAL) for i in range(4)]
+    results = run_jobs(jobs, limits={CPU: 1, EXTERNAL: 2})
+    assert all(r.status == "ok" for r in results.values())
+    assert peak[CPU] == 1 and peak[EXTERNAL] == 2
+
+
+def test_run_jobs_skips_dependents_of_failures_and_times_out_from_start():
+    seen = []
+
+    def boom():
+        raise RuntimeError("boom")
+
+    def slow():
+        time.sleep(0.3)
+
+    jobs = [
+        Job("bad", boom),
+        Job("child", lambda: seen.append("child"), deps=("bad",)),
+        Job("grandchild", lambda: seen.append("gc"), deps=("child",)),
+        Job("slow", slow, timeout_s=0.05),
+        Job("ok", lambda: 42),
+    ]
+    results = run_jobs(jobs, limits={CPU: 1})
+    assert results["bad"].status == "error" and results["bad"].error == "boom"
+    assert results["child"].status == "skipped" and results["grandchild"].status == "skipped"
+    assert seen == []
+    assert results["slow"].status == "timeout" and results["slow"].duration_ms == 50
+    assert results["ok"].value == 42
+
+
+def test_timed_out_job_thread_does_not_block_exit():
+    release = threading.Event()
+    results = run_jobs([Job("stuck", release.wait, timeout_s=0.05)])
+    assert results["stuck"].status == "timeout"
+    stuck = [t for t in threading.enumerate() if t.name == "genticode-job-stuck"]
+    assert stuck and all(t.daemon for t in stuck)
+    release.set()
+
+
+def test_run_all_starts_slowest_pack_from_last_report_first(tmp_path, monkeypatch):
+    import json
+
+    from genticode.orchestrator import PackRunner, run_all
+    from genticode.policy import PolicyConfig
+
+    monkeypatch.setenv("GENTICODE_MAX_CPU_JOBS", "1")
+    gc = tmp_path / ".genticode"
+    gc.mkdir()
+    (gc / "report.json").write_text(json.dumps({"packs": [{"name": "b", "counts": {"duration_ms": 5000}}]}))
+    started = []
+
+    def runner(name):
+        def f(root, gc_dir, policy=None):
+            started.append(name)
+            return {}
+        return f
+
+    packs = {n: PackRunner(n, runner(n), expected_ms=100) for n in ("a", "b", "c")}
+    report = {"packs": []}
+    run_all(PolicyConfig(), tmp_path, gc, report, packs=packs)
+    assert started == ["b", "a", "c"]
+    # Summaries keep pack declaration order
+    assert [p["name"] for p in report["packs"]] == ["a", "b", "c"]
+    assert all("queued_ms" in p["counts"] for p in report["packs"])
+
+
+def test_lazy_index_pack_starts_before_tree_walk(tmp_path, monkeypatch):
+    from genticode.fileindex import FileIndex
+    from genticode.orchestrator import PackRunner, run_all
+    from genticode.policy import PolicyConfig
+
+    (tmp_path / "a.py").write_text("x = 1\n")
+    started = threading.Event()
+    build = FileIndex.build
+
+    def slow_build(root):
+        # The walk only completes once the pack is already running
+        assert started.wait(5)
+        return build(root)
+
+    def pack(root, gc_dir, policy=None, index=None):
+        started.set()
+        return {"files": len(index())}
+
+    monkeypatch.setattr(FileIndex, "build", slow_build)
+    report = {"packs": []}
+    run_all(PolicyConfig(), tmp_path, tmp_path / ".genticode", report, packs={"lazy": PackRunner("lazy", pack, uses_index=True, lazy_index=True)})
+    assert report["packs"][0]["counts"]["files"] == 1
+
+
+def test_cpu_budget_shrinks_with_concurrent_cpu_jobs(monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    gate = threading.Barrier(2)
+
+    def job():
+        gate.wait(5)
+        return cpu_budget()
+
+    results = run_jobs([Job("a", job, expected_ms=2), Job("b", job, expected_ms=1)], limits={CPU: 4})
+    assert (results["a"].value, results["b"].value) == (4, 3)
+    # Outside the scheduler: one per core
+    assert cpu_budget() == 8
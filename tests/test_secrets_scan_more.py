@@ -16,3 +16,85 @@ def test_scan_repo_for_secrets_more_patterns_and_ignores(tmp_path: Path):
     # ensure .git file ignored
     assert not any('oops' in t for t in texts)
 
+
+
+def test_scan_repo_for_secrets_single_pass_rules_and_binary_skip(tmp_path: Path):
+    from genticode.static.secrets import hits_by_rule
+
+    (tmp_path / "e.env").write_text("x = 1\nPASSWORD = hunter2 api_key\nname = 'n'\nssn 123-45-6789\n")
+    # Does not cross lines
+    (tmp_path / "f.txt").write_text("password\n= oops\n")
+    (tmp_path / "g.bin").write_bytes(b"\x00\x01api_key=zzz\x00")
+    findings = scan_repo_for_secrets(tmp_path)
+    got = sorted((f.file.name, f.line, f.rule) for f in findings)
+    # One finding per line, attributed to the leftmost pattern hit
+    assert got == [("e.env", 2, "password_assignment"), ("e.env", 4, "ssn")]
+    assert findings[0].text == "PASSWORD = hunter2 api_key"
+    assert hits_by_rule(findings) == {"password_assignment": 1, "ssn": 1}
+
+
+def test_scan_stream_windows_match_in_memory_scan(tmp_path: Path, monkeypatch):
+    from genticode.static import secrets
+    from genticode.static.secrets import scan_buffer, scan_stream
+
+    lines = [f"filler line {i} " + "x" * (i % 37) for i in range(400)]
+    lines[17] = "password = hunter2"
+    lines[250] = "long " + "y" * 300 + " api_key " + "z" * 300
+    lines[399] = "ssn 123-45-6789"
+    data = ("\n".join(lines) + "\n").encode()
+    big = tmp_path / "dump.sql"
+    big.write_bytes(data)
+    expected = list(scan_buffer(data))
+    assert [h[0] for h in expected] == [18, 251, 400]
+    # Windows smaller than some lines still end on line boundaries
+    for window in (64, 100, 333, 4096):
+        got = list(scan_stream(big, window=window))
+        assert [h[:2] for h in got] == [h[:2] for h in expected]
+        # Lines longer than the window report an excerpt around the match
+        assert got[1][2] == expected[1][2] if window > 614 else "api_key" in got[1][2]
+    # Files above GENTICODE_SECRETS_STREAM_BYTES are streamed...
+    streamed = []
+    real = secrets.scan_stream
+    monkeypatch.setattr(secrets, "scan_stream", lambda p, **kw: streamed.append(p.name) or real(p, **kw))
+    monkeypatch.setenv("GENTICODE_SECRETS_STREAM_BYTES", "100")
+    # ...and not skipped by the other packs' size limit
+    monkeypatch.setenv("GENTICODE_MAX_FILE_BYTES", "100")
+    findings = scan_repo_for_secrets(tmp_path)
+    assert sorted(f.line for f in findings) == [18, 251, 400] and streamed == ["dump.sql"]
+    # ...unless policy caps the size
+    assert scan_repo_for_secrets(tmp_path, max_bytes=100) == []
+
+
+def test_scan_stream_never_cuts_inside_a_word(tmp_path: Path):
+    from genticode.static.secrets import scan_buffer, scan_stream
+
+    # Not an SSN: the digits are the tail of a longer word
+    line = "token " + "A" * 50 + "123-45-6789 end"
+    data = ("x = 1\n" + line + "\n").encode()
+    f = tmp_path / "blob.txt"
+    f.write_bytes(data)
+    assert list(scan_buffer(data)) == []
+    # Windows that would cut mid-line, right before the digits
+    for window in (56, 28, 14, 200):
+        assert list(scan_stream(f, window=window)) == []
+
+
+def test_scan_stream_does_not_copy_a_line_longer_than_the_window(tmp_path: Path):
+    import tracemalloc
+
+    from genticode.static.secrets import LONG_LINE_CONTEXT, scan_stream
+
+    window = 1 << 12
+    # A 4 MB minified line with an SSN straddling a window edge, then a short line
+    body = "var a=" + "x;" * (window // 2 - 5) + " 123-45-6789 " + "y;" * (1 << 21)
+    f = tmp_path / "bundle.min.js"
+    f.write_bytes((body + "\napi_key = 1\n").encode())
+    tracemalloc.start()
+    try:
+        got = list(scan_stream(f, window=window))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert [h[:2] for h in got] == [(1, "ssn"), (2, "api_key")]
+    assert "123-45-6789" in got[0][2] and len(got[0][2]) <= 2 * LONG_LINE_CONTEXT + 11
+    assert peak < 1 << 20
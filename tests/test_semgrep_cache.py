@@ -0,0 +1,142 @@
+import json
+from pathlib import Path
+
+from genticode.fileindex import FileIndex
+from genticode.static.cache import SemgrepCache
+from genticode.static.semgrep import maybe_run_semgrep, normalize_semgrep
+
+
+class FakeCP:
+    def __init__(self, stdout: str):
+        self.stdout = stdout
+
+
+def fake_semgrep(calls: list):
+    def run(cmd, **kw):
+        if cmd[1] == "--version":
+            return FakeCP("1.50.0\n")
+        targets = cmd[cmd.index("--jobs") + 2 :]
+        calls.append(targets)
+        if targets == ["."]:
+            root = Path(kw["cwd"])
+            targets = sorted(p.relative_to(root).as_posix() for p in root.rglob("*") if p.is_file() and ".genticode" not in p.parts)
+        results = [
+            {"path": t, "check_id": "r.eval", "start": {"line": 1, "col": 1}, "end": {"line": 1}, "extra": {"severity": "ERROR", "lines": "eval", "metadata": {"cwe": ["CWE-95"]}}}
+            for t in targets
+            if "eval" in Path(kw["cwd"], t).read_text()
+        ]
+        kw["stdout"].write(json.dumps({"results": results, "errors": []}).encode())
+        return FakeCP(None)
+
+    return run
+
+
+def run_once(root: Path, configs=None, targets=None):
+    cache = SemgrepCache.load(root / ".genticode/cache/semgrep-results.json")
+    index = FileIndex.build(root)
+    data = maybe_run_semgrep(root, root / ".genticode/raw/semgrep.json", configs=configs, targets=targets, index=index, cache=cache)
+    return data, cache
+
+
+def test_semgrep_only_rescans_cache_misses(tmp_path: Path, monkeypatch, popen_from_run):
+    calls: list = []
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/semgrep")
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(fake_semgrep(calls)))
+    (tmp_path / "a.py").write_text("eval(x)\n")
+    (tmp_path / "b.py").write_text("y = 1\n")
+    (tmp_path / "Dockerfile").write_text("RUN eval $CMD\n")
+
+    # Cold cache: one scan of the root, every file cached (no suffix filter)
+    cold, cache = run_once(tmp_path)
+    assert calls == [["."]] and cache.stats()["misses"] == 3
+    assert [r["path"] for r in cold["results"]] == ["Dockerfile", "a.py"]
+
+    warm, cache = run_once(tmp_path)
+    assert len(calls) == 1 and cache.stats()["hits"] == 3
+    assert warm["results"] == cold["results"]
+    # Results in memory are slimmed; the raw file keeps the tool's full results
+    assert "lines" not in warm["results"][0]["extra"]
+    raw = json.loads((tmp_path / ".genticode/raw/semgrep.json").read_text())
+    assert [r["extra"]["metadata"] for r in raw["results"]] == [{"cwe": ["CWE-95"]}] * 2
+
+    (tmp_path / "b.py").write_text("eval(y)\n")
+    changed, _ = run_once(tmp_path)
+    assert calls[-1] == ["b.py"]
+    assert [r["path"] for r in changed["results"]] == ["Dockerfile", "a.py", "b.py"]
+    raw = json.loads((tmp_path / ".genticode/raw/semgrep.json").read_text())
+    assert len(normalize_semgrep(raw)) == 3
+
+    # A different ruleset invalidates every entry
+    run_once(tmp_path, configs=["p/other"])
+    assert calls[-1] == ["."]
+
+
+def test_semgrep_targets_are_batched_and_honor_semgrepignore(tmp_path: Path, monkeypatch, popen_from_run):
+    calls: list = []
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/semgrep")
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(fake_semgrep(calls)))
+    monkeypatch.setattr("genticode.static.semgrep.TARGET_BATCH", 2)
+    names = [f"m{i}.py" for i in range(5)]
+    for n in names:
+        (tmp_path / n).write_text("eval(x)\n")
+    (tmp_path / "vendor").mkdir()
+    (tmp_path / "vendor" / "lib.py").write_text("eval(x)\n")
+    (tmp_path / ".semgrepignore").write_text("# vendored\nvendor/\n")
+    data, _ = run_once(tmp_path, targets=names + ["vendor/lib.py"])
+    assert sorted(calls) == [["m0.py", "m1.py"], ["m2.py", "m3.py"], ["m4.py"]]
+    assert [r["path"] for r in data["results"]] == names
+
+
+def test_semgrep_cache_respects_scoped_targets(tmp_path: Path, monkeypatch, popen_from_run):
+    calls: list = []
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/semgrep")
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(fake_semgrep(calls)))
+    (tmp_path / "a.py").write_text("eval(x)\n")
+    (tmp_path / "b.py").write_text("eval(y)\n")
+    data, _ = run_once(tmp_path, targets=["b.py"])
+    assert calls == [["b.py"]]
+    assert [r["path"] for r in data["results"]] == ["b.py"]
+
+
+def test_cold_semgrep_scan_starts_before_the_index(tmp_path: Path, monkeypatch, popen_from_run):
+    calls: list = []
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/semgrep")
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(fake_semgrep(calls)))
+    (tmp_path / "a.py").write_text("eval(x)\n")
+
+    # Semgrep processes started by the time the index is asked for
+    seen: list = []
+
+    def index():
+        seen.append(len(calls))
+        return FileIndex.build(tmp_path)
+
+    def run():
+        cache = SemgrepCache.load(tmp_path / ".genticode/cache/semgrep-results.json")
+        return maybe_run_semgrep(tmp_path, tmp_path / ".genticode/raw/semgrep.json", index=index, cache=cache), cache
+
+    cold, _ = run()
+    assert seen == [1] and calls == [["."]] and [r["path"] for r in cold["results"]] == ["a.py"]
+    # Warm: the cache lookups need the index, and nothing is rescanned
+    warm, cache = run()
+    assert seen == [1, 1] and cache.stats()["hits"] == 1 and warm["results"] == cold["results"]
+
+
+def test_files_with_findings_are_cached(tmp_path: Path, monkeypatch, popen_from_run):
+    calls: list = []
+    inner = fake_semgrep(calls)
+
+    def run(cmd, **kw):
+        cp = inner(cmd, **kw)
+        # Like semgrep: --error turns findings into exit code 1
+        cp.returncode = 1 if "--error" in cmd else 0
+        return cp
+
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/semgrep")
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(run))
+    (tmp_path / "a.py").write_text("eval(x)\n")
+    cold, cache = run_once(tmp_path)
+    assert cold is not None and [r["path"] for r in cold["results"]] == ["a.py"]
+    warm, cache = run_once(tmp_path)
+    assert len(calls) == 1 and cache.stats()["hits"] == 1
+    assert warm["results"] == cold["results"]
@@ -0,0 +1,96 @@
+import json
+import threading
+from pathlib import Path
+
+from genticode import policy
+from genticode.static.semgrep import balanced_bins, maybe_run_semgrep, merge_results, plan_shards
+
+
+class FakeCP:
+    def __init__(self, stdout: str):
+        self.stdout = stdout
+
+
+def test_plan_shards_by_ruleset_and_balanced_bins():
+    sizes = {"big.py": 900, "m1.py": 400, "m2.py": 400, "s.py": 100}
+    bins = balanced_bins(sorted(sizes), sizes, 2)
+    assert bins == [["big.py"], ["m1.py", "m2.py", "s.py"]]
+    shards = plan_shards(["r1", "r2"], sorted(sizes), sizes, cores=4, min_files=1)
+    assert [(c, b) for c, b in shards] == [(["r1"], bins[0]), (["r1"], bins[1]), (["r2"], bins[0]), (["r2"], bins[1])]
+    # Few files stay in one bin; a root target can only be split by ruleset
+    assert len(plan_shards(["r1"], sorted(sizes), sizes, cores=8)) == 1
+    assert plan_shards(["r1", "r2"], None, None, cores=8) == [(["r1"], None), (["r2"], None)]
+
+
+def test_merge_results_dedupes_and_orders():
+    a = {"path": "b.py", "check_id": "x", "start": {"line": 2}, "end": {"line": 2}}
+    b = {"path": "a.py", "check_id": "x", "start": {"line": 9}, "end": {"line": 9}}
+    err = {"path": "c.py", "message": "parse"}
+    merged = merge_results([{"results": [a, b], "errors": [err]}, {"results": [a], "errors": [err]}])
+    assert merged["results"] == [b, a] and merged["errors"] == [err]
+
+
+def test_sharded_semgrep_runs_concurrent_processes(tmp_path: Path, monkeypatch, popen_from_run):
+    lock = threading.Lock()
+    calls: list = []
+
+    def run(cmd, **kw):
+        cfgs = [cmd[i + 1] for i, c in enumerate(cmd) if c == "--config"]
+        targets = cmd[cmd.index("--jobs") + 2 :]
+        with lock:
+            calls.append((cfgs, targets, cmd[cmd.index("--jobs") + 1]))
+        results = [{"path": t, "check_id": c, "start": {"line": 1}, "end": {"line": 1}} for c in cfgs for t in targets]
+        kw["stdout"].write(json.dumps({"results": results, "errors": []}).encode())
+        return FakeCP(None)
+
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/semgrep")
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(run))
+    monkeypatch.setattr("genticode.static.semgrep.MIN_SHARD_FILES", 1)
+    targets = [f"f{i}.py" for i in range(4)]
+    data = maybe_run_semgrep(tmp_path, tmp_path / "out.json", configs=["r1", "r2"], targets=targets, cores=4)
+    assert len(calls) == 4 and all(c[2] == "1" for c in calls)
+    assert len(data["results"]) == 8
+    raw = json.loads((tmp_path / "out.json").read_text())
+    assert sorted(raw["results"], key=lambda r: (r["path"], r["check_id"])) == data["results"]
+
+
+def test_cold_cache_scan_is_sharded_by_path(tmp_path: Path, monkeypatch, popen_from_run):
+    from genticode.fileindex import FileIndex
+    from genticode.static.cache import SemgrepCache
+
+    lock = threading.Lock()
+    calls: list = []
+
+    def run(cmd, **kw):
+        if cmd[1] == "--version":
+            return FakeCP("1.50.0\n")
+        targets = cmd[cmd.index("--jobs") + 2 :]
+        with lock:
+            calls.append(targets)
+        results = [{"path": t, "check_id": "r1", "start": {"line": 1}, "end": {"line": 1}} for t in targets if t.startswith("hit")]
+        kw["stdout"].write(json.dumps({"results": results, "errors": []}).encode())
+        return FakeCP(None)
+
+    monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/semgrep")
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(run))
+    monkeypatch.setattr("genticode.static.semgrep.MIN_SHARD_FILES", 1)
+    names = ["hit0.py", "hit1.py", "m0.py", "m1.py"]
+    for n in names:
+        (tmp_path / n).write_text(f"x = '{n}'\n")
+    cache = SemgrepCache.load(tmp_path / "cache.json")
+    index = FileIndex.build(tmp_path)
+    # One ruleset, nothing cached: still split into path bins from the index
+    data = maybe_run_semgrep(tmp_path, tmp_path / "out.json", configs=["r1"], index=lambda: index, cache=cache, cores=4)
+    assert len(calls) == 4 and sorted(t for c in calls for t in c) == names
+    assert [r["path"] for r in data["results"]] == ["hit0.py", "hit1.py"]
+    assert cache.stats()["misses"] == 4 and len(cache.entries) == 4
+    # Without a cache the index still bins a whole-tree scan
+    calls.clear()
+    maybe_run_semgrep(tmp_path, tmp_path / "out.json", configs=["r1"], index=index, cores=2)
+    assert len(calls) == 2 and "." not in [t for c in calls for t in c]
+
+
+def test_policy_pack_cores(tmp_path: Path):
+    p = tmp_path / "policy.yaml"
+    p.write_text("packs:\n  static: {cores: 16}\n")
+    assert policy.load(p).packs["static"].cores == 16
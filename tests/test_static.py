@@ -13,7 +13,7 @@ def test_normalize_semgrep_fixture():
         assert k in first
 
 
-def test_maybe_run_semgrep_monkey(monkeypatch, tmp_path):
+def test_maybe_run_semgrep_monkey(monkeypatch, tmp_path, popen_from_run):
     data = (Path(__file__).parent / "fixtures/semgrep/sample.json").read_text()
 
     class FakeCP:
@@ -21,19 +21,22 @@ def test_maybe_run_semgrep_monkey(monkeypatch, tmp_path):
             self.stdout = stdout
 
     monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/semgrep")
-    monkeypatch.setattr(
-        "subprocess.run",
-        lambda *a, **k: FakeCP(stdout=data),
-    )
+    def fake_run(*a, **k):
+        # Output is streamed to the file handle passed as stdout
+        k["stdout"].write(data.encode())
+        return FakeCP(stdout=None)
+
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(fake_run))
     out = tmp_path / "semgrep.json"
     result = maybe_run_semgrep(tmp_path, out)
     assert result is not None
-    assert out.exists()
+    # Raw artifact is the tool's output byte for byte
+    assert out.read_text() == data
     findings = normalize_semgrep(result)
     assert len(findings) == 2
 
 
-def test_maybe_run_semgrep_handles_error(monkeypatch, tmp_path):
+def test_maybe_run_semgrep_handles_error(monkeypatch, tmp_path, popen_from_run):
     from subprocess import CalledProcessError
 
     monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/semgrep")
@@ -41,7 +44,7 @@ def test_maybe_run_semgrep_handles_error(monkeypatch, tmp_path):
     def raise_err(*a, **k):
         raise CalledProcessError(2, "semgrep")
 
-    monkeypatch.setattr("subprocess.run", raise_err)
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(raise_err))
     out = tmp_path / "semgrep.json"
     result = maybe_run_semgrep(tmp_path, out)
     assert result is None
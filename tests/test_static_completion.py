@@ -16,7 +16,7 @@ def test_static_secrets_count_included(tmp_path, monkeypatch):
 def test_static_ruleset_from_policy_passed(monkeypatch, tmp_path):
     captured = {}
 
-    def fake_semgrep(root, out, timeout_s=120, configs=None):
+    def fake_semgrep(root, out, timeout_s=120, configs=None, targets=None):
         captured["configs"] = list(configs or [])
         return {"results": []}
 
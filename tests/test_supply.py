@@ -17,7 +17,7 @@ def test_license_evaluator_counts():
     assert "FooBar-1.0" in detail2["unknown"]
 
 
-def test_maybe_cyclonedx_py_reads_output(monkeypatch, tmp_path):
+def test_maybe_cyclonedx_py_reads_output(monkeypatch, tmp_path, popen_from_run):
     out = tmp_path / "sbom.json"
     sample = (Path(__file__).parent / "fixtures/sbom/python.json").read_text()
 
@@ -30,13 +30,13 @@ def test_maybe_cyclonedx_py_reads_output(monkeypatch, tmp_path):
         return FakeCP()
 
     monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/cyclonedx-py")
-    monkeypatch.setattr("subprocess.run", fake_run)
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(fake_run))
     data = maybe_cyclonedx_py(tmp_path, out)
     assert data is not None
     assert "components" in data
 
 
-def test_maybe_cyclonedx_npm_reads_stdout(monkeypatch, tmp_path):
+def test_maybe_cyclonedx_npm_reads_stdout(monkeypatch, tmp_path, popen_from_run):
     out = tmp_path / "sbom-node.json"
     sample = (Path(__file__).parent / "fixtures/sbom/python.json").read_text()
 
@@ -45,13 +45,13 @@ def test_maybe_cyclonedx_npm_reads_stdout(monkeypatch, tmp_path):
             self.stdout = stdout
 
     monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/npx")
-    monkeypatch.setattr("subprocess.run", lambda *a, **k: FakeCP(stdout=sample))
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(lambda *a, **k: FakeCP(stdout=sample)))
     data = maybe_cyclonedx_npm(tmp_path, out)
     assert data is not None
     assert "components" in data
 
 
-def test_maybe_cyclonedx_py_reads_stdout(monkeypatch, tmp_path):
+def test_maybe_cyclonedx_py_reads_stdout(monkeypatch, tmp_path, popen_from_run):
     out = tmp_path / "sbom.json"
     sample = (Path(__file__).parent / "fixtures/sbom/python.json").read_text()
 
@@ -61,7 +61,7 @@ def test_maybe_cyclonedx_py_reads_stdout(monkeypatch, tmp_path):
 
     monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/cyclonedx-py")
     # Do not create output file; rely on stdout
-    monkeypatch.setattr("subprocess.run", lambda *a, **k: FakeCP(stdout=sample))
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(lambda *a, **k: FakeCP(stdout=sample)))
     data = maybe_cyclonedx_py(tmp_path, out)
     assert data is not None
     assert "components" in data
@@ -71,3 +71,48 @@ def test_cyclonedx_tools_missing(monkeypatch, tmp_path):
     monkeypatch.setattr("shutil.which", lambda _: None)
     assert maybe_cyclonedx_py(tmp_path, tmp_path / "x.json") is None
     assert maybe_cyclonedx_npm(tmp_path, tmp_path / "y.json") is None
+
+
+def test_spdx_expressions():
+    from genticode.supply.license import SpdxError, evaluate_expression, parse_expression
+
+    assert parse_expression("MIT OR Apache-2.0 AND GPL-2.0-only WITH Classpath-exception-2.0") == (
+        "or",
+        (("id", "MIT"), ("and", (("id", "Apache-2.0"), ("with", "GPL-2.0-only", "Classpath-exception-2.0")))),
+    )
+    allow, deny = {"MIT", "Apache-2.0"}, {"GPL-3.0-only"}
+    verdict = lambda e: evaluate_expression(parse_expression(e), allow, deny)
+    assert verdict("(MIT OR GPL-3.0-only)") == "allow"
+    assert verdict("MIT AND GPL-3.0-only") == "deny"
+    assert verdict("MIT and Zlib") == "unknown"
+    assert verdict("GPL-3.0-only WITH GCC-exception-3.1") == "deny"
+    allow.add("GPL-3.0-only WITH GCC-exception-3.1")
+    assert verdict("GPL-3.0-only WITH GCC-exception-3.1") == "allow"
+    for bad in ("MIT OR", "(MIT", "MIT Apache-2.0", "WITH MIT", "MIT / BSD"):
+        try:
+            parse_expression(bad)
+        except SpdxError:
+            continue
+        raise AssertionError(bad)
+
+
+def test_license_verdicts_per_component_memoized(monkeypatch):
+    from genticode.supply import license
+
+    calls = []
+    real = license.evaluate_expression
+    monkeypatch.setattr(license, "evaluate_expression", lambda *a: calls.append(a[0][0]) or real(*a))
+    comps = [{"name": f"c{i}", "version": "1", "licenses": [{"expression": "MIT OR AGPL-3.0"}]} for i in range(20000)]
+    comps += [
+        {"name": "dual", "licenses": [{"expression": "MIT AND AGPL-3.0"}]},
+        {"name": "broken", "licenses": [{"expression": "MIT OR"}]},
+        {"name": "bare", "licenses": [{"license": {"name": "Some Custom License"}}]},
+        {"name": "none"},
+    ]
+    total, detail = evaluate_licenses({"components": comps}, allow={"MIT"}, deny={"AGPL-3.0"})
+    # One evaluation (root node plus its two leaves) per distinct expression
+    assert sorted(calls) == ["and", "id", "id", "id", "id", "or"]
+    assert total == 3 and detail["deny"] == ["MIT AND AGPL-3.0"]
+    assert detail["unknown"] == ["MIT OR", "Some Custom License"]
+    verdicts = {c["name"]: c["verdict"] for c in detail["components"]}
+    assert len(verdicts) == 20003 and verdicts["c0"] == "allow" and verdicts["dual"] == "deny" and verdicts["broken"] == "unknown"
@@ -0,0 +1,87 @@
+import json
+
+from genticode import orchestrator as orch
+from genticode.policy import PackConfig, PolicyConfig
+from genticode.supply.cache import SupplyCache, fingerprint
+
+
+def test_fingerprint_tracks_ecosystem_inputs(tmp_path):
+    (tmp_path / "poetry.lock").write_text("a")
+    py, node = fingerprint(tmp_path, "pip-audit"), fingerprint(tmp_path, "npm-audit")
+    (tmp_path / "package-lock.json").write_text("{}")
+    assert fingerprint(tmp_path, "pip-audit") == py
+    assert fingerprint(tmp_path, "npm-audit") != node
+    (tmp_path / "poetry.lock").write_text("b")
+    assert fingerprint(tmp_path, "pip-audit") != py
+
+
+def test_supply_cache_ttl(tmp_path):
+    art = tmp_path / "a.json"
+    art.write_text("{}")
+    cache = SupplyCache(tmp_path / "c")
+    cache.store("pip-audit", "fp", art, now=1000.0)
+    cache.save()
+    cache = SupplyCache.load(tmp_path / "c")
+    assert cache.lookup("pip-audit", "fp", ttl_s=60, now=1030.0) is not None
+    assert cache.lookup("pip-audit", "fp", ttl_s=60, now=1100.0) is None
+    assert cache.lookup("pip-audit", "other", now=1030.0) is None
+
+
+def test_supply_pack_reuses_artifacts_until_inputs_change(tmp_path, monkeypatch):
+    calls = []
+
+    def adapter(name, payload):
+        def run(root, out, timeout_s=None):
+            calls.append(name)
+            out.parent.mkdir(parents=True, exist_ok=True)
+            out.write_text(json.dumps(payload))
+            return payload
+
+        return run
+
+    sbom = {"components": [{"name": "x", "licenses": [{"license": {"id": "MIT"}}]}]}
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_py", adapter("cyclonedx-py", sbom))
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_npm", lambda root, out, **kw: None)
+    monkeypatch.setattr("genticode.orchestrator.maybe_pip_audit", adapter("pip-audit", {"vulns": [{"name": "x", "severity": "HIGH"}]}))
+    monkeypatch.setattr("genticode.orchestrator.maybe_npm_audit", lambda root, out, **kw: None)
+    (tmp_path / "requirements.txt").write_text("x==1\n")
+    gc = tmp_path / ".genticode"
+    # The CycloneDX tools (not the lockfile parsers) are what gets cached
+    deep = PolicyConfig()
+    deep.packs = {"supply": PackConfig(provider="deep")}
+
+    first = orch.run_supply_pack(tmp_path, gc, deep)
+    second = orch.run_supply_pack(tmp_path, gc, deep)
+    assert sorted(calls) == ["cyclonedx-py", "pip-audit"]
+    assert second["tools"]["cyclonedx-py"]["status"] == "cached"
+    assert second["tools"]["pip-audit"]["status"] == "cached"
+    assert second["vulns"] == first["vulns"] == 1
+    assert second["components"] == first["components"]
+    # Audits expire by TTL; SBOMs only when inputs change
+    pol = PolicyConfig()
+    pol.packs = {"supply": PackConfig(cache_ttl_s=0, provider="deep")}
+    calls.clear()
+    third = orch.run_supply_pack(tmp_path, gc, pol)
+    assert calls == ["pip-audit"] and third["tools"]["cyclonedx-py"]["status"] == "cached"
+    (tmp_path / "requirements.txt").write_text("x==2\n")
+    calls.clear()
+    orch.run_supply_pack(tmp_path, gc, deep)
+    assert sorted(calls) == ["cyclonedx-py", "pip-audit"]
+
+
+def test_fingerprint_tracks_the_audited_environment(tmp_path, monkeypatch):
+    venv = tmp_path / "venv"
+    site = venv / "lib" / "python3.11" / "site-packages"
+    site.mkdir(parents=True)
+    tool = venv / "bin" / "pip-audit"
+    tool.parent.mkdir()
+    tool.write_text(f"#!{venv}/bin/python\n")
+    monkeypatch.setattr("shutil.which", lambda name: str(tool))
+    before = fingerprint(tmp_path, "pip-audit")
+    npm = fingerprint(tmp_path, "npm-audit")
+    (site / "requests-2.31.0.dist-info").mkdir()
+    installed = fingerprint(tmp_path, "pip-audit")
+    assert installed != before
+    assert fingerprint(tmp_path, "npm-audit") == npm
+    monkeypatch.setenv("VIRTUAL_ENV", str(tmp_path / "other"))
+    assert fingerprint(tmp_path, "pip-audit") != installed
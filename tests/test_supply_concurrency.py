@@ -0,0 +1,46 @@
+import subprocess
+import time
+
+from genticode import orchestrator as orch
+from genticode.policy import PackConfig, PolicyConfig
+from genticode.telemetry import metered_call, tool_call
+
+
+def test_supply_tools_run_concurrently_with_timeouts(tmp_path, monkeypatch):
+    seen = {}
+
+    def slow(result):
+        def adapter(root, out, timeout_s=None):
+            seen.setdefault("timeouts", set()).add(timeout_s)
+            with tool_call("fake"):
+                time.sleep(0.3)
+            return result
+
+        return adapter
+
+    def times_out(root, out, timeout_s=None):
+        raise subprocess.TimeoutExpired("npm", timeout_s)
+
+    sbom = {"components": [{"licenses": [{"license": {"id": "AGPL-3.0"}}]}]}
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_py", slow(sbom))
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_npm", slow(None))
+    monkeypatch.setattr("genticode.orchestrator.maybe_pip_audit", slow({"vulns": [{"name": "x", "severity": "HIGH"}]}))
+    monkeypatch.setattr("genticode.orchestrator.maybe_npm_audit", times_out)
+    pol = PolicyConfig()
+    pol.licenses = {"deny": ["AGPL-3.0"]}
+    pol.packs = {"supply": PackConfig(timeout_s=600, tool_timeout_s=45)}
+
+    t0 = time.perf_counter()
+    counts = metered_call(orch.run_supply_pack, tmp_path, tmp_path / ".genticode", pol)
+    wall = time.perf_counter() - t0
+    # Three 0.3s tools overlap instead of adding up
+    assert wall < 0.8
+    assert seen["timeouts"] == {45}
+    assert counts["license_violations"] == 1 and counts["vulns"] == 1
+    tools = counts["tools"]
+    assert list(tools) == ["cyclonedx-py", "cyclonedx-npm", "pip-audit", "npm-audit"]
+    assert tools["cyclonedx-py"]["status"] == "ok" and tools["cyclonedx-py"]["duration_ms"] >= 250
+    assert tools["cyclonedx-npm"]["status"] == "unavailable"
+    assert tools["npm-audit"]["status"] == "timeout"
+    # Tool calls on helper threads are attributed to the pack
+    assert counts["telemetry"]["subprocesses"] == 3
@@ -5,7 +5,7 @@ from genticode.supply.vuln import maybe_pip_audit, maybe_npm_audit, normalize_pi
 from genticode import orchestrator as orch
 
 
-def test_maybe_pip_audit_and_normalize(monkeypatch, tmp_path):
+def test_maybe_pip_audit_and_normalize(monkeypatch, tmp_path, popen_from_run):
     sample = (Path(__file__).parent / "fixtures/vuln/pip_audit.json").read_text()
 
     class FakeCP:
@@ -13,7 +13,7 @@ def test_maybe_pip_audit_and_normalize(monkeypatch, tmp_path):
             self.stdout = stdout
 
     monkeypatch.setattr("shutil.which", lambda _: "/usr/bin/pip-audit")
-    monkeypatch.setattr("subprocess.run", lambda *a, **k: FakeCP(stdout=sample))
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(lambda *a, **k: k["stdout"].write(sample.encode()) and FakeCP(stdout=None)))
     data = maybe_pip_audit(tmp_path, tmp_path / ".genticode/raw/pip-audit.json")
     assert data is not None
     vulns = normalize_pip_audit(data)
@@ -26,9 +26,9 @@ def test_orchestrator_supply_vulns_aggregated(monkeypatch, tmp_path):
     class FakeCP:
         def __init__(self, stdout: str):
             self.stdout = stdout
-    monkeypatch.setattr("genticode.orchestrator.maybe_pip_audit", lambda root, out: pa)
+    monkeypatch.setattr("genticode.orchestrator.maybe_pip_audit", lambda root, out, **kw: pa)
     monkeypatch.setattr("genticode.orchestrator.normalize_pip_audit", lambda d: [{"severity": "high"}, {"severity": "medium"}])
-    monkeypatch.setattr("genticode.orchestrator.maybe_npm_audit", lambda root, out: None)
+    monkeypatch.setattr("genticode.orchestrator.maybe_npm_audit", lambda root, out, **kw: None)
     counts = orch.run_supply_pack(tmp_path, tmp_path / ".genticode")
     assert counts["vulns"] == 2 and counts["by_severity"]["high"] == 1
     assert "license_violations" in counts
@@ -46,13 +46,13 @@ def test_normalize_npm_audit_variants():
     assert out2 and out2[0]["package"] == "minimist" and out2[0]["severity"] == "high"
 
 
-def test_maybe_npm_audit_and_normalize(monkeypatch, tmp_path):
+def test_maybe_npm_audit_and_normalize(monkeypatch, tmp_path, popen_from_run):
     sample = json.dumps({"vulnerabilities": {"minimist": {"severity": "high"}}})
     class FakeCP:
         def __init__(self, stdout: str):
             self.stdout = stdout
     monkeypatch.setattr("shutil.which", lambda name: "/usr/bin/npm" if name == "npm" else "/usr/bin/pip-audit")
-    monkeypatch.setattr("subprocess.run", lambda *a, **k: FakeCP(stdout=sample))
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(lambda *a, **k: k["stdout"].write(sample.encode()) and FakeCP(stdout=None)))
     data = maybe_npm_audit(tmp_path, tmp_path / ".genticode/raw/npm-audit.json")
     assert data is not None
     out = normalize_npm_audit(data)
@@ -63,3 +63,25 @@ def test_vuln_tools_missing(monkeypatch, tmp_path):
     monkeypatch.setattr("shutil.which", lambda name: None)
     assert maybe_pip_audit(tmp_path, tmp_path / "x.json") is None
     assert maybe_npm_audit(tmp_path, tmp_path / "y.json") is None
+
+
+def test_failed_audits_are_not_clean(monkeypatch, tmp_path, popen_from_run):
+    class FakeCP:
+        def __init__(self, stdout, returncode=0):
+            self.stdout, self.returncode = stdout, returncode
+
+    monkeypatch.setattr("shutil.which", lambda name: "/usr/bin/" + name)
+    for stdout, rc in (("", 1), ('{"error": {"code": "ENOAUDIT"}}', 1), ('{"vulns": []}', 2)):
+        monkeypatch.setattr("subprocess.Popen", popen_from_run(lambda *a, **k: FakeCP(stdout, rc)))
+        assert maybe_pip_audit(tmp_path, tmp_path / "p.json") is None
+        assert maybe_npm_audit(tmp_path, tmp_path / "n.json") is None
+    # Vulnerabilities found: exit 1 is a completed audit
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(lambda *a, **k: FakeCP('{"vulns": [{"name": "x"}]}', 1)))
+    assert maybe_pip_audit(tmp_path, tmp_path / "p.json") == {"vulns": [{"name": "x"}]}
+    # A failed run is reported unavailable and never cached
+    monkeypatch.setattr("subprocess.Popen", popen_from_run(lambda *a, **k: FakeCP("", 1)))
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_py", lambda root, out, **kw: None)
+    monkeypatch.setattr("genticode.orchestrator.maybe_cyclonedx_npm", lambda root, out, **kw: None)
+    counts = orch.run_supply_pack(tmp_path, tmp_path / ".genticode")
+    assert counts["tools"]["pip-audit"]["status"] == "unavailable"
+    assert not (tmp_path / ".genticode/cache/supply/pip-audit.json").exists()
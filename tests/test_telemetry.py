@@ -0,0 +1,66 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from genticode import telemetry
+from genticode.orchestrator import run_all, PackRunner
+from genticode.policy import PolicyConfig
+
+
+def test_metered_call_records_files_tools_and_cache():
+    def pack():
+        telemetry.count_files(3, 300)
+        telemetry.count_cache(2, 1)
+        with telemetry.tool_call():
+            sum(range(1000))
+        return {"findings": 0}
+
+    out = telemetry.metered_call(pack)
+    t = out["telemetry"]
+    assert set(t) == set(telemetry.METRICS)
+    assert t["files_scanned"] == 3 and t["bytes_read"] == 300
+    assert t["cache_hits"] == 2 and t["cache_misses"] == 1
+    assert t["subprocesses"] == 1 and "peak_rss_kb" not in t
+    # Outside a meter the helpers are no-ops
+    telemetry.count_files(1, 1)
+    assert telemetry.current() is None
+
+
+def test_run_all_attaches_telemetry_per_pack(tmp_path: Path):
+    (tmp_path / "a.py").write_text("password = 'x'\n")
+    from genticode.orchestrator import run_static_pack
+
+    packs = {"static": PackRunner("static", run_static_pack, uses_index=True)}
+    report = {"packs": []}
+    run_all(PolicyConfig(), tmp_path, tmp_path / ".genticode", report, packs=packs)
+    t = report["packs"][0]["counts"]["telemetry"]
+    assert t["files_scanned"] == 1 and t["bytes_read"] == len("password = 'x'\n")
+    # Process-wide peaks are reported once, not per pack
+    assert report["telemetry"]["peak_rss_kb"] > 0
+
+
+def test_cpu_of_tools_and_helper_threads_counts_for_the_pack():
+    def burn():
+        n = 0
+        while sum(telemetry._thread_cpu()) < 0.05:
+            n += 1
+        return n
+
+    def pack():
+        with telemetry.tool_call("python"):
+            subprocess.run([sys.executable, "-c", "sum(range(10**7))"], check=True)
+        meter = telemetry.current()
+
+        def helper():
+            with telemetry.attach(meter):
+                burn()
+
+        t = threading.Thread(target=helper)
+        t.start()
+        t.join()
+        return {}
+
+    t = telemetry.metered_call(pack)["telemetry"]
+    assert t["cpu_children_user_ms"] + t["cpu_children_sys_ms"] > 0
+    assert t["cpu_user_ms"] + t["cpu_sys_ms"] >= 50
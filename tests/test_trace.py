@@ -0,0 +1,53 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+from shutil import copytree
+
+from genticode import trace
+from genticode.orchestrator import run_all, PackRunner
+from genticode.policy import PolicyConfig
+from genticode.telemetry import tool_call
+
+
+def test_span_is_noop_without_tracer():
+    assert trace.active() is None
+    with trace.span("x", "scan"):
+        pass
+    assert trace.active() is None
+
+
+def test_run_all_records_job_queue_and_tool_spans(tmp_path: Path):
+    (tmp_path / "a.py").write_text("x = 1\n")
+
+    def pack(root, gc_dir, policy=None, index=None):
+        with tool_call("semgrep"):
+            pass
+        return {"findings": 0}
+
+    packs = {"static": PackRunner("static", pack, uses_index=True)}
+    trace.start()
+    try:
+        run_all(PolicyConfig(), tmp_path, tmp_path / ".genticode", {"packs": []}, packs=packs)
+    finally:
+        tracer = trace.stop()
+    data = tracer.to_json()
+    spans = {(e["cat"], e["name"]): e for e in data["traceEvents"] if e["ph"] == "X"}
+    assert ("job", "static") in spans and ("schedule", "static (queued)") in spans
+    assert ("io", "walk") in spans and ("tool", "semgrep") in spans
+    job, tool = spans[("job", "static")], spans[("tool", "semgrep")]
+    # The tool span nests inside its pack's span on the same thread
+    assert job["tid"] == tool["tid"]
+    assert job["ts"] <= tool["ts"] and tool["ts"] + tool["dur"] <= job["ts"] + job["dur"]
+    assert any(e["ph"] == "M" and e["name"] == "thread_name" for e in data["traceEvents"])
+
+
+def test_cli_check_trace_writes_trace_json(tmp_path: Path):
+    copytree(Path(__file__).parents[1] / "genticode", tmp_path / "genticode")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_a.py").write_text("# AC_1\n")
+    cp = subprocess.run([sys.executable, "-m", "genticode", "check", "--trace"], cwd=tmp_path, capture_output=True, text=True)
+    assert cp.returncode == 0, cp.stderr
+    data = json.loads((tmp_path / ".genticode/raw/trace.json").read_text())
+    names = {e["name"] for e in data["traceEvents"] if e["ph"] == "X"}
+    assert {"run_all", "_index", "prompt", "static", "secrets.scan"} <= names
@@ -9,3 +9,27 @@ def test_scan_test_coverage(tmp_path):
     cov = scan_test_coverage(tmp_path, ["AC_1", "AC_2"])
     assert cov["AC_1"] >= 1 and cov["AC_2"] == 0
 
+
+
+def test_find_id_hits_locations_and_token_boundaries(tmp_path):
+    from genticode.traceability.parser import find_id_hits
+
+    (tmp_path / "tests/sub").mkdir(parents=True)
+    (tmp_path / "tests/test_a.py").write_text("x = 1\n# AC_1 and AC_10\n# AC_1 again\n")
+    (tmp_path / "tests/sub/test_b.py").write_text("# AC_100 is not AC_10\n")
+    hits = find_id_hits(tmp_path, ["AC_1", "AC_10", "AC_2"])
+    assert hits["AC_1"] == [("tests/test_a.py", 2), ("tests/test_a.py", 3)]
+    assert sorted(hits["AC_10"]) == [("tests/sub/test_b.py", 1), ("tests/test_a.py", 2)]
+    assert hits["AC_2"] == []
+    cov = scan_test_coverage(tmp_path, ["AC_1", "AC_10", "AC_2"], hits=hits)
+    assert cov == {"AC_1": 1, "AC_10": 2, "AC_2": 0}
+
+
+def test_find_id_hits_in_underscore_joined_names(tmp_path):
+    from genticode.traceability.parser import find_id_hits
+
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests/test_login.py").write_text("def test_AC_0_1a_login():\n    pass\n\ndef test_AC_0_1ab():\n    pass\n")
+    hits = find_id_hits(tmp_path, ["AC_0_1a", "AC_0_1"])
+    assert hits["AC_0_1a"] == [("tests/test_login.py", 1)]
+    assert hits["AC_0_1"] == []